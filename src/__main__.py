@@ -1,4 +1,4 @@
-from cli import main as cli_main
-import asyncio
+from cli import run as cli_run
 
-asyncio.run(cli_main())
\ No newline at end of file
+if __name__ == "__main__":
+    cli_run()
@@ -0,0 +1,124 @@
+from cluster_service import ClusterService
+from cluster_stats import ClusterStats
+from cluster import Cluster
+import runtime
+import asyncio
+import logging
+
+def cpu_busy_percent(before: dict[str, tuple[int, int]], after: dict[str, tuple[int, int]]) -> dict[str, float]:
+    """
+    Computes the CPU usage of every host between two readings of ClusterService.get_cpu_times.
+    :param before: The first reading.
+    :param after: The second reading.
+    :return: A dictionary mapping each host read both times to its busy CPU percentage over the interval.
+    """
+    usage = {}
+    for host, (busy, total) in after.items():
+        if host not in before:
+            continue
+        busy_before, total_before = before[host]
+        if total > total_before:
+            usage[host] = 100.0 * (busy - busy_before) / (total - total_before)
+    return usage
+
+class AdaptiveCoolDown:
+    """
+    Waits between probes until the cluster returns to its baseline resource usage,
+    instead of sleeping a fixed rest time.
+
+    The CPU usage is measured over each poll interval from the CPU time counters of the servers,
+    since the usage the stats report is the average since boot. Hosts whose counters cannot be
+    read over SSH are only checked on their memory.
+    """
+
+    def __init__(
+            self,
+            cluster_service: ClusterService,
+            cluster: Cluster,
+            poll_interval: float = 1.0,
+            cpu_tolerance: float = 5.0,
+            memory_tolerance: float = 0.05,
+        ):
+        """
+        Initializes the AdaptiveCoolDown.
+        :param cluster_service: The ClusterService used to poll the cluster statistics.
+        :param cluster: The cluster to wait for.
+        :param poll_interval: Time between two polls of the cluster statistics, in seconds.
+        :param cpu_tolerance: How many percentage points of busy CPU above the baseline still count as recovered.
+        :param memory_tolerance: Fraction of the baseline used memory that may still be in use above the baseline.
+        """
+        self.cluster_service = cluster_service
+        self.cluster = cluster
+        self.poll_interval = poll_interval
+        self.cpu_tolerance = cpu_tolerance
+        self.memory_tolerance = memory_tolerance
+        self.baseline: ClusterStats = None
+        # busy CPU percentage of each host over one poll interval, sampled with the baseline
+        self.baseline_cpu: dict[str, float] = {}
+
+    async def capture_baseline(self, stats: ClusterStats):
+        """
+        Captures the usage the cluster has to return to: the memory of the given stats and the CPU
+        usage sampled over one poll interval.
+        :param stats: The cluster statistics taken before the benchmark.
+        """
+        self.baseline = stats
+        before = await self.cluster_service.get_cpu_times(self.cluster)
+        await asyncio.sleep(self.poll_interval)
+        self.baseline_cpu = cpu_busy_percent(before, await self.cluster_service.get_cpu_times(self.cluster))
+
+    def has_recovered(self, stats: ClusterStats, cpu_busy: dict[str, float] = None) -> bool:
+        """
+        Check if every server is back to its baseline CPU and memory usage.
+        :param stats: The current cluster statistics.
+        :param cpu_busy: The busy CPU percentage of each host over the last poll interval, as cpu_busy_percent returns it.
+        :return: True if every server is within tolerance of the baseline, False otherwise.
+        """
+        baseline_per_host = {server.host: server for server in self.baseline.servers}
+        cpu_busy = cpu_busy or {}
+
+        for server in stats.servers:
+            baseline = baseline_per_host.get(server.host)
+            if baseline is None:
+                continue
+
+            if server.host in cpu_busy and server.host in self.baseline_cpu:
+                if cpu_busy[server.host] > self.baseline_cpu[server.host] + self.cpu_tolerance:
+                    return False
+
+            if server.memory['used'] > baseline.memory['used'] * (1 + self.memory_tolerance):
+                return False
+
+        return True
+
+    async def wait(self, max_cool_down: float) -> float:
+        """
+        Waits until the cluster has recovered or max_cool_down seconds have passed, checking it after
+        every poll interval. Without a baseline it falls back to sleeping max_cool_down seconds.
+        :param max_cool_down: The cap on the time spent waiting, in seconds.
+        :return: The time actually spent cooling down, in seconds.
+        """
+        start = runtime.now()
+
+        if self.baseline is None:
+            logging.warning("No baseline cluster stats captured, falling back to a fixed cool-down.")
+            await asyncio.sleep(max_cool_down)
+            return (runtime.now() - start).total_seconds()
+
+        cpu_times = await self.cluster_service.get_cpu_times(self.cluster)
+        while True:
+            elapsed = (runtime.now() - start).total_seconds()
+            if elapsed + self.poll_interval > max_cool_down:
+                await asyncio.sleep(max(0.0, max_cool_down - elapsed))
+                logging.warning(f"Cluster did not recover to baseline within the {max_cool_down} seconds cool-down cap.")
+                return (runtime.now() - start).total_seconds()
+
+            # the CPU usage is measured over the interval between two readings
+            await asyncio.sleep(self.poll_interval)
+            stats = await self.cluster_service.get_stats(self.cluster)
+            previous_cpu_times, cpu_times = cpu_times, await self.cluster_service.get_cpu_times(self.cluster)
+
+            if self.has_recovered(stats, cpu_busy_percent(previous_cpu_times, cpu_times)):
+                elapsed = (runtime.now() - start).total_seconds()
+                logging.info(f"Cluster recovered to baseline after {elapsed:.2f} seconds.")
+                return elapsed
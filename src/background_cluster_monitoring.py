@@ -1,19 +1,23 @@
 from cluster_service import ClusterService
 from cluster import Cluster
+from metrics import MetricsRegistry
 import asyncio
 
 class BackgroundClusterMonitoring:
-    def __init__(self, cluster_service: ClusterService, cluster: Cluster):
+    def __init__(self, cluster_service: ClusterService, cluster: Cluster, metrics: MetricsRegistry = None):
         self.cluster_service = cluster_service
         self._running = False
         self.cluster = cluster
         self.stats = []
+        self.metrics = metrics
 
     async def run(self, interval: float):
         self._running = True
         
         while self._running:
             self.stats.append(await self.cluster_service.get_stats(self.cluster))
+            if self.metrics:
+                self.metrics.set_cluster_stats(self.stats[-1])
             await asyncio.sleep(interval)
         
 
@@ -3,17 +3,23 @@ from test_case import TestCase
 from cluster import Cluster
 
 class Benchmark:
-    def __init__(self, test_executions:list[TestExecution], test_case:TestCase = None, cluster: Cluster = None):
+    def __init__(self, test_executions:list[TestExecution], test_case:TestCase = None, cluster: Cluster = None, cool_down_seconds: float = 0.0, capacity: dict = None, load_search: dict = None):
         """
         Initializes the Benchmark with a list of test executions.
         :param test_executions: A list of TestExecution objects.
         :param test_case: Optional name of the test case for which the benchmark is run.
+        :param cool_down_seconds: Total time spent cooling down between the probes of the benchmark.
+        :param capacity: The capacity curve predicted by the CapacityModel fed with the probes, as returned by CapacityModel.to_json.
+        :param load_search: Probes made by the search of the max acceptable load and the time saved compared with probing every load, as kept in TestExecutionService.last_load_search.
         """
         if not test_executions:
             raise ValueError("Test executions cannot be empty.")
         self.test_executions = test_executions
         self.test_case = test_case
         self.cluster = cluster
+        self.cool_down_seconds = cool_down_seconds
+        self.capacity = capacity
+        self.load_search = load_search
     
     def __repr__(self):
         return f"Benchmark(test_executions={self.test_executions}, test_case={self.test_case}, cluster={self.cluster})"
@@ -28,7 +34,10 @@ class Benchmark:
         """
         return {
             "test_executions": [execution.to_json() for execution in self.test_executions],
-            "test_case_name": self.test_case.get_name()
+            "test_case_name": self.test_case.get_name(),
+            "cool_down_seconds": self.cool_down_seconds,
+            "capacity": self.capacity,
+            "load_search": self.load_search
         }
 
     def to_short_json(self) -> dict:
@@ -39,5 +48,8 @@ class Benchmark:
         return {
             "test_executions": [execution.to_short_json() for execution in self.test_executions],
             "test_case_name": self.test_case.to_json(),
-            "cluster": self.cluster.to_json()
+            "cluster": self.cluster.to_json(),
+            "cool_down_seconds": self.cool_down_seconds,
+            "capacity": self.capacity,
+            "load_search": self.load_search
         }
\ No newline at end of file
@@ -0,0 +1,117 @@
+from json_storage_service import JsonStorageService
+from test_execution import TestExecution
+from test_case import TestCase
+from datetime import datetime
+import logging
+
+class BenchmarkCheckpoint:
+    """
+    Persists every completed probe and the current search state of a benchmark,
+    so an interrupted run can be resumed without repeating finished probes.
+
+    The searches in TestExecutionService are deterministic given the outcome of
+    each probe, so resuming replays the recorded probes in order and only starts
+    issuing real requests once the recorded log is exhausted.
+
+    The probes are appended to a log, one JSON line each, so recording a probe does not
+    rewrite the earlier ones; the small search state file is replaced atomically. A probe
+    cut short by a crash while it was written is dropped on resume and run again.
+    """
+
+    def __init__(self, storage_service: JsonStorageService, file_name: str, resume: bool = False):
+        """
+        Initializes the BenchmarkCheckpoint.
+        :param storage_service: The storage service used to persist the checkpoint.
+        :param file_name: The name of the checkpoint file inside the storage. The probe log is kept next to it, with a .probes.jsonl suffix.
+        :param resume: Whether to load the probes of a previous run from the checkpoint file.
+        """
+        self.storage_service = storage_service
+        self.file_name = file_name
+        self.probes_file_name = f"{file_name.removesuffix('.json')}.probes.jsonl"
+
+        data = storage_service.load(file_name) if resume else None
+        if resume and data is None:
+            logging.warning(f"No checkpoint found at {file_name}, starting a new benchmark.")
+        elif data and data.get("completed"):
+            logging.warning(f"The checkpoint {file_name} is of a completed benchmark, starting a new benchmark.")
+            data = None
+
+        # checkpoints written before the probe log kept the probes in the checkpoint file itself
+        self.probes = (data.get("probes", []) + (storage_service.load_lines(self.probes_file_name) or [])) if data else []
+        self.search_state = data["search_state"] if data else {}
+        self._cursor = 0
+        # drops a line cut short by a crash, so new probes are appended after complete lines only
+        self.storage_service.save_lines(self.probes_file_name, self.probes)
+        self.save()
+
+    def is_replaying(self) -> bool:
+        """
+        Check if there are recorded probes left to replay.
+        :return: True if the next probe will be served from the checkpoint, False otherwise.
+        """
+        return self._cursor < len(self.probes)
+
+    async def probe(self, kind: str, test_case: TestCase, params: dict, run) -> TestExecution:
+        """
+        Returns the recorded execution of the next probe, or runs it and records it.
+        :param kind: The kind of probe, used to tell plain and monitored executions apart.
+        :param test_case: The test case being probed.
+        :param params: JSON-serializable parameters identifying the probe.
+        :param run: A coroutine function performing the probe when it is not recorded.
+        :return: The TestExecution of the probe.
+        """
+        key = {"kind": kind, "test_case": test_case.get_name(), "params": params}
+
+        if self.is_replaying():
+            record = self.probes[self._cursor]
+            if record["key"] == key:
+                self._cursor += 1
+                logging.info(f"Replaying checkpointed probe {self._cursor}/{len(self.probes)}: {key}")
+                return TestExecution.from_json(record["execution"], test_case)
+
+            logging.warning(f"Checkpoint diverged at probe {self._cursor + 1} (expected {record['key']}, got {key}). Discarding the remaining recorded probes.")
+            del self.probes[self._cursor:]
+            self.storage_service.save_lines(self.probes_file_name, self.probes)
+
+        execution = await run()
+        record = {"key": key, "execution": execution.to_json()}
+        self.probes.append(record)
+        self._cursor += 1
+        self.storage_service.append_line(self.probes_file_name, record)
+        return execution
+
+    def update_search_state(self, test_case: TestCase, **state):
+        """
+        Records the current state of the search for a test case, e.g. its bounds and found loads.
+        The state is informational, except for the calibration the searches started from; resuming relies on the recorded probes.
+        :param test_case: The test case being searched.
+        :param state: The values to merge into the search state of the test case.
+        """
+        if self.is_replaying():
+            return
+        self.search_state.setdefault(test_case.get_name(), {}).update(state)
+        self.save()
+
+    def complete(self):
+        """
+        Marks the benchmark as completed once its results are saved, and empties the probe log:
+        resuming from a completed checkpoint starts a new benchmark instead of replaying this one.
+        The search state is kept as the record of the finished searches.
+        """
+        self.storage_service.save_lines(self.probes_file_name, [])
+        self.save(completed=True)
+
+    def save(self, completed: bool = False):
+        """
+        Writes the search state to storage. The probes are written to the probe log as they complete.
+        :param completed: Whether the benchmark is completed.
+        """
+        self.storage_service.save(
+            file_name=self.file_name,
+            data={
+                "updated_at": datetime.now().isoformat(),
+                "search_state": self.search_state,
+                "probes_log": self.probes_file_name,
+                "completed": completed
+            }
+        )
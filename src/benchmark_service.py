@@ -6,6 +6,8 @@ from cluster_service import ClusterService
 from test_result import TestResult
 from test_execution import TestExecution
 from cluster import Cluster
+from capacity_model import CapacityModel
+from calibration_cache import CalibrationCache
 import logging
 import datetime
 import json
@@ -13,8 +15,15 @@ import timespan
 import asyncio
 
 class BenchmarkService:
-    def __init__(self, test_execution_service: TestExecutionService):
+    def __init__(self, test_execution_service: TestExecutionService, calibration_cache: CalibrationCache = None):
+        """
+        Initializes the BenchmarkService.
+        :param test_execution_service: The service running the probes.
+        :param calibration_cache: Optional CalibrationCache: the searches start from what the last benchmark of the same
+        cluster and test case found, verified by a probe, and its results are recorded for the next one.
+        """
         self.test_execution_service = test_execution_service
+        self.calibration_cache = calibration_cache
 
     async def run_benchmark(
             self, 
@@ -24,11 +33,13 @@ class BenchmarkService:
             duration_per_test:int = 30,
             max_n_loads_to_test:int = 3,
             min_requests_per_second:int = 1,
-            rest_time:int = 30
+            rest_time:int = 30,
+            model_guided_search: bool = True
         ) -> list[Benchmark]:
         """
         Run a benchmark for a list of test cases.
         :param test_cases: List of TestCase objects to run.
+        :param model_guided_search: Whether the searches of the lower loads start from the bounds predicted by the capacity model.
         :return: List of Benchmark objects  containing the results of the benchmark.
         """
         if not test_cases:
@@ -37,8 +48,8 @@ class BenchmarkService:
         benchmark_results = []
         
         for test_case in test_cases:
-            result = await self.run_benchmark_single_test_case(test_case, cluster=cluster, max_response_time=max_response_time, duration_per_test=duration_per_test, max_n_loads_to_test=max_n_loads_to_test, min_requests_per_second=min_requests_per_second, rest_time=rest_time)
-            await asyncio.sleep(rest_time) if rest_time > 0 else None
+            result = await self.run_benchmark_single_test_case(test_case, cluster=cluster, max_response_time=max_response_time, duration_per_test=duration_per_test, max_n_loads_to_test=max_n_loads_to_test, min_requests_per_second=min_requests_per_second, rest_time=rest_time, model_guided_search=model_guided_search)
+            await self.test_execution_service.rest(rest_time)
             benchmark_results.append(result)
 
         return benchmark_results
@@ -51,10 +62,32 @@ class BenchmarkService:
             duration_per_test:int = 30,
             max_n_loads_to_test:int = 3,
             min_requests_per_second:int = 2,
-            rest_time:int = 30
+            rest_time:int = 30,
+            model_guided_search: bool = True
             ) -> Benchmark:
-        # dry run to get the cluster stats
-        await self.test_execution_service.cluster_service.get_stats(cluster)
+        """
+        Run a benchmark for a single test case: the highest load that meets the maximum response time, then the
+        maximum requests per second of it and of the loads below it.
+        Every probe feeds a CapacityModel, whose predicted capacity curve is saved with the benchmark. With
+        model_guided_search, each lower load first checks the bounds the model predicts for it, so the search
+        only bisects between them instead of doubling from a power of two.
+        With a calibration cache, the max acceptable load and max requests per second cached for the cluster
+        are probed first, with the next load or rate; the searches only run in full when these probes disagree.
+        :return: The Benchmark.
+        """
+        # dry run to get the cluster stats, which also serve as the baseline for an adaptive cool-down
+        baseline_stats = await self.test_execution_service.cluster_service.get_stats(cluster)
+        if self.test_execution_service.cool_down:
+            await self.test_execution_service.cool_down.capture_baseline(baseline_stats)
+        if self.test_execution_service.metrics:
+            self.test_execution_service.metrics.set_cluster_stats(baseline_stats)
+        cool_down_seconds_before = self.test_execution_service.total_cool_down_seconds
+        capacity_model = CapacityModel()
+        self.test_execution_service.capacity_model = capacity_model
+        calibration = self.__start_calibration(cluster, test_case)
+        if calibration:
+            logging.info(f"Starting {test_case.get_name()} from the calibration of {calibration['updated_at']}: max acceptable load {calibration['max_acceptable_load']}.")
+            capacity_model.seed(calibration['service_demand'])
 
         test_executions = []
 
@@ -64,27 +97,42 @@ class BenchmarkService:
             max_avg_response_time=max_response_time,
             duration_seconds=duration_per_test,
             rest_time=rest_time,
+            expected_load=calibration['max_acceptable_load'] if calibration else None,
         )
 
         logging.warning(
             f"Max acceptable load for {test_case.get_name()} is {max_acceptable_load.get_load()}. responded in {max_acceptable_load.avg_response_time()} ms average response time."
         )
+        load_search = self.test_execution_service.last_load_search
+        if load_search:
+            logging.info(f"Load search took {load_search['probes']} probes instead of {load_search['linear_probes']}, saving about {load_search['seconds_saved']:.0f} seconds.")
 
+        prediction = self.__calibrated_prediction(calibration, max_acceptable_load.get_load())
         max_acceptable_load_and_requests_per_second = await self.test_execution_service.find_max_requests_per_second(
             test_case=test_case,
             load=max_acceptable_load.get_load(),
             duration_seconds=duration_per_test,
             max_avg_response_time=max_response_time,
-            rest_time=rest_time
+            rest_time=rest_time,
+            prediction=prediction
         )
 
         test_executions.append(max_acceptable_load_and_requests_per_second)
+        capacity_model.record_capacity(max_acceptable_load.get_load(), max_acceptable_load_and_requests_per_second.request_per_second, prediction)
+        found_loads = {max_acceptable_load.get_load(): max_acceptable_load_and_requests_per_second.request_per_second}
+        self.test_execution_service.record_search_state(
+            test_case,
+            phase="lower_loads",
+            max_acceptable_load=max_acceptable_load.get_load(),
+            found_loads=found_loads
+        )
 
         for load in range(
             max_acceptable_load.get_load() - 1,
             max(max_acceptable_load.get_load() - max_n_loads_to_test, 1),
             -1
         ):
+            prediction = self.__calibrated_prediction(calibration, load) or (capacity_model.predict(load) if model_guided_search else None)
             test_execution = await self.test_execution_service.find_max_requests_per_second(
                 test_case=test_case,
                 load=load,
@@ -93,14 +141,19 @@ class BenchmarkService:
                 start_power=math.floor(math.log2(test_executions[-1].request_per_second)) if test_executions else 1,
                 max_power=10,
                 rest_time=rest_time,
+                prediction=prediction,
             )
 
             test_executions.append(test_execution)
+            capacity_model.record_capacity(load, test_execution.request_per_second, prediction)
+            found_loads[load] = test_execution.request_per_second
+            self.test_execution_service.record_search_state(test_case, found_loads=found_loads)
         
         rerun_with_monitoring = []
+        self.test_execution_service.record_search_state(test_case, phase="rerun_while_monitoring")
 
         for test_execution in test_executions:
-            await asyncio.sleep(rest_time) if rest_time > 0 else None
+            await self.test_execution_service.rest(rest_time)
             rerun_with_monitoring.append(
                 await self.test_execution_service.rerun_while_monitoring(
                     test_execution=test_execution,
@@ -109,4 +162,50 @@ class BenchmarkService:
                 )
             )
 
-        return Benchmark(test_executions=rerun_with_monitoring, test_case=test_case, cluster=cluster)
+        self.test_execution_service.record_search_state(test_case, phase="done")
+        self.test_execution_service.capacity_model = None
+        if self.calibration_cache:
+            self.calibration_cache.update(
+                cluster,
+                test_case,
+                max_acceptable_load=max_acceptable_load.get_load(),
+                service_demand=capacity_model.measured_service_demand(),
+                max_requests_per_second=found_loads
+            )
+
+        return Benchmark(
+            test_executions=rerun_with_monitoring,
+            test_case=test_case,
+            cluster=cluster,
+            cool_down_seconds=self.test_execution_service.total_cool_down_seconds - cool_down_seconds_before,
+            capacity=capacity_model.to_json(),
+            load_search=load_search
+        )
+
+    def __start_calibration(self, cluster: Cluster, test_case: TestCase) -> dict | None:
+        """
+        Finds the calibration the searches of a test case start from, and records it in the checkpoint.
+        The calibration decides which probes the searches run, so a resumed benchmark starts from the one
+        its interrupted run started from, even if the cache was updated since, e.g. by that run itself.
+        :return: The calibration, as returned by CalibrationCache.get, or None to search from scratch.
+        """
+        checkpoint = self.test_execution_service.checkpoint
+        state = checkpoint.search_state.get(test_case.get_name(), {}) if checkpoint else {}
+        if "calibration" in state:
+            return CalibrationCache.from_json(state["calibration"]) if state["calibration"] else None
+        calibration = self.calibration_cache.get(cluster, test_case) if self.calibration_cache else None
+        if checkpoint:
+            checkpoint.update_search_state(test_case, calibration=calibration)
+        return calibration
+
+    @staticmethod
+    def __calibrated_prediction(calibration: dict | None, load: int) -> dict | None:
+        """
+        Turns the max requests per second cached for a load into a prediction without spread, so the search
+        verifies it with one probe at it and one just above it.
+        :return: The prediction, None when the load is not cached.
+        """
+        if not calibration or not calibration['max_requests_per_second'].get(load):
+            return None
+        request_per_second = calibration['max_requests_per_second'][load]
+        return {"load": load, "request_per_second": request_per_second, "low": request_per_second, "high": request_per_second, "source": "calibration"}
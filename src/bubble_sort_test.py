@@ -1,8 +1,9 @@
 from test_case import TestCase
-from httpx import AsyncClient
 from test_result import TestResult
 from timespan import Timespan
 import datetime
+from request_trace import RequestTrace
+import runtime
 
 class BubbleSortTest(TestCase):
     def __init__(self,application_base_url: str ):
@@ -12,22 +13,27 @@ class BubbleSortTest(TestCase):
                          min_recommended_load=10)
 
     async def run(self, load)-> TestResult:
-        async with AsyncClient(base_url=self._application_base_url,timeout=30.0) as client:
-            start_request = datetime.datetime.now(datetime.timezone.utc)
-            response = await client.get(
-                "/bubble-sort",
-                params={"n": self.__convert_load(load)},
-            )
-            end_request = datetime.datetime.now(datetime.timezone.utc)
-            start_time = datetime.datetime.fromisoformat(response.json().get('start'))
-            end_time = datetime.datetime.fromisoformat(response.json().get('end'))
-            return TestResult(
-                test_case_name=self.get_name(),
-                request_span=Timespan(start_request, end_request),
-                server_processing_span=Timespan(start_time, end_time),
-                load=load
-            )
+        client = runtime.get_http_client()
+        trace = RequestTrace()
+        start_request = datetime.datetime.now(datetime.timezone.utc)
+        response = await client.get(
+            f"{self._application_base_url}/bubble-sort",
+            params={"n": self.__convert_load(load)},
+            extensions=trace.extensions,
+        )
+        end_request = datetime.datetime.now(datetime.timezone.utc)
+        response.raise_for_status()
+        body = runtime.json_loads(response.content)
+        start_time = datetime.datetime.fromisoformat(body.get('start'))
+        end_time = datetime.datetime.fromisoformat(body.get('end'))
+        return TestResult(
+            test_case_name=self.get_name(),
+            request_span=Timespan(start_request, end_request),
+            server_processing_span=Timespan(start_time, end_time),
+            load=load,
+            phases=trace.phases()
+        )
 
     @staticmethod
     def __convert_load(load:int)->int:
-        return 2 ** load 
\ No newline at end of file
+        return 2 ** load 
@@ -0,0 +1,73 @@
+from json_storage_service import JsonStorageService
+from test_case import TestCase
+from cluster import Cluster
+from datetime import datetime
+
+class CalibrationCache:
+    """
+    Remembers what the last benchmark of each test case found on a cluster: the highest acceptable
+    load, the server processing time of each probed load and the max requests per second of each
+    searched load.
+
+    A new benchmark starts its searches from these values instead of from scratch. The entries are
+    read once, when the cache is created, so a run sees the same calibration from start to end,
+    even while it records its own results.
+    """
+
+    def __init__(self, storage_service: JsonStorageService, file_name: str, use_cached: bool = True):
+        """
+        Initializes the CalibrationCache.
+        :param storage_service: The storage service used to persist the cache.
+        :param file_name: The name of the cache file inside the storage.
+        :param use_cached: Whether get returns the cached entries. When False, the cache only records the new results.
+        """
+        self.storage_service = storage_service
+        self.file_name = file_name
+        self.entries: dict[str, dict] = (storage_service.load(file_name) or {}).get("entries", {})
+        self._loaded = dict(self.entries) if use_cached else {}
+
+    @staticmethod
+    def key(cluster: Cluster, test_case: TestCase) -> str:
+        return f"{cluster.name}/{test_case.get_name()}"
+
+    def get(self, cluster: Cluster, test_case: TestCase) -> dict | None:
+        """
+        Returns the calibration of a test case on a cluster, as it was when the cache was created.
+        :return: A dictionary with 'max_acceptable_load', 'service_demand' and 'max_requests_per_second'
+        (both keyed by load), and 'updated_at'; None when the pair was never benchmarked.
+        """
+        entry = self._loaded.get(self.key(cluster, test_case))
+        if entry is None:
+            return None
+        return CalibrationCache.from_json(entry)
+
+    @staticmethod
+    def from_json(entry: dict) -> dict:
+        """
+        Reads a calibration saved as JSON, whose loads became strings, e.g. an entry of the cache file.
+        :param entry: The saved calibration.
+        :return: The calibration, as returned by get.
+        """
+        return {
+            "max_acceptable_load": entry["max_acceptable_load"],
+            "service_demand": {int(load): demand for load, demand in entry["service_demand"].items()},
+            "max_requests_per_second": {int(load): rps for load, rps in entry["max_requests_per_second"].items()},
+            "updated_at": entry["updated_at"],
+        }
+
+    def update(self, cluster: Cluster, test_case: TestCase, max_acceptable_load: int, service_demand: dict[int, float], max_requests_per_second: dict[int, int]):
+        """
+        Records the results of a benchmark and writes the cache to storage.
+        :param cluster: The benchmarked cluster.
+        :param test_case: The benchmarked test case.
+        :param max_acceptable_load: The highest load that met the maximum response time.
+        :param service_demand: The average server processing time measured at each load, in seconds.
+        :param max_requests_per_second: The max requests per second found for each searched load.
+        """
+        self.entries[self.key(cluster, test_case)] = {
+            "updated_at": datetime.now().isoformat(),
+            "max_acceptable_load": max_acceptable_load,
+            "service_demand": {str(load): demand for load, demand in sorted(service_demand.items())},
+            "max_requests_per_second": {str(load): rps for load, rps in sorted(max_requests_per_second.items())},
+        }
+        self.storage_service.save(file_name=self.file_name, data={"entries": self.entries})
@@ -0,0 +1,189 @@
+from test_execution import TestExecution
+from statistics import NormalDist
+import math
+
+class CapacityModel:
+    """
+    Predicts the maximum sustainable requests per second of each load from the probes completed so far.
+
+    Queueing view of the cluster (M/M/c): c servers, each busy S(L) seconds with a request of load L,
+    saturate at c / S(L) requests per second, and keeping the response time under the SLA holds the
+    maximum a fixed share below saturation. So the maximum RPS is k / S(L), with a single constant k
+    for the cluster.
+
+    S(L) is measured by the probes themselves, as the smallest average server processing time seen
+    at each load (the least contended probe), and fitted across loads as exponential (log S linear
+    in L, e.g. recursive fibonacci) or power-law (log S linear in log L, e.g. bubble sort), whichever
+    fits better. k is estimated from the maxima the searches found. The bounds combine the
+    uncertainty of both fits in log space.
+    """
+
+    def __init__(self, confidence: float = 0.9, prior_spread: float = 0.35):
+        """
+        Initializes the CapacityModel.
+        :param confidence: Confidence level of the predicted bounds.
+        :param prior_spread: Standard deviation, in log space, assumed before the probes tell otherwise, e.g. 0.35 for about 35%. It weighs as one point in each fit.
+        """
+        self.confidence = confidence
+        self.prior_spread = prior_spread
+        self.service_demand: dict[int, float] = {}
+        self.capacities: dict[int, dict] = {}
+        self._seeded: set[int] = set()
+
+    def seed(self, service_demand: dict[int, float]):
+        """
+        Starts from service demands measured earlier, e.g. by the last benchmark of the cluster.
+        A probe of a seeded load replaces its seed instead of competing with it.
+        :param service_demand: The average server processing time of each load, in seconds.
+        """
+        for load, demand in service_demand.items():
+            if load not in self.service_demand and demand > 0:
+                self.service_demand[load] = demand
+                self._seeded.add(load)
+
+    def observe(self, execution: TestExecution):
+        """
+        Takes the service demand measured by a probe into account.
+        Probes that saturated the tester or have no results are ignored.
+        :param execution: The probe.
+        """
+        if not execution.results or not execution.is_valid():
+            return
+        load = execution.get_load()
+        demand = execution.avg_server_processing_time()
+        if demand <= 0:
+            # a server that does not report its processing time: the response time is the closest measure
+            demand = execution.avg_response_time()
+        if demand > 0 and (load in self._seeded or demand < self.service_demand.get(load, math.inf)):
+            self.service_demand[load] = demand
+            self._seeded.discard(load)
+
+    def record_capacity(self, load: int, request_per_second: int, prediction: dict = None):
+        """
+        Records the maximum requests per second a search found for a load.
+        :param load: The load.
+        :param request_per_second: The maximum found.
+        :param prediction: The prediction made for the load before the search, kept to check the model against.
+        """
+        self.capacities[load] = {"request_per_second": request_per_second, "prediction": prediction}
+
+    def measured_service_demand(self) -> dict[int, float]:
+        """
+        Returns the service demand of the loads probed, without the seeds no probe replaced.
+        """
+        return {load: demand for load, demand in self.service_demand.items() if load not in self._seeded}
+
+    def predict(self, load: int) -> dict | None:
+        """
+        Predicts the maximum requests per second of a load.
+        :param load: The load.
+        :return: A dictionary with the load, the predicted 'request_per_second' and its 'low' and 'high' bounds, or None before a search found a maximum.
+        """
+        demand_fit = self.__fit_service_demand()
+        capacity_fit = self.__fit_capacity_constant(demand_fit)
+        if demand_fit is None or capacity_fit is None:
+            return None
+        log_demand, demand_variance = self.__predict_log_demand(demand_fit, load)
+        log_k, k_variance = capacity_fit
+        log_rps = log_k - log_demand
+        spread = NormalDist().inv_cdf(0.5 + self.confidence / 2) * math.sqrt(demand_variance + k_variance)
+        return {
+            "load": load,
+            "request_per_second": math.exp(log_rps),
+            "low": math.exp(log_rps - spread),
+            "high": math.exp(log_rps + spread),
+        }
+
+    def curve(self, loads: list[int] = None) -> list[dict]:
+        """
+        Predicts the capacity curve.
+        :param loads: The loads predicted. Defaults to every load between the smallest and the largest one probed.
+        :return: The prediction of each load, with the maximum measured for it, if any.
+        """
+        if loads is None:
+            probed = set(self.service_demand) | set(self.capacities)
+            loads = list(range(min(probed), max(probed) + 1)) if probed else []
+        curve = []
+        for load in loads:
+            prediction = self.predict(load)
+            if prediction is None:
+                continue
+            if load in self.capacities:
+                prediction["measured"] = self.capacities[load]["request_per_second"]
+            curve.append(prediction)
+        return curve
+
+    def to_json(self) -> dict:
+        """
+        Converts the model to a JSON-serializable dictionary: the fits, the predicted capacity curve and,
+        for every searched load, the prediction made before its search next to the maximum found.
+        """
+        demand_fit = self.__fit_service_demand()
+        capacity_fit = self.__fit_capacity_constant(demand_fit)
+        return {
+            "model": "k / S(load)",
+            "confidence": self.confidence,
+            "service_demand": {str(load): demand for load, demand in sorted(self.service_demand.items())},
+            "seeded_loads": sorted(self._seeded),
+            "service_demand_fit": demand_fit["kind"] if demand_fit else None,
+            "capacity_constant": math.exp(capacity_fit[0]) if capacity_fit else None,
+            "curve": self.curve(),
+            "searches": [
+                {"load": load, "measured": entry["request_per_second"], "prediction": entry["prediction"]}
+                for load, entry in sorted(self.capacities.items())
+            ],
+        }
+
+    def __fit_service_demand(self) -> dict | None:
+        """
+        Least-squares fit of log S against the load, or against its logarithm, keeping the better one.
+        :return: The fit, None without any measured load.
+        """
+        loads = sorted(self.service_demand)
+        if not loads:
+            return None
+        y = [math.log(self.service_demand[load]) for load in loads]
+        n = len(loads)
+        if n == 1:
+            return {"kind": "constant", "n": 1, "intercept": y[0], "slope": 0.0, "mean_x": 0.0, "sxx": 0.0, "variance": self.prior_spread ** 2}
+
+        best = None
+        for kind, transform in (("exponential", float), ("power", math.log)):
+            x = [transform(load) for load in loads]
+            mean_x, mean_y = sum(x) / n, sum(y) / n
+            sxx = sum((xi - mean_x) ** 2 for xi in x)
+            if sxx == 0:
+                continue
+            slope = sum((xi - mean_x) * (yi - mean_y) for xi, yi in zip(x, y)) / sxx
+            intercept = mean_y - slope * mean_x
+            sse = sum((yi - intercept - slope * xi) ** 2 for xi, yi in zip(x, y))
+            if best is None or sse < best["sse"]:
+                best = {"kind": kind, "n": n, "intercept": intercept, "slope": slope, "mean_x": mean_x, "sxx": sxx, "sse": sse}
+        # the prior counts as one more residual, so two points, which fit any line exactly, are not taken as exact
+        best["variance"] = (best.pop("sse") + self.prior_spread ** 2) / (n - 1)
+        return best
+
+    def __predict_log_demand(self, fit: dict, load: int) -> tuple[float, float]:
+        x = float(load) if fit["kind"] == "exponential" else math.log(load) if fit["kind"] == "power" else 0.0
+        variance = fit["variance"] * (1 / fit["n"] + ((x - fit["mean_x"]) ** 2 / fit["sxx"] if fit["sxx"] else 0.0))
+        return fit["intercept"] + fit["slope"] * x, variance
+
+    def __fit_capacity_constant(self, demand_fit: dict | None) -> tuple[float, float] | None:
+        """
+        Estimates log k from the maxima found, each one times the fitted service demand of its load.
+        :return: The mean of log k and its variance, None before a search found a maximum.
+        """
+        if demand_fit is None:
+            return None
+        log_k = [
+            math.log(entry["request_per_second"]) + self.__predict_log_demand(demand_fit, load)[0]
+            for load, entry in self.capacities.items()
+            if entry["request_per_second"] > 0
+        ]
+        if not log_k:
+            return None
+        m = len(log_k)
+        mean = sum(log_k) / m
+        variance = (sum((value - mean) ** 2 for value in log_k) + self.prior_spread ** 2) / m
+        # the constant of a new load varies as much as the ones seen, not only as much as their mean
+        return mean, variance * (1 + 1 / m)
@@ -0,0 +1,237 @@
+import matplotlib
+# charts are only ever written to files, also from worker processes without a display
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
+import numpy as np
+import io
+from downsampling import LatencyHistogram, lttb
+
+# longest series drawn as is; longer ones are downsampled with LTTB
+MAX_SERIES_POINTS = 2000
+
+def cpu_usage_compare_chart(cpu_per_host: dict, output, dpi: int = 300):
+    """
+    Grouped bars of the average CPU usage of each host in each benchmark.
+    :param cpu_per_host: The result of DataAnalysisService.cpu_usage_compare.
+    :param output: File name or binary file the PNG is written to.
+    :param dpi: Resolution of the PNG.
+    """
+    _usage_compare_chart(cpu_per_host, 'cpu', 1, '%.2f%%', 'Uso Médio de CPU (usr) %', output, dpi)
+
+def ram_usage_compare_chart(ram_per_host: dict, output, dpi: int = 300):
+    """
+    Grouped bars of the average RAM usage of each host in each benchmark.
+    :param ram_per_host: The result of DataAnalysisService.ram_usage_compare.
+    :param output: File name or binary file the PNG is written to.
+    :param dpi: Resolution of the PNG.
+    """
+    _usage_compare_chart(ram_per_host, 'ram', 1024, '%.1f MB', 'Uso Médio de RAM (MB)', output, dpi)
+
+def _usage_compare_chart(usage_per_host: dict, key: str, divisor: float, label_format: str, ylabel: str, output, dpi: int):
+    # 2. Preparar os dados para o gráfico
+    hosts = list(usage_per_host.keys())
+    n_groups = len(hosts)
+    index = np.arange(n_groups)
+
+    # Pega os nomes dos benchmarks (k3s, k0s, etc.) do primeiro host
+    benchmark_names = list(usage_per_host[hosts[0]].keys())
+    n_benchmarks = len(benchmark_names)
+
+    # Define a largura das barras
+    total_bar_width = 0.8  # Largura total para o grupo de barras
+    single_bar_width = total_bar_width / n_benchmarks
+
+    # 3. Criar a figura e os eixos
+    fig, ax = plt.subplots(figsize=(12, 7))
+
+    # 4. Criar as barras agrupadas
+    for i, benchmark_name in enumerate(benchmark_names):
+        # Calcula a posição de cada barra no grupo
+        bar_positions = [pos - (total_bar_width / 2) + (i * single_bar_width) + (single_bar_width / 2) for pos in index]
+
+        # Coleta os valores de uso e RPS separadamente
+        values = [usage_per_host[host][benchmark_name][key] / divisor for host in hosts]
+        rps_values = [usage_per_host[host][benchmark_name]['rps'] for host in hosts]
+
+        # Plota as barras usando os valores de uso
+        rects = ax.bar(bar_positions, values, single_bar_width, label=benchmark_name)
+
+        # 1. Adiciona o rótulo do uso ACIMA da barra
+        ax.bar_label(rects, padding=3, fmt=label_format)
+
+        # 2. Adiciona o rótulo de RPS DENTRO da barra
+        for j, rect in enumerate(rects):
+            height = rect.get_height()
+            # Só adiciona o texto se a barra for alta o suficiente
+            if height > (ax.get_ylim()[1] * 0.1): # Se for > 10% da altura do gráfico
+                ax.text(
+                    rect.get_x() + rect.get_width() / 2, # Posição X (centro da barra)
+                    height / 2,                          # Posição Y (meio da barra)
+                    f"{rps_values[j]} RPS",              # O texto (ex: "5 RPS")
+                    ha='center',
+                    va='center',
+                    color='white',
+                    fontsize=8,
+                    fontweight='bold'
+                )
+
+    # 5. Configurar o gráfico (Títulos, Legendas, etc.)
+    ax.set_ylabel(ylabel)
+    ax.set_xticks(index)
+    ax.set_xticklabels(hosts)
+    ax.legend(title='Distribuição')
+    ax.yaxis.grid(True, linestyle=':', alpha=0.7)
+    ax.set_ylim(bottom=0, top=ax.get_ylim()[1] * 1.15) # Aumenta o teto em 15%
+
+    fig.tight_layout()
+    # 6. Salvar o arquivo
+    _save(fig, output, dpi)
+
+def response_time_violin_chart(response_time_data: dict, output, dpi: int = 300):
+    """
+    Violin plot of the response times of each benchmark.
+    The violins are drawn from a LatencyHistogram of each benchmark, so the time and memory taken do not grow with the number of requests.
+    :param response_time_data: The result of DataAnalysisService.response_time_compare, whose response_times may already be LatencyHistograms.
+    :param output: File name or binary file the PNG is written to.
+    :param dpi: Resolution of the PNG.
+    """
+    # Preparar os dados para o violin plot
+    labels = list(response_time_data.keys())
+    histograms = [
+        data['response_times'] if isinstance(data['response_times'], LatencyHistogram) else LatencyHistogram.from_values(data['response_times'])
+        for data in response_time_data.values()
+    ]
+
+    # Configurar o violin plot
+    fig, ax = plt.subplots(figsize=(12, 8))
+
+    # Criar o violin plot
+    parts = ax.violin([histogram.violin_stats() for histogram in histograms], positions=range(len(labels)),
+                      showmeans=True, showmedians=True, showextrema=True)
+
+    # Personalizar as cores
+    colors = plt.cm.Set3(np.linspace(0, 1, len(labels)))
+    for pc, color in zip(parts['bodies'], colors):
+        pc.set_facecolor(color)
+        pc.set_alpha(0.7)
+
+    # Configurar estilo das linhas
+    parts['cmeans'].set_color('red')
+    parts['cmeans'].set_linewidth(2)
+    parts['cmedians'].set_color('black')
+    parts['cmedians'].set_linewidth(2)
+
+    # Adicionar estatísticas como texto
+    for i, (histogram, data) in enumerate(zip(histograms, response_time_data.values())):
+        # Adicionar texto com estatísticas incluindo RPS
+        ax.text(i, histogram.high * 1.05,
+               f'Mean: {histogram.mean:.3f}s\nMedian: {histogram.median:.3f}s\nStd: {histogram.std:.3f}s\nRPS: {data["rps"]}',
+               ha='center', va='bottom', fontsize=9,
+               bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8))
+
+    # Configurar o gráfico
+    ax.set_ylabel('Tempo de Resposta (segundos)')
+    ax.set_xlabel('Distribuições')
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=45 if len(max(labels, key=len)) > 8 else 0)
+    ax.yaxis.grid(True, linestyle=':', alpha=0.7)
+    ax.set_ylim(bottom=0)
+
+    # Adicionar legenda personalizada
+    legend_elements = [
+        Line2D([0], [0], color='red', lw=2, label='Média'),
+        Line2D([0], [0], color='black', lw=2, label='Mediana')
+    ]
+    ax.legend(handles=legend_elements, loc='upper right')
+
+    fig.tight_layout()
+    # Salvar o arquivo
+    _save(fig, output, dpi)
+
+def throughput_load_chart(curves: dict[str, list[dict]], output, dpi: int = 300):
+    """
+    Maximum requests per second and average response time against the load, one curve per benchmark.
+    :param curves: Benchmark name mapped to the result of DataAnalysisService.avg_response_time_benchmark.
+    :param output: File name or binary file the PNG is written to.
+    :param dpi: Resolution of the PNG.
+    """
+    fig, (rps_ax, time_ax) = plt.subplots(2, 1, figsize=(12, 9), sharex=True)
+    for benchmark_name, entries in curves.items():
+        entries = sorted(entries, key=lambda entry: entry['load'])
+        loads = [entry['load'] for entry in entries]
+        rps_ax.plot(loads, [entry['rps'] for entry in entries], marker='o', label=benchmark_name)
+        time_ax.plot(loads, [entry['avg_response_time'] for entry in entries], marker='o', label=benchmark_name)
+    rps_ax.set_ylabel('Requisições por segundo')
+    rps_ax.legend(title='Distribuição')
+    time_ax.set_ylabel('Tempo Médio de Resposta (segundos)')
+    time_ax.set_xlabel('Carga')
+    for ax in (rps_ax, time_ax):
+        ax.yaxis.grid(True, linestyle=':', alpha=0.7)
+        ax.set_ylim(bottom=0)
+    fig.tight_layout()
+    _save(fig, output, dpi)
+
+def timeline_chart(columns: dict[str, np.ndarray], title: str, output, dpi: int = 300):
+    """
+    Latency percentiles, throughput and the busy CPU of each host of one execution over time.
+    :param columns: The columns of a Timeline.
+    :param title: Title of the chart.
+    :param output: File name or binary file the PNG is written to.
+    :param dpi: Resolution of the PNG.
+    """
+    time = columns['time']
+    fig, (latency_ax, rps_ax, cpu_ax) = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
+    for name in ('latency_p50', 'latency_p99'):
+        latency_ax.plot(*_downsample(time, columns[name]), label=name.replace('latency_', ''))
+    latency_ax.set_ylabel('Tempo de Resposta (segundos)')
+    latency_ax.legend(loc='upper right')
+    rps_ax.plot(*_downsample(time, columns['sent_rps']), label='enviadas')
+    rps_ax.plot(*_downsample(time, columns['throughput_rps']), label='completadas')
+    rps_ax.set_ylabel('Requisições por segundo')
+    rps_ax.legend(loc='upper right')
+    for name, values in columns.items():
+        if name.endswith('.cpu_busy'):
+            # monitoring samples are sparser than the windows: connect the windows that have one
+            cpu_ax.plot(*lttb(time, values, MAX_SERIES_POINTS), marker='.', label=name.removesuffix('.cpu_busy'))
+    cpu_ax.set_ylabel('CPU ocupada %')
+    cpu_ax.set_xlabel('Tempo (segundos)')
+    if cpu_ax.lines:
+        cpu_ax.legend(loc='upper right')
+    for ax in (latency_ax, rps_ax, cpu_ax):
+        ax.yaxis.grid(True, linestyle=':', alpha=0.7)
+    fig.suptitle(title)
+    fig.tight_layout()
+    _save(fig, output, dpi)
+
+CHARTS = {
+    'cpu-usage-compare': cpu_usage_compare_chart,
+    'ram-usage-compare': ram_usage_compare_chart,
+    'response-time-compare': response_time_violin_chart,
+    'throughput-load': throughput_load_chart,
+    'timeline': timeline_chart,
+}
+
+def render_png(kind: str, dpi: int, *args) -> bytes:
+    """
+    Renders a chart to PNG bytes, so worker processes can hand it back to the parent.
+    :param kind: One of CHARTS.
+    :param dpi: Resolution of the PNG.
+    :param args: The data arguments of the chart function.
+    :return: The PNG.
+    """
+    buffer = io.BytesIO()
+    CHARTS[kind](*args, output=buffer, dpi=dpi)
+    return buffer.getvalue()
+
+def _downsample(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsamples a long series with LTTB, keeping the gaps of short ones as they are.
+    """
+    if len(x) <= MAX_SERIES_POINTS:
+        return x, y
+    return lttb(x, y, MAX_SERIES_POINTS)
+
+def _save(fig, output, dpi: int):
+    fig.savefig(output, dpi=dpi, format='png', bbox_inches='tight')
+    plt.close(fig)
@@ -1,392 +1,545 @@
 import argparse
 import asyncio
-from html import parser
-from benchmark_service import BenchmarkService
-from cluster_service import ClusterService
-from test_execution_service import TestExecutionService
+import sys
 from json_storage_service import JsonStorageService
-from get_cluster_from_config import get_cluster_from_config
 from test_case import TestCase
+from in_flight_limit import POLICIES as IN_FLIGHT_POLICIES
+from queueing_model import DISTRIBUTIONS
 import logging
+import runtime
 from datetime import datetime
 
+# Every service is a subcommand whose handler imports the modules it needs (SSH, HTTP client,
+# numpy, matplotlib) when it runs, so starting the CLI only costs argparse and these modules.
+
+ANALYSIS_TYPES = ('avg-response-time', 'min-response-time', 'max-response-time', 'ram-usage', 'cpu-usage', 'cpu-usage-compare', 'ram-usage-compare', 'response-time-compare', 'timeline', 'regression')
+
 logging.basicConfig(level=logging.INFO)
 def parse_test_case(app_url:str,test_case:str)->TestCase:
-    match test_case:
-        case "fibonacci":
-            from fibonacci_test import FibonacciTest
-            return FibonacciTest(application_base_url=app_url)
-        case "bubble-sort":
-            from bubble_sort_test import BubbleSortTest
-            return BubbleSortTest(application_base_url=app_url)
-        case _:
-            raise ValueError(f"Unknown test case: {test_case}. Supported cases are: fibonacci, bubble-sort.")
-
-async def main():
-    parser = argparse.ArgumentParser(description="Run the benchmark service.")
-    
+    from test_case_registry import create_test_case
+    return create_test_case(test_case, app_url)
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the parser of the CLI, one subcommand per service.
+    :return: The parser.
+    """
     path = '/'.join(__file__.split('/')[0:-1])
 
-    parser.add_argument('service', type=str, help='Service to run: benchmark, test-execution, data-analysis.')
-    parser.add_argument('--storage', type=str, default=path+"/../db/", help='Path to the storage directory.')
-    parser.add_argument('--config', type=str, default="config.json", help='Path to the configuration file.')
-    parser.add_argument('--monitoring-interval', type=float, default=0.5, help='Interval for monitoring in seconds.')
-    parser.add_argument('--duration-per-test', type=int, default=30, help='Duration of each test in seconds.')
-    parser.add_argument('--test-cases', default=['fibonacci','bubble-sort'], type=str, nargs='+', help='List of test cases to run. For test-execution, only one test case is allowed.')
-    parser.add_argument('--max-response-time', type=float, default=2.0, help='benchmark only: Maximum acceptable response time in seconds.')
-    parser.add_argument('--max-n-loads-to-test', type=int, default=3, help='benchmark only: Maximum number of loads to test.')
-    parser.add_argument('--min-requests-per-second', type=int, default=1, help='benchmark only: Minimum requests per second to test.')
-    parser.add_argument('--rest-time', type=int, default=30, help='benchmark only: Rest time between tests in seconds.')
-    parser.add_argument('--load', type=int, default=1, help='test-execution and data-analysis only: Load to apply during the test. For data-analysis, is the load to be compared.')
-    parser.add_argument('--requests-per-second', type=int, default=1, help='test-execution only: Requests per second to apply during the test.')
-    parser.add_argument('--files', type=str, nargs='+', help='data-analysis only: List of benchmark files to analyze.')
-    parser.add_argument('--alias-hosts', type=str, nargs='+', help='data-analysis only: List of alias hosts for comparison. example: 192.168.1.2:us-east,192.168.1.3:us-west')
-    parser.add_argument('--benchmark-names', default=[], type=str, nargs='+', help='data-analysis only: List of benchmark names for comparison.')
-    parser.add_argument('analysis_type', type=str, nargs='?', help='data-analysis only: Type of analysis to perform: avg-response-time, ram-usage-load.')
-
-    args = parser.parse_args()
-    service = args.service.lower()
-    storage_service = JsonStorageService(args.storage)
+    parser = argparse.ArgumentParser(description="Run the benchmark service.")
+    subparsers = parser.add_subparsers(dest='service', required=True, metavar='service', help='Service to run.')
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--storage', type=str, default=path+"/../db/", help='Path to the storage directory.')
+    common.add_argument('--config', type=str, default="config.json", help='Path to the configuration file.')
+    common.add_argument('--event-loop', type=str, default='asyncio', choices=runtime.EVENT_LOOPS, help='Event loop used by the load generator. Falls back to asyncio when uvloop is not installed.')
+    common.add_argument('--json-codec', type=str, default='json', choices=runtime.JSON_CODECS, help='JSON decoder used for responses. Falls back to json when orjson is not installed.')
+
+    # how requests are sent, shared by every service that sends them
+    sending = argparse.ArgumentParser(add_help=False)
+    sending.add_argument('--no-clock-correction', action='store_true', help='Keep the server timestamps of the results on the server clock instead of correcting them by the clock offset estimated from the requests.')
+    sending.add_argument('--max-in-flight', type=int, default=None, help='Maximum number of requests in flight. Unlimited by default.')
+    sending.add_argument('--in-flight-policy', type=str, default='drop', choices=IN_FLIGHT_POLICIES, help='What happens to a request scheduled while --max-in-flight requests are in flight: drop it, queue it for at most --max-queue-delay seconds, or abort the probe.')
+    sending.add_argument('--max-queue-delay', type=float, default=1.0, help='Longest time a request waits for an in-flight slot with --in-flight-policy queue, in seconds.')
+
+    load_generation = argparse.ArgumentParser(add_help=False, parents=[sending])
+    load_generation.add_argument('--monitoring-interval', type=float, default=0.5, help='Interval for monitoring in seconds.')
+    load_generation.add_argument('--duration-per-test', type=int, default=30, help='Duration of each test in seconds.')
+    load_generation.add_argument('--warm-up', type=float, default=0.0, help='Warm-up period at the start of each test in seconds. Its results are saved separately and excluded from the response time decisions.')
+    load_generation.add_argument('--steady-state-detection', action='store_true', help='Detect the end of the warm-up of each test from windowed latency and throughput instead of using --warm-up.')
+    load_generation.add_argument('--test-cases', default=['fibonacci','bubble-sort'], type=str, nargs='+', help='List of test cases to run. For test-execution, only one test case is allowed.')
+    load_generation.add_argument('--mix', type=str, nargs='+', default=None, help='Run a weighted mix of test cases as a single test case instead of --test-cases, as name@load:weight entries. example: fibonacci@15:0.8 bubble-sort@12:0.2')
+    load_generation.add_argument('--scenarios', type=str, nargs='+', default=[], help='YAML scenario files whose scenarios are added to the test cases selectable with --test-cases.')
+    load_generation.add_argument('--max-error-rate', type=float, default=0.0, help='Highest share of failed requests a probe may have and still be acceptable, e.g. 0.01 for 1%%. By default any error fails the probe.')
+    load_generation.add_argument('--metrics-port', type=int, default=None, help='Serve live metrics in the OpenMetrics format at http://HOST:PORT/metrics while the service runs. With several clusters, each worker serves on the following ports, in configuration order.')
+    load_generation.add_argument('--metrics-host', type=str, default='127.0.0.1', help='Interface the metrics endpoint binds.')
+    load_generation.add_argument('--dashboard', action='store_true', help='Show a live terminal view of the running benchmark instead of following the log.')
+    load_generation.add_argument('--dashboard-interval', type=float, default=1.0, help='Time between dashboard redraws in seconds.')
+
+    comparison = argparse.ArgumentParser(add_help=False)
+    comparison.add_argument('--files', type=str, nargs='+', required=True, help='List of benchmark files to analyze.')
+    comparison.add_argument('--alias-hosts', type=str, nargs='+', help='List of alias hosts for comparison. example: 192.168.1.2:us-east,192.168.1.3:us-west')
+    comparison.add_argument('--benchmark-names', default=[], type=str, nargs='+', help='List of benchmark names for comparison.')
+    comparison.add_argument('--bucket-seconds', type=float, default=1.0, help='Length of the time windows results and cluster stats are aligned on, in seconds.')
+
+    search = argparse.ArgumentParser(add_help=False)
+    search.add_argument('--max-response-time', type=float, default=2.0, help='Maximum acceptable response time in seconds.')
+    search.add_argument('--max-n-loads-to-test', type=int, default=3, help='Maximum number of loads to test.')
+    search.add_argument('--min-requests-per-second', type=int, default=1, help='Minimum requests per second to test.')
+    search.add_argument('--rest-time', type=int, default=30, help='Rest time between tests in seconds.')
+    search.add_argument('--no-model-guided-search', action='store_true', help='Search the max requests per second of every load from scratch instead of starting from the bounds the capacity model predicts.')
+
+    queueing_model = argparse.ArgumentParser(add_help=False)
+    queueing_model.add_argument('--mock-servers', type=int, default=4, help='Number of requests served concurrently.')
+    queueing_model.add_argument('--mock-max-queue', type=int, default=None, help='Maximum number of waiting requests before answering 503. Unbounded by default.')
+    queueing_model.add_argument('--mock-base-service-time', type=float, default=0.001, help='Fixed service time of every request in seconds.')
+    queueing_model.add_argument('--mock-fibonacci-call-time', type=float, default=0.0005, help='Service time of each recursive fibonacci call in seconds.')
+    queueing_model.add_argument('--mock-bubble-sort-operation-time', type=float, default=2e-9, help='Service time of each bubble sort comparison in seconds.')
+    queueing_model.add_argument('--mock-distribution', type=str, default='deterministic', choices=DISTRIBUTIONS, help='Service time distribution, with the mean set by the other --mock options.')
+    queueing_model.add_argument('--mock-seed', type=int, default=None, help='Seed for the service time distribution.')
+
+    benchmark = subparsers.add_parser('benchmark', parents=[common, load_generation, search], help='Search the highest sustainable requests per second of each load and test case.')
+    benchmark.add_argument('--resume', action='store_true', help='Resume from the last checkpoint instead of repeating finished probes.')
+    benchmark.add_argument('--adaptive-cool-down', action='store_true', help='Wait between tests until CPU and memory return to the baseline, using --rest-time as the cap.')
+    benchmark.add_argument('--max-parallel-clusters', type=int, default=None, help='Maximum number of clusters benchmarked in parallel when the config describes several clusters. Defaults to all of them.')
+    benchmark.add_argument('--no-calibration', action='store_true', help='Ignore the calibration cache of the cluster and search every test case from scratch. The cache is still updated with the results.')
+    benchmark.set_defaults(handler=benchmark_command)
+
+    test_execution = subparsers.add_parser('test-execution', parents=[common, load_generation], help='Run one test case at a fixed load and rate while monitoring the cluster.')
+    test_execution.add_argument('--load', type=int, default=1, help='Load to apply during the test.')
+    test_execution.add_argument('--requests-per-second', type=int, default=1, help='Requests per second to apply during the test.')
+    test_execution.set_defaults(handler=test_execution_command)
+
+    data_analysis = subparsers.add_parser('data-analysis', parents=[common, comparison], help='Analyze saved benchmark files.')
+    data_analysis.add_argument('analysis_type', type=str, choices=ANALYSIS_TYPES, metavar='analysis_type', help=f'Type of analysis to perform: {", ".join(ANALYSIS_TYPES)}.')
+    data_analysis.add_argument('--load', type=int, default=1, help='Load to be compared.')
+    data_analysis.add_argument('--max-lag', type=int, default=5, help='timeline only: Largest shift, in windows, tried when correlating host metrics with latency.')
+    data_analysis.add_argument('--alpha', type=float, default=0.05, help='regression only: Significance level of the statistical tests.')
+    data_analysis.add_argument('--regression-threshold', type=float, default=0.05, help='regression only: Smallest relative change of latency or max RPS reported, e.g. 0.05 for 5%%.')
+    data_analysis.add_argument('--bootstrap-samples', type=int, default=2000, help='regression only: Number of bootstrap resamples.')
+    data_analysis.add_argument('--seed', type=int, default=None, help='regression only: Seed of the bootstrap, for reproducible reports.')
+    data_analysis.set_defaults(handler=data_analysis_command)
+
+    report = subparsers.add_parser('report', parents=[common, comparison], help='Render every chart comparing benchmark files into one HTML file.')
+    report.add_argument('--report-loads', type=int, nargs='+', default=None, help='Loads compared. Defaults to the loads found in every file.')
+    report.add_argument('--report-workers', type=int, default=None, help='Maximum number of processes rendering charts. Defaults to the number of CPUs.')
+    report.add_argument('--report-dpi', type=int, default=150, help='Resolution of the charts.')
+    report.set_defaults(handler=report_command)
+
+    mock_server = subparsers.add_parser('mock-server', parents=[common, queueing_model], help='Serve a simulated application with a queueing model.')
+    mock_server.add_argument('--mock-host', type=str, default='127.0.0.1', help='Interface to bind.')
+    mock_server.add_argument('--mock-port', type=int, default=8080, help='Port to bind.')
+    mock_server.set_defaults(handler=mock_server_command)
+
+    simulate = subparsers.add_parser('simulate', parents=[common, search, queueing_model], help='Run the benchmark offline against a queueing model on virtual time, to measure the searches.')
+    simulate.add_argument('--test-cases', default=['fibonacci', 'bubble-sort'], type=str, nargs='+', help='Simulated test cases, by how their service time scales with the load: fibonacci, bubble-sort, linear.')
+    simulate.add_argument('--duration-per-test', type=int, default=30, help='Duration of each test in simulated seconds.')
+    simulate.add_argument('--max-error-rate', type=float, default=0.0, help='Highest share of failed requests a probe may have and still be acceptable, e.g. 0.01 for 1%%. By default any error fails the probe.')
+    simulate.add_argument('--calibration', action='store_true', help='Start the searches from the calibration cache of the simulated cluster, as a benchmark does, and update it.')
+    simulate.set_defaults(handler=simulate_command)
+
+    self_benchmark = subparsers.add_parser('self-benchmark', parents=[common, sending], help='Measure the load generator itself against an in-process mock application.')
+    self_benchmark.add_argument('--self-benchmark-rates', type=int, nargs='+', default=[25, 50, 100, 200, 400], help='Requests per second to sweep.')
+    self_benchmark.add_argument('--self-benchmark-concurrency', type=int, nargs='+', default=[1, 10, 100], help='Numbers of requests in flight to sweep.')
+    self_benchmark.add_argument('--self-benchmark-duration', type=int, default=5, help='Duration of each run in seconds.')
+    self_benchmark.set_defaults(handler=self_benchmark_command)
+
+    return parser
+
+def load_generation_options(args: argparse.Namespace) -> tuple[dict, object]:
+    """
+    Loads the scenario files and builds the options shared by the services generating load.
+    :param args: The parsed arguments.
+    :return: The keyword arguments of TestExecutionService and the SteadyStateDetector, None without a warm-up.
+    """
+    from test_case_registry import load_scenarios
+    for scenario_file in args.scenarios:
+        load_scenarios(scenario_file)
+    steady_state_detector = None
+    if args.warm_up > 0 or args.steady_state_detection:
+        from steady_state_detector import SteadyStateDetector
+        steady_state_detector = SteadyStateDetector(warm_up_seconds=args.warm_up, automatic=args.steady_state_detection)
+    test_execution_options = dict(
+        sending_options(args),
+        max_error_rate=args.max_error_rate,
+    )
+    return test_execution_options, steady_state_detector
+
+def sending_options(args: argparse.Namespace) -> dict:
+    """
+    Builds the options controlling how requests are sent.
+    :param args: The parsed arguments.
+    :return: The keyword arguments of TestExecutionService limiting the requests in flight and correcting the clock.
+    """
+    return dict(
+        max_in_flight=args.max_in_flight,
+        in_flight_policy=args.in_flight_policy,
+        max_queue_delay=args.max_queue_delay,
+        correct_clock_offset=not args.no_clock_correction,
+    )
+
+async def start_live_view(args: argparse.Namespace) -> tuple:
+    """
+    Starts the metrics endpoint and the dashboard when they were asked for.
+    :param args: The parsed arguments.
+    :return: The MetricsRegistry, the Dashboard and its task, each None when not used.
+    """
+    metrics = None
+    if args.metrics_port is not None or args.dashboard:
+        from metrics import MetricsRegistry
+        metrics = MetricsRegistry()
+    if args.metrics_port is not None:
+        from metrics import MetricsServer
+        await MetricsServer(metrics, host=args.metrics_host, port=args.metrics_port).start()
+    dashboard, dashboard_task = None, None
+    if args.dashboard:
+        from dashboard import Dashboard
+        dashboard = Dashboard(metrics, refresh_interval=args.dashboard_interval)
+        dashboard_task = asyncio.create_task(dashboard.run())
+    return metrics, dashboard, dashboard_task
+
+async def stop_live_view(dashboard, dashboard_task):
+    if dashboard:
+        await dashboard.stop()
+        await dashboard_task
+
+def parse_alias_hosts(alias_hosts: list[str] | None) -> dict[str, str]:
+    """
+    Parses original_host:alias entries.
+    :param alias_hosts: The entries given with --alias-hosts.
+    :return: The alias of each host.
+    """
+    aliases = {}
+    for alias in alias_hosts or []:
+        parts = alias.split(':')
+        if len(parts) != 2:
+            raise ValueError(f"Invalid alias host format: {alias}. Expected format is 'original_host:alias'.")
+        original_host, alias_name = parts
+        aliases[original_host] = alias_name
+    return aliases
+
+async def benchmark_command(args: argparse.Namespace, storage_service: JsonStorageService) -> int | None:
+    from multi_cluster_benchmark_service import MultiClusterBenchmarkService
+    from get_cluster_from_config import get_cluster_configs_from_config
+    cluster_configs = get_cluster_configs_from_config(storage_service.load(args.config))
+    test_execution_options, steady_state_detector = load_generation_options(args)
+    metrics, dashboard, dashboard_task = await start_live_view(args)
+    benchmark_options = dict(
+        duration_per_test=args.duration_per_test,
+        rest_time=args.rest_time,
+        max_response_time=args.max_response_time,
+        max_n_loads_to_test=args.max_n_loads_to_test,
+        model_guided_search=not args.no_model_guided_search,
+        calibration=not args.no_calibration,
+    )
+
+    failures = {}
+    if len(cluster_configs) == 1:
+        await MultiClusterBenchmarkService.benchmark_cluster(
+            cluster_config=cluster_configs[0],
+            test_case_names=args.test_cases,
+            storage_service=storage_service,
+            mix=args.mix,
+            metrics=metrics,
+            test_execution_options=test_execution_options,
+            resume=args.resume,
+            adaptive_cool_down=args.adaptive_cool_down,
+            steady_state_detector=steady_state_detector,
+            **benchmark_options
+        )
+    else:
+        if dashboard:
+            logging.warning("The dashboard only follows single-cluster benchmarks; use --metrics-port to follow each parallel cluster.")
+        print(f"Benchmarking {len(cluster_configs)} clusters in parallel: {', '.join(config['app']['name'] for config in cluster_configs)}")
+        saved_files, failures = await MultiClusterBenchmarkService(
+            storage_path=args.storage,
+            max_parallel_clusters=args.max_parallel_clusters,
+        ).run_benchmarks(
+            cluster_configs=cluster_configs,
+            test_case_names=args.test_cases,
+            scenario_files=args.scenarios,
+            mix=args.mix,
+            metrics_host=args.metrics_host,
+            metrics_port=args.metrics_port + 1 if args.metrics_port is not None else None,
+            test_execution_options=test_execution_options,
+            resume=args.resume,
+            adaptive_cool_down=args.adaptive_cool_down,
+            steady_state_detector=steady_state_detector,
+            **benchmark_options
+        )
+        for cluster_name, files in saved_files.items():
+            print(f"Cluster {cluster_name}: {', '.join(files)}")
+        for cluster_name, error in failures.items():
+            print(f"Cluster {cluster_name} failed: {error}")
+        if failures:
+            print(f"{len(failures)} of {len(cluster_configs)} clusters failed: {', '.join(failures)}")
+    await stop_live_view(dashboard, dashboard_task)
+    # a single cluster that fails raises, which exits non-zero as well
+    if failures:
+        return 1
+
+async def test_execution_command(args: argparse.Namespace, storage_service: JsonStorageService):
+    from cluster_service import ClusterService
+    from test_execution_service import TestExecutionService
+    from get_cluster_from_config import get_cluster_from_config
     config_data = storage_service.load(args.config)
-    
-
-    match service:
-        case "benchmark":
-            cluster = get_cluster_from_config(config_data)
-            cluster_service = ClusterService()
-            benchmark_service = BenchmarkService(
-                test_execution_service=TestExecutionService(cluster_service=cluster_service),
-            )
-            args = parser.parse_args()
-            test_cases = [parse_test_case(config_data['app']['url'], test_case) for test_case in args.test_cases]
-
-            for test_case in test_cases:
-                print(f"Running benchmark for test case: {test_case.__class__.__name__}")
-
-            benchmarks = await benchmark_service.run_benchmark(
-                test_cases=test_cases,
-                cluster=cluster,
-                duration_per_test=args.duration_per_test,
-                rest_time=args.rest_time,
-                max_response_time=args.max_response_time,
-                max_n_loads_to_test=args.max_n_loads_to_test,
-            )
-            for benchmark in benchmarks:
-
-                file_name = f"{benchmark.cluster.name}-{benchmark.test_case.get_name()}-{datetime.now().strftime('%Y%m%d_%H%M%S')}_benchmark.json"
-                print(f"Benchmark completed. Saving results to {file_name} in {args.storage}") 
-                
-                storage_service.save(
-                    file_name=file_name,
-                    data=benchmark.to_json()  # Save the benchmark in a short JSON format
+    test_execution_options, steady_state_detector = load_generation_options(args)
+    cluster = get_cluster_from_config(config_data)
+    if args.mix:
+        from mix_test_case import parse_mix
+        test_cases = [parse_mix(args.mix, config_data['app']['url'])]
+    else:
+        test_cases = [parse_test_case(config_data['app']['url'], test_case) for test_case in args.test_cases]
+    if len(test_cases) != 1:
+        raise ValueError("Test execution service can only run one test case at a time.")
+    test_case = test_cases[0]
+    metrics, dashboard, dashboard_task = await start_live_view(args)
+    test_execution_service = TestExecutionService(cluster_service=ClusterService(), steady_state_detector=steady_state_detector, metrics=metrics, **test_execution_options)
+    print(f"Running test execution for test case: {test_case.__class__.__name__}")
+    test_execution = await test_execution_service.execute_test_while_monitoring(
+        test_case=test_case,
+        cluster=cluster,
+        duration_seconds=args.duration_per_test,
+        monitoring_interval=args.monitoring_interval,
+        load=args.load,
+        request_per_second=args.requests_per_second,
+    )
+    file_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_test_execution.json"
+    print(f"Test execution completed. Saving results to {file_name} in {args.storage}")
+    if test_execution.has_errors():
+        print(f"Test execution encountered errors: {test_execution.errors}")
+    storage_service.save(
+        file_name=file_name,
+        data=test_execution.to_short_json()  # Save the test case in a short JSON format
+    )
+    await stop_live_view(dashboard, dashboard_task)
+
+async def data_analysis_command(args: argparse.Namespace, storage_service: JsonStorageService) -> int | None:
+    from data_analysis_service import DataAnalysisService
+    data_analysis_service = DataAnalysisService(storage_service=storage_service)
+    exit_code = None
+    match args.analysis_type:
+        case "avg-response-time":
+            for file in args.files:
+                print(f"Analyzing average response time for benchmark file: {file}")
+                results = data_analysis_service.avg_response_time_benchmark(file)
+                print(f"Results for {file}:")
+                for result in results:
+                    print(f"Load: {result['load']}, Avg Response Time: {result['avg_response_time']:.4f} seconds over {result['total_requests']} requests (at {result['rps']} RPS)")
+        case "min-response-time":
+            for file in args.files:
+                print(f"Analyzing minimum response time for benchmark file: {file}")
+                results = data_analysis_service.min_response_time_benchmark(file)
+                print(f"Results for {file}:")
+                for result in results:
+                    print(f"Load: {result['load']}, Min Response Time: {result['min_response_time']:.4f} seconds (at {result['rps']} RPS)")
+        case "max-response-time":
+            for file in args.files:
+                print(f"Analyzing maximum response time for benchmark file: {file}")
+                results = data_analysis_service.max_response_time_benchmark(file)
+                print(f"Results for {file}:")
+                for result in results:
+                    print(f"Load: {result['load']}, Max Response Time: {result['max_response_time']:.4f} seconds (at {result['rps']} RPS)")
+        case "ram-usage":
+            for file in args.files:
+                print(f"Analyzing RAM usage for benchmark file: {file}")
+                results = data_analysis_service.ram_usage_benchmark(file)
+                print(f"Results for {file}:")
+                for result in results:
+                    print(f"Load: {result['load']}(at {result['rps']} RPS)")
+                    for host, ram_usage in result['avg_ram_usage'].items():
+                        print(f"    Host: {host}, Avg RAM Usage: {ram_usage / 1024:.2f} MB")
+
+        case "cpu-usage":
+            cpu_per_file = data_analysis_service.cpu_usage_files(args.files)
+            
+            for file, results in cpu_per_file.items():
+                print(f"Results for {file}:")
+                for result in results:
+                    print(f"Load: {result['load']}(at {result['rps']} RPS)")
+                    for host, cpu_usage in result['avg_cpu_usage'].items():
+                        print(f"    Host: {host}, Avg CPU Usage: {cpu_usage:.2f} %")
+
+        case "cpu-usage-compare":
+            alias_hosts = parse_alias_hosts(args.alias_hosts)
+            cpu_per_host = data_analysis_service.cpu_usage_compare(args.files,args.load,alias_hosts,args.benchmark_names)
+
+            from charts import cpu_usage_compare_chart
+            output_filename = f'cpu_usage_comparison_load_{args.load}_files_{"_".join(args.benchmark_names) if args.benchmark_names else "_".join(args.files)}.png'
+            cpu_usage_compare_chart(cpu_per_host, output_filename)
+            print(f"Gráfico de comparação de CPU salvo como {output_filename}")
+
+        case "ram-usage-compare":
+            alias_hosts = parse_alias_hosts(args.alias_hosts)
+            ram_per_host = data_analysis_service.ram_usage_compare(args.files,args.load,alias_hosts,args.benchmark_names)
+
+            from charts import ram_usage_compare_chart
+            output_filename = f'ram_usage_comparison_load_{args.load}_{"_".join(args.benchmark_names) if args.benchmark_names else "_".join(args.files)}.png'
+            ram_usage_compare_chart(ram_per_host, output_filename)
+            print(f"Gráfico de comparação de RAM salvo como {output_filename}")
+        case "response-time-compare":
+            response_time_data = data_analysis_service.response_time_compare(args.files, args.load, args.benchmark_names)
+
+            from charts import response_time_violin_chart
+            output_filename = f'response_time_load_{args.load}_{"_".join(args.benchmark_names) if args.benchmark_names else "_".join(args.files)}.png'
+            response_time_violin_chart(response_time_data, output_filename)
+            print(f"Violin plot de tempos de resposta salvo como {output_filename}")
+        case "timeline":
+            import os
+            for file in args.files:
+                print(f"Aligning results and cluster stats on {args.bucket_seconds} s windows for benchmark file: {file}")
+                timelines = data_analysis_service.timeline_benchmark(file, args.bucket_seconds)
+                if not timelines:
+                    print(f"No execution of {file} was saved with its results.")
+                for i, entry in enumerate(timelines):
+                    timeline = entry['timeline']
+                    output_filename = f"{os.path.splitext(os.path.basename(file))[0]}_timeline_{i}.csv"
+                    timeline.to_csv(f"{args.storage}/{output_filename}")
+                    print(f"Load: {entry['load']} (at {entry['rps']} RPS): {len(timeline)} windows saved to {output_filename}")
+                    for correlation in timeline.correlate_with_hosts("latency_p99", args.max_lag)[:5]:
+                        print(f"    {correlation['metric']} vs latency p99: r={correlation['correlation']:.2f} at lag 0, r={correlation['best_correlation']:.2f} at {correlation['best_lag_seconds']:+g} s over {correlation['windows']} windows")
+        case "regression":
+            from regression import NOT_COMPARABLE
+            # a pipeline has to tell files that cannot be compared from a regression, which exits with 1 like a crash would
+            if len(args.files) != 2:
+                print("Regression analysis requires exactly two benchmark files: the baseline and the candidate.")
+                return NOT_COMPARABLE
+            baseline_file, candidate_file = args.files
+            print(f"Comparing candidate {candidate_file} with baseline {baseline_file} (alpha {args.alpha}, threshold {args.regression_threshold:.0%})")
+            try:
+                report = data_analysis_service.regression_compare(
+                    baseline_file, candidate_file,
+                    alpha=args.alpha,
+                    threshold=args.regression_threshold,
+                    bootstrap_samples=args.bootstrap_samples,
+                    seed=args.seed,
                 )
-        case "test-execution":
-            cluster = get_cluster_from_config(config_data)
-            cluster_service = ClusterService()
-            test_execution_service = TestExecutionService(cluster_service=cluster_service)
-            test_cases = [parse_test_case(config_data['app']['url'], test_case) for test_case in args.test_cases]
-            if len(test_cases) != 1:
-                raise ValueError("Test execution service can only run one test case at a time.")
-            test_case = test_cases[0]
-            print(f"Running test execution for test case: {test_case.__class__.__name__}")
-            test_execution = await test_execution_service.execute_test_while_monitoring(
-                test_case=test_case,
-                cluster=cluster,
-                duration_seconds=args.duration_per_test,
-                monitoring_interval=args.monitoring_interval,
-                load=args.load,
-                request_per_second=args.requests_per_second,
-            )
-            file_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_test_execution.json"
-            print(f"Test execution completed. Saving results to {file_name} in {args.storage}")
-            if test_execution.has_errors():
-                print(f"Test execution encountered errors: {test_execution.errors}")
-            storage_service.save(
-                file_name=file_name,
-                data=test_execution.to_short_json()  # Save the test case in a short JSON format
-            )
-        case "data-analysis":
-            from data_analysis_service import DataAnalysisService
-            data_analysis_service = DataAnalysisService(storage_service=storage_service)
-            if not args.files:
-                raise ValueError("Data analysis service requires at least one benchmark file to analyze.")
-            match args.analysis_type:
-                case "avg-response-time":
-                    for file in args.files:
-                        
-                        print(f"Analyzing average response time for benchmark file: {file}")
-                        results = data_analysis_service.avg_response_time_benchmark(file)
-                        print(f"Results for {file}:")
-                        for result in results:
-                            print(f"Load: {result['load']}, Avg Response Time: {result['avg_response_time']:.4f} seconds over {result['total_requests']} requests (at {result['rps']} RPS)")
-               
-                case "min-response-time":
-                    for file in args.files:
-                        print(f"Analyzing minimum response time for benchmark file: {file}")
-                        results = data_analysis_service.min_response_time_benchmark(file)
-                        print(f"Results for {file}:")
-                        for result in results:
-                            print(f"Load: {result['load']}, Min Response Time: {result['min_response_time']:.4f} seconds (at {result['rps']} RPS)")
-                case "max-response-time":
-                    for file in args.files:
-                        print(f"Analyzing maximum response time for benchmark file: {file}")
-                        results = data_analysis_service.max_response_time_benchmark(file)
-                        print(f"Results for {file}:")
-                        for result in results:
-                            print(f"Load: {result['load']}, Max Response Time: {result['max_response_time']:.4f} seconds (at {result['rps']} RPS)")
-                case "ram-usage":
-                    for file in args.files:
-                        print(f"Analyzing RAM usage for benchmark file: {file}")
-                        results = data_analysis_service.ram_usage_benchmark(file)
-                        print(f"Results for {file}:")
-                        for result in results:
-                            print(f"Load: {result['load']}(at {result['rps']} RPS)")
-                            for host, ram_usage in result['avg_ram_usage'].items():
-                                print(f"    Host: {host}, Avg RAM Usage: {ram_usage / 1024:.2f} MB")
-
-                case "cpu-usage":
-                    cpu_per_file = data_analysis_service.cpu_usage_files(args.files)
-                    
-                    for file, results in cpu_per_file.items():
-                        print(f"Results for {file}:")
-                        for result in results:
-                            print(f"Load: {result['load']}(at {result['rps']} RPS)")
-                            for host, cpu_usage in result['avg_cpu_usage'].items():
-                                print(f"    Host: {host}, Avg CPU Usage: {cpu_usage:.2f} %")
-
-                case "cpu-usage-compare":
-                    alias_hosts = {}
-                    if args.alias_hosts:
-                        for alias in args.alias_hosts:
-                            parts = alias.split(':')
-                            if len(parts) != 2:
-                                raise ValueError(f"Invalid alias host format: {alias}. Expected format is 'original_host:alias'.")
-                            original_host, alias_name = parts
-                            alias_hosts[original_host] = alias_name
-                    cpu_per_host = data_analysis_service.cpu_usage_compare(args.files,args.load,alias_hosts,args.benchmark_names)
-
-                    import matplotlib.pyplot as plt
-                    import numpy as np
-
-                    # 2. Preparar os dados para o gráfico
-                    hosts = list(cpu_per_host.keys())
-                    n_groups = len(hosts)
-                    index = np.arange(n_groups)
-
-                    # Pega os nomes dos benchmarks (k3s, k0s, etc.) do primeiro host
-                    benchmark_names = list(cpu_per_host[hosts[0]].keys())
-                    n_benchmarks = len(benchmark_names)
-
-                    # Define a largura das barras
-                    total_bar_width = 0.8  # Largura total para o grupo de barras
-                    single_bar_width = total_bar_width / n_benchmarks
-
-                    # 3. Criar a figura e os eixos
-                    fig, ax = plt.subplots(figsize=(12, 7))
-
-                    # 4. Criar as barras agrupadas
-                    for i, benchmark_name in enumerate(benchmark_names):
-                        # Calcula a posição de cada barra no grupo
-                        bar_positions = [pos - (total_bar_width / 2) + (i * single_bar_width) + (single_bar_width / 2) for pos in index]
-                        
-                        # --- CORREÇÃO AQUI ---
-                        # Coleta os valores de CPU e RPS separadamente
-                        cpu_values = [cpu_per_host[host][benchmark_name]['cpu'] for host in hosts]
-                        rps_values = [cpu_per_host[host][benchmark_name]['rps'] for host in hosts]
-                        
-                        # Plota as barras usando os valores de CPU
-                        rects = ax.bar(bar_positions, cpu_values, single_bar_width, label=benchmark_name)
-                        
-                        # --- RÓTULOS ATUALIZADOS ---
-                        
-                        # 1. Adiciona o rótulo da CPU (%) ACIMA da barra
-                        ax.bar_label(rects, padding=3, fmt='%.2f%%') # Adicionado '%%' para o símbolo %
-                        
-                        # 2. Adiciona o rótulo de RPS DENTRO da barra
-                        for j, rect in enumerate(rects):
-                            height = rect.get_height()
-                            # Só adiciona o texto se a barra for alta o suficiente
-                            if height > (ax.get_ylim()[1] * 0.1): # Se for > 10% da altura do gráfico
-                                ax.text(
-                                    rect.get_x() + rect.get_width() / 2, # Posição X (centro da barra)
-                                    height / 2,                          # Posição Y (meio da barra)
-                                    f"{rps_values[j]} RPS",              # O texto (ex: "5 RPS")
-                                    ha='center',
-                                    va='center',
-                                    color='white',
-                                    fontsize=8,
-                                    fontweight='bold'
-                                )
-
-                    # 5. Configurar o gráfico (Títulos, Legendas, etc.)
-                    ax.set_ylabel('Uso Médio de CPU (usr) %')
-                    ax.set_xticks(index)
-                    ax.set_xticklabels(hosts)
-                    ax.legend(title='Distribuição')
-                    ax.yaxis.grid(True, linestyle=':', alpha=0.7)
-                    ax.set_ylim(bottom=0, top=ax.get_ylim()[1] * 1.15) # Aumenta o teto em 15%
-
-                    plt.tight_layout()
-                    
-                    # 6. Salvar o arquivo
-                    output_filename = f'cpu_usage_comparison_load_{args.load}_files_{"_".join(args.benchmark_names) if args.benchmark_names else "_".join(args.files)}.png'
-                    plt.savefig(output_filename, dpi=300)
-                    print(f"Gráfico de comparação de CPU salvo como {output_filename}")
-
-                case "ram-usage-compare":
-                    alias_hosts = {}
-                    if args.alias_hosts:
-                        for alias in args.alias_hosts:
-                            parts = alias.split(':')
-                            if len(parts) != 2:
-                                raise ValueError(f"Invalid alias host format: {alias}. Expected format is 'original_host:alias'.")
-                            original_host, alias_name = parts
-                            alias_hosts[original_host] = alias_name
-                    ram_per_host = data_analysis_service.ram_usage_compare(args.files,args.load,alias_hosts,args.benchmark_names)
-
-                    import matplotlib.pyplot as plt
-                    import numpy as np
-
-                    
-
-                    # 2. Preparar os dados para o gráfico
-                    hosts = list(ram_per_host.keys())
-                    n_groups = len(hosts)
-                    index = np.arange(n_groups)
-
-                    benchmark_names = list(ram_per_host[hosts[0]].keys())
-                    n_benchmarks = len(benchmark_names)
-
-                    # Define a largura das barras
-                    total_bar_width = 0.8  # Largura total para o grupo de barras
-                    single_bar_width = total_bar_width / n_benchmarks
-
-                    # 3. Criar a figura e os eixos
-                    fig, ax = plt.subplots(figsize=(12, 7))
-
-                    # 4. Criar as barras agrupadas
-                    for i, benchmark_name in enumerate(benchmark_names):
-                        # Calcula a posição de cada barra no grupo
-                        bar_positions = [pos - (total_bar_width / 2) + (i * single_bar_width) + (single_bar_width / 2) for pos in index]
-                        
-                        # Coleta os valores de RAM e RPS separadamente
-                        ram_values = [ram_per_host[host][benchmark_name]['ram'] / 1024 for host in hosts]  # Converte para MB
-                        rps_values = [ram_per_host[host][benchmark_name]['rps'] for host in hosts]
-                        
-                        # Plota as barras usando os valores de RAM
-                        rects = ax.bar(bar_positions, ram_values, single_bar_width, label=benchmark_name)
-                        
-                        # 1. Adiciona o rótulo da RAM (MB) ACIMA da barra
-                        ax.bar_label(rects, padding=3, fmt='%.1f MB')
-                        
-                        # 2. Adiciona o rótulo de RPS DENTRO da barra
-                        for j, rect in enumerate(rects):
-                            height = rect.get_height()
-                            # Só adiciona o texto se a barra for alta o suficiente
-                            if height > (ax.get_ylim()[1] * 0.1): # Se for > 10% da altura do gráfico
-                                ax.text(
-                                    rect.get_x() + rect.get_width() / 2, # Posição X (centro da barra)
-                                    height / 2,                          # Posição Y (meio da barra)
-                                    f"{rps_values[j]} RPS",              # O texto (ex: "5 RPS")
-                                    ha='center',
-                                    va='center',
-                                    color='white',
-                                    fontsize=8,
-                                    fontweight='bold'
-                                )
-
-                    # 5. Configurar o gráfico (Títulos, Legendas, etc.)
-                    ax.set_ylabel('Uso Médio de RAM (MB)')
-                    ax.set_xticks(index)
-                    ax.set_xticklabels(hosts)
-                    ax.legend(title='Distribuição')
-                    ax.yaxis.grid(True, linestyle=':', alpha=0.7)
-                    ax.set_ylim(bottom=0, top=ax.get_ylim()[1] * 1.15) # Aumenta o teto em 15%
-
-                    plt.tight_layout()
-
-                    # 6. Salvar o arquivo
-                    output_filename = f'ram_usage_comparison_load_{args.load}_{"_".join(args.benchmark_names) if args.benchmark_names else "_".join(args.files)}.png'
-                    plt.savefig(output_filename, dpi=300)
-                    print(f"Gráfico de comparação de RAM salvo como {output_filename}")
-                case "response-time-compare":
-                    response_time_data = data_analysis_service.response_time_compare(args.files, args.load, args.benchmark_names)
-
-                    import matplotlib.pyplot as plt
-                    import numpy as np
-
-                    # Preparar os dados para o violin plot
-                    data_for_plot = []
-                    labels = []
-                    rps_values = []
-                    
-                    for benchmark_name, data in response_time_data.items():
-                        data_for_plot.append(data['response_times'])
-                        labels.append(benchmark_name)
-                        rps_values.append(data['rps'])
-
-                    # Configurar o violin plot
-                    fig, ax = plt.subplots(figsize=(12, 8))
-                    
-                    # Criar o violin plot
-                    parts = ax.violinplot(data_for_plot, positions=range(len(labels)), 
-                                         showmeans=True, showmedians=True, showextrema=True)
-                    
-                    # Personalizar as cores
-                    colors = plt.cm.Set3(np.linspace(0, 1, len(labels)))
-                    for pc, color in zip(parts['bodies'], colors):
-                        pc.set_facecolor(color)
-                        pc.set_alpha(0.7)
-                    
-                    # Configurar estilo das linhas
-                    parts['cmeans'].set_color('red')
-                    parts['cmeans'].set_linewidth(2)
-                    parts['cmedians'].set_color('black')
-                    parts['cmedians'].set_linewidth(2)
-                    
-                    # Adicionar estatísticas como texto
-                    for i, (benchmark_name, data) in enumerate(response_time_data.items()):
-                        response_times = data['response_times']
-                        rps = data['rps']
-                        mean_time = np.mean(response_times)
-                        median_time = np.median(response_times)
-                        std_time = np.std(response_times)
-                        
-                        # Adicionar texto com estatísticas incluindo RPS
-                        ax.text(i, max(response_times) * 1.05, 
-                               f'Mean: {mean_time:.3f}s\nMedian: {median_time:.3f}s\nStd: {std_time:.3f}s\nRPS: {rps}',
-                               ha='center', va='bottom', fontsize=9, 
-                               bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8))
-
-                    # Configurar o gráfico
-                    ax.set_ylabel('Tempo de Resposta (segundos)')
-                    ax.set_xlabel('Distribuições')
-                    ax.set_xticks(range(len(labels)))
-                    ax.set_xticklabels(labels, rotation=45 if len(max(labels, key=len)) > 8 else 0)
-                    ax.yaxis.grid(True, linestyle=':', alpha=0.7)
-                    ax.set_ylim(bottom=0)
-
-                    # Adicionar legenda personalizada
-                    from matplotlib.lines import Line2D
-                    legend_elements = [
-                        Line2D([0], [0], color='red', lw=2, label='Média'),
-                        Line2D([0], [0], color='black', lw=2, label='Mediana')
-                    ]
-                    ax.legend(handles=legend_elements, loc='upper right')
-
-                    plt.tight_layout()
-
-                    # Salvar o arquivo
-                    output_filename = f'response_time_load_{args.load}_{"_".join(args.benchmark_names) if args.benchmark_names else "_".join(args.files)}.png'
-                    plt.savefig(output_filename, dpi=300, bbox_inches='tight')
-                    print(f"Violin plot de tempos de resposta salvo como {output_filename}")
-                case _:
-                    raise ValueError(f"Unknown analysis type: {args.analysis_type}. Supported types are: avg-response-time, min-response-time, max-response-time.")
-
-        case _:
-            raise ValueError(f"Unknown service: {service}. Supported services are: benchmark, test-execution.")
-
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Cannot compare {candidate_file} with {baseline_file}: {type(e).__name__}: {e}")
+                return NOT_COMPARABLE
+            for entry in report['loads']:
+                print(f"Load: {entry['load']}, max RPS {entry['baseline_rps']} -> {entry['candidate_rps']}" + (f" ({entry['rps_change']:+.1%})" if 'rps_change' in entry else ""))
+                if 'mann_whitney' in entry:
+                    for name in ('p50', 'p99'):
+                        interval = entry[name]
+                        print(f"    Latency {name}: {interval['baseline'] * 1000:.1f} -> {interval['candidate'] * 1000:.1f} ms ({interval['ratio'] - 1:+.1%}, {1 - args.alpha:.0%} CI {interval['low'] - 1:+.1%} to {interval['high'] - 1:+.1%})")
+                    print(f"    Mann-Whitney: P(candidate slower) {entry['mann_whitney']['probability_larger']:.2f}, p-value {entry['mann_whitney']['p_value']:.3g}")
+                else:
+                    print(f"    {entry['note']}")
+                if entry['regressions']:
+                    print(f"    REGRESSION: {', '.join(entry['regressions'])}")
+                if entry['improvements']:
+                    print(f"    Improvement: {', '.join(entry['improvements'])}")
+            if report['only_in_baseline'] or report['only_in_candidate']:
+                print(f"Loads only in the baseline: {report['only_in_baseline']}, only in the candidate: {report['only_in_candidate']}")
+            file_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_regression.json"
+            storage_service.save(file_name=file_name, data=report)
+            exit_code = report['exit_code']
+            print(f"{len(report['regressions'])} regressions found. Report saved to {file_name} in {args.storage}" if report['loads'] else f"No load in common, nothing compared. Report saved to {file_name} in {args.storage}")
+    return exit_code
+
+async def report_command(args: argparse.Namespace, storage_service: JsonStorageService):
+    from data_analysis_service import DataAnalysisService
+    from report_service import ReportService
+    report = await ReportService(
+        DataAnalysisService(storage_service=storage_service),
+        max_workers=args.report_workers,
+        dpi=args.report_dpi,
+    ).build(
+        benchmark_files=args.files,
+        benchmark_names=args.benchmark_names,
+        alias_hosts=parse_alias_hosts(args.alias_hosts),
+        loads=args.report_loads,
+        bucket_seconds=args.bucket_seconds,
+    )
+    file_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_report.html"
+    with open(f"{args.storage}/{file_name}", 'w') as file:
+        file.write(report)
+    print(f"Report saved to {file_name} in {args.storage}")
+
+def parse_queueing_model(args: argparse.Namespace):
+    from queueing_model import QueueingModel
+    return QueueingModel(
+        servers=args.mock_servers,
+        base_service_time=args.mock_base_service_time,
+        fibonacci_call_time=args.mock_fibonacci_call_time,
+        bubble_sort_operation_time=args.mock_bubble_sort_operation_time,
+        distribution=args.mock_distribution,
+        max_queue=args.mock_max_queue,
+        seed=args.mock_seed,
+    )
+
+async def mock_server_command(args: argparse.Namespace, storage_service: JsonStorageService):
+    from mock_server import serve_mock_app
+    model = parse_queueing_model(args)
+    print(f"Serving mock application at http://{args.mock_host}:{args.mock_port} with {args.mock_servers} servers.")
+    await serve_mock_app(model, host=args.mock_host, port=args.mock_port)
+
+async def simulate_command(args: argparse.Namespace, storage_service: JsonStorageService):
+    from simulation import SimulatedCluster, SimulationService
+    cluster = SimulatedCluster(parse_queueing_model(args))
+    calibration_cache = None
+    if args.calibration:
+        from calibration_cache import CalibrationCache
+        calibration_cache = CalibrationCache(storage_service, f"{cluster.name}_calibration.json")
+    simulation_service = SimulationService(
+        cluster=cluster,
+        test_execution_options=dict(max_error_rate=args.max_error_rate),
+        calibration_cache=calibration_cache,
+    )
+    # the simulation runs on an event loop of its own, on virtual time
+    report, benchmarks = await asyncio.to_thread(
+        simulation_service.run,
+        args.test_cases,
+        max_response_time=args.max_response_time,
+        duration_per_test=args.duration_per_test,
+        rest_time=args.rest_time,
+        max_n_loads_to_test=args.max_n_loads_to_test,
+        min_requests_per_second=args.min_requests_per_second,
+        model_guided_search=not args.no_model_guided_search,
+    )
+    print(f"Simulated {report['virtual_seconds']:.0f} seconds in {report['wall_seconds']:.1f} seconds ({report['speed_up']:.0f}x).")
+    for test_case in report['test_cases']:
+        print(
+            f"{test_case['test_case']}: {test_case['probes']} probes, {test_case['load_search']['probes']} of them searching the load; "
+            f"max acceptable load {test_case['max_acceptable_load']} (model: {test_case['expected_max_acceptable_load']})"
+        )
+        for load in test_case['loads']:
+            print(f"  Load: {load['load']}, max {load['request_per_second']} RPS, {load['saturation_share']:.0%} of the {load['saturation_request_per_second']:.1f} RPS saturating the servers")
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    for benchmark in benchmarks:
+        storage_service.save(file_name=f"{cluster.name}-{benchmark.test_case.get_name()}-{timestamp}_benchmark.json", data=benchmark.to_json())
+    file_name = f"{timestamp}_simulation.json"
+    print(f"Simulation completed. Saving results to {file_name} in {args.storage}")
+    storage_service.save(file_name=file_name, data=report)
+
+async def self_benchmark_command(args: argparse.Namespace, storage_service: JsonStorageService):
+    from cluster_service import ClusterService
+    from test_execution_service import TestExecutionService
+    from self_benchmark_service import SelfBenchmarkService
+    self_benchmark_service = SelfBenchmarkService(
+        test_execution_service=TestExecutionService(cluster_service=ClusterService(), **sending_options(args)),
+    )
+    report = await self_benchmark_service.run(
+        rates=args.self_benchmark_rates,
+        concurrencies=args.self_benchmark_concurrency,
+        duration_seconds=args.self_benchmark_duration,
+    )
+    for run in report['runs']:
+        print(
+            f"Requested: {run['requested_rps']} RPS, concurrency {run['concurrency']}: "
+            f"achieved {run['achieved_rps']:.1f} RPS, send lag p50/p99 {run['send_lag']['p50'] * 1000:.2f}/{run['send_lag']['p99'] * 1000:.2f} ms, "
+            f"CPU {run['cpu_seconds_per_request'] * 1000:.3f} ms/request, in flight {run['max_in_flight']}, errors {run['errors']}"
+        )
+    file_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_self_benchmark.json"
+    print(f"Self-benchmark completed. Saving results to {file_name} in {args.storage}")
+    storage_service.save(file_name=file_name, data=report)
+
+async def main(args: argparse.Namespace = None):
+    """
+    Runs the selected service.
+    :param args: The parsed arguments. Parsed from the command line when not given.
+    :return: The exit code of the service, None for success.
+    """
+    if args is None:
+        args = build_parser().parse_args()
+    runtime.use_json_codec(args.json_codec)
+    return await args.handler(args, JsonStorageService(args.storage))
+
+def run():
+    """
+    Parses the command line once, installs the selected event loop, which has to happen before the loop starts, and runs the CLI.
+    Exits with the code of the service, e.g. 1 when a regression analysis found a regression.
+    """
+    args = build_parser().parse_args()
+    runtime.use_event_loop(args.event_loop)
+    sys.exit(asyncio.run(run_async(args)))
+
+async def run_async(args: argparse.Namespace = None):
+    try:
+        return await main(args)
+    finally:
+        await runtime.close_http_client()
 
 if __name__ == "__main__":
-    asyncio.run(main())
-
+    run()
@@ -0,0 +1,182 @@
+from test_result import TestResult
+from cluster_stats import ClusterStats
+from timespan import Timespan
+from datetime import datetime, timedelta
+import statistics
+import time
+
+class ClockOffset:
+    """
+    Estimated offset of a server clock relative to the tester clock, with its drift (skew)
+    and uncertainty. A positive offset means the server clock is ahead of the tester.
+    """
+
+    def __init__(self, offset: float, uncertainty: float, skew: float = 0.0, reference: float = 0.0, samples: int = 0, source: str = "requests"):
+        """
+        Initializes the ClockOffset.
+        :param offset: Offset at the reference time, in seconds.
+        :param uncertainty: Bound on the error of the offset, in seconds.
+        :param skew: Drift of the offset, in seconds per second.
+        :param reference: Tester POSIX time the offset was estimated at.
+        :param samples: Number of samples the estimate is based on.
+        :param source: Where the samples came from: 'requests' or 'ssh'.
+        """
+        self.offset = offset
+        self.uncertainty = uncertainty
+        self.skew = skew
+        self.reference = reference
+        self.samples = samples
+        self.source = source
+
+    def offset_at(self, timestamp: float) -> float:
+        return self.offset + self.skew * (timestamp - self.reference)
+
+    def to_tester_time(self, server_time: datetime) -> datetime:
+        """
+        Converts a timestamp read from the server clock to the tester clock.
+        :param server_time: The server timestamp.
+        :return: The same instant on the tester clock.
+        """
+        return server_time - timedelta(seconds=self.offset_at(server_time.timestamp()))
+
+    def to_json(self) -> dict:
+        return {
+            "offset": self.offset,
+            "uncertainty": self.uncertainty,
+            "skew": self.skew,
+            "reference": self.reference,
+            "samples": self.samples,
+            "source": self.source
+        }
+
+class ClockOffsetEstimator:
+    """
+    NTP-style estimator of the offset between the tester clock and a server clock.
+
+    Every exchange gives four timestamps: t0 when the request left the tester, t1 and t2
+    when the server received and answered it (server clock), and t3 when the response
+    arrived. Its offset is ((t1 - t0) + (t2 - t3)) / 2 and the error of that offset is at
+    most half of the network round trip (t3 - t0) - (t2 - t1). Only the exchanges with the
+    smallest round trips are kept, and their offsets are fitted against time so a drifting
+    clock is followed over a long execution.
+    """
+
+    def __init__(self, best_fraction: float = 0.25, min_best_samples: int = 8, min_skew_span: float = 5.0):
+        """
+        Initializes the ClockOffsetEstimator.
+        :param best_fraction: Fraction of the samples, those with the smallest round trips, used for the estimate.
+        :param min_best_samples: Minimum number of samples used, when there are that many.
+        :param min_skew_span: Minimum time the used samples must span to estimate the skew, in seconds.
+        """
+        self.best_fraction = best_fraction
+        self.min_best_samples = min_best_samples
+        self.min_skew_span = min_skew_span
+        # (tester midpoint, offset, round trip) of every exchange
+        self._samples: list[tuple[float, float, float]] = []
+
+    def add_exchange(self, t0: float, t1: float, t2: float, t3: float):
+        """
+        Adds one request/response exchange, all timestamps as POSIX seconds.
+        :param t0: Tester time the request was sent.
+        :param t1: Server time the request was received.
+        :param t2: Server time the response was sent.
+        :param t3: Tester time the response was received.
+        """
+        offset = ((t1 - t0) + (t2 - t3)) / 2
+        delay = max(0.0, (t3 - t0) - (t2 - t1))
+        self._samples.append(((t0 + t3) / 2, offset, delay))
+
+    def add_reading(self, t0: float, server_time: float, t3: float):
+        """
+        Adds a single server clock reading taken between t0 and t3, e.g. through SSH.
+        """
+        self.add_exchange(t0, server_time, server_time, t3)
+
+    def add_result(self, result: TestResult):
+        self.add_exchange(
+            result.request_span.start.timestamp(),
+            result.server_processing_span.start.timestamp(),
+            result.server_processing_span.end.timestamp(),
+            result.request_span.end.timestamp()
+        )
+
+    def estimate(self, source: str = "requests") -> ClockOffset | None:
+        """
+        Estimates the offset from the samples added so far.
+        :param source: Where the samples came from, recorded on the estimate.
+        :return: The ClockOffset, or None without samples.
+        """
+        if not self._samples:
+            return None
+
+        count = max(min(self.min_best_samples, len(self._samples)), int(len(self._samples) * self.best_fraction))
+        best = sorted(self._samples, key=lambda sample: sample[2])[:count]
+        times = [sample[0] for sample in best]
+        offsets = [sample[1] for sample in best]
+        # every offset is within half its round trip of the truth
+        uncertainty = statistics.median(sample[2] for sample in best) / 2
+
+        reference = statistics.median(times)
+        if len(best) >= 2 and max(times) - min(times) >= self.min_skew_span:
+            skew = statistics.linear_regression(times, offsets).slope
+            offset = statistics.median(o - skew * (t - reference) for t, o in zip(times, offsets))
+        else:
+            skew = 0.0
+            offset = statistics.median(offsets)
+
+        return ClockOffset(offset=offset, uncertainty=uncertainty, skew=skew, reference=reference, samples=len(self._samples), source=source)
+
+def correct_results(results: list[TestResult], clock: ClockOffset) -> list[TestResult]:
+    """
+    Moves the server processing span of every result onto the tester clock.
+    :param results: The results, with server timestamps read from the server clock.
+    :param clock: The estimated offset of the server clock.
+    :return: New results whose server processing spans are on the tester clock.
+    """
+    return [
+        TestResult(
+            test_case_name=result.test_case_name,
+            load=result.load,
+            request_span=result.request_span,
+            server_processing_span=Timespan(
+                clock.to_tester_time(result.server_processing_span.start),
+                clock.to_tester_time(result.server_processing_span.end)
+            ),
+            phases=result.phases
+        )
+        for result in results
+    ]
+
+def read_server_clock(ssh_client) -> dict:
+    """
+    Reads a server clock through SSH, as one NTP-style reading.
+    :param ssh_client: The paramiko SSHClient connected to the server.
+    :return: A dictionary with the tester times around the reading ('sent', 'received'), the server time, the offset and its uncertainty, in seconds.
+    """
+    sent = time.time()
+    stdin, out, err = ssh_client.exec_command("date +%s.%N")
+    server_time = float(out.read().decode().strip())
+    received = time.time()
+    out.close(), err.close(), stdin.close()
+    return {
+        "sent": sent,
+        "server_time": server_time,
+        "received": received,
+        "offset": server_time - (sent + received) / 2,
+        "uncertainty": (received - sent) / 2
+    }
+
+def estimate_host_offsets(cluster_stats: list[ClusterStats]) -> dict[str, dict]:
+    """
+    Estimates the clock offset of every monitored host from the SSH readings collected with its stats.
+    :param cluster_stats: The stats collected while monitoring.
+    :return: A dictionary mapping each host to its ClockOffset as JSON.
+    """
+    estimators = {}
+    for stats in cluster_stats:
+        for server in stats.servers:
+            if server.clock:
+                estimators.setdefault(server.host, ClockOffsetEstimator()).add_reading(
+                    server.clock["sent"], server.clock["server_time"], server.clock["received"]
+                )
+    return {host: estimator.estimate(source="ssh").to_json() for host, estimator in estimators.items()}
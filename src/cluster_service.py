@@ -2,8 +2,32 @@ from logging import config
 from cluster import Cluster
 from cluster_stats import ClusterStats
 from server_stats import ServerStats
-from datetime import datetime
+import runtime
 from get_cluster_from_config import get_cluster_from_config
+from clock_offset import read_server_clock
+import logging
+import asyncio
+
+def read_cpu_times(ssh_client) -> tuple[int, int]:
+    """
+    Reads the CPU time counters of a server through SSH.
+    :param ssh_client: The paramiko SSHClient connected to the server.
+    :return: The busy and total CPU time since boot, in clock ticks, as parse_cpu_times returns them.
+    """
+    stdin, out, err = ssh_client.exec_command("head -n 1 /proc/stat")
+    line = out.read().decode()
+    out.close(), err.close(), stdin.close()
+    return parse_cpu_times(line)
+
+def parse_cpu_times(line: str) -> tuple[int, int]:
+    """
+    Parses the aggregate 'cpu' line of /proc/stat.
+    :param line: The line, e.g. 'cpu  4705 150 1120 16250 520 0 30 0 0 0'.
+    :return: The busy and total CPU time, in clock ticks. Idle and iowait count as not busy; guest time is already part of user time.
+    """
+    user, nice, system, idle, iowait, irq, softirq, steal = (int(value) for value in line.split()[1:9])
+    total = user + nice + system + idle + iowait + irq + softirq + steal
+    return total - idle - iowait, total
 
     
 class ClusterService:
@@ -24,7 +48,8 @@ class ClusterService:
                     stats=server.server_client.send_stats(),
                     host=server.connection.get_hostname(),
                     ping=server.connection.get_ping(),
-                    timestamp=datetime.now()
+                    timestamp=runtime.now(),
+                    clock=await self.__read_clock(server)
                 ))
         except Exception as e:
             cluster.disabled = True
@@ -36,9 +61,56 @@ class ClusterService:
 
         return ClusterStats(
             servers=server_stats,
-            timestamp=datetime.now()
+            timestamp=runtime.now()
         )
 
+    async def get_cpu_times(self, cluster: Cluster) -> dict[str, tuple[int, int]]:
+        """
+        Reads the CPU time counters of every monitored server, to measure the CPU usage over an interval
+        from two readings. The CPU usage in the stats of get_stats is the average since boot, which a
+        short burst of load barely moves.
+        :param cluster: The cluster to read.
+        :return: A dictionary mapping each host to its busy and total CPU time, in clock ticks. Hosts that cannot be read are left out.
+        """
+        cpu_times = {}
+        for server in cluster.servers:
+            ssh_client = ClusterService.__ssh_client(server)
+            if ssh_client is None:
+                continue
+            try:
+                cpu_times[server.connection.get_hostname()] = await asyncio.to_thread(read_cpu_times, ssh_client)
+            except Exception as e:
+                logging.debug(f"Could not read the CPU times of {server.connection.get_hostname()}: {e}")
+        return cpu_times
+
+    @staticmethod
+    async def __read_clock(server) -> dict | None:
+        """
+        Reads the clock of a monitored server alongside its stats, in a thread so the SSH round trip does not block the event loop.
+        :return: The reading, or None when the server does not allow it.
+        """
+        ssh_client = ClusterService.__ssh_client(server)
+        if ssh_client is None:
+            return None
+        try:
+            return await asyncio.to_thread(read_server_clock, ssh_client)
+        except Exception as e:
+            logging.debug(f"Could not read the clock of {server.connection.get_hostname()}: {e}")
+            return None
+
+    @staticmethod
+    def __ssh_client(server):
+        """
+        Finds the SSH client the server client of a monitored server is connected with. The server client
+        does not expose it, so this is the only place that relies on its private '_conn' attribute.
+        :return: The paramiko SSHClient, or None when the server client has none.
+        """
+        ssh_client = getattr(server.server_client, "_conn", None)
+        if ssh_client is None or not hasattr(ssh_client, "exec_command"):
+            logging.debug(f"No SSH client to read the clock and CPU times of {server.connection.get_hostname()}.")
+            return None
+        return ssh_client
+
     def recreate_cluster(self, cluster: Cluster) -> Cluster:
         """
         Recreates a Cluster instance from the provided configuration.
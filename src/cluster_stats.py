@@ -26,4 +26,16 @@ class ClusterStats:
         return {
             "servers": [server.to_json() for server in self.servers],
             "timestamp": self.timestamp.isoformat()
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def from_json(data: dict) -> "ClusterStats":
+        """
+        Creates a ClusterStats instance from a dictionary produced by to_json.
+        :param data: A dictionary representation of the ClusterStats.
+        :return: A ClusterStats instance.
+        """
+        return ClusterStats(
+            servers=[ServerStats.from_json(server) for server in data["servers"]],
+            timestamp=datetime.datetime.fromisoformat(data["timestamp"])
+        )
@@ -0,0 +1,130 @@
+from metrics import MetricsRegistry, LATENCY_BUCKETS
+from collections import deque
+import asyncio
+import time
+import sys
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+
+class Dashboard:
+    """
+    Terminal view of a running benchmark, redrawn at a fixed low rate from a MetricsRegistry.
+
+    Rolling latency percentiles and rates come from the difference between two snapshots of
+    the registry counters, so the dashboard never looks at individual requests and its cost
+    does not grow with the request rate.
+    """
+
+    def __init__(self, metrics: MetricsRegistry, refresh_interval: float = 1.0, window_seconds: float = 5.0, stream=None):
+        """
+        Initializes the Dashboard.
+        :param metrics: The registry updated by the TestExecutionService.
+        :param refresh_interval: Time between redraws, in seconds.
+        :param window_seconds: Length of the window the rolling figures are computed over, in seconds.
+        :param stream: Where the dashboard is drawn. Defaults to standard output.
+        """
+        self.metrics = metrics
+        self.refresh_interval = refresh_interval
+        self.window_seconds = window_seconds
+        self.stream = stream or sys.stdout
+        self._snapshots = deque()
+        self._running = False
+
+    async def run(self):
+        self._running = True
+        while self._running:
+            self.draw()
+            await asyncio.sleep(self.refresh_interval)
+
+    async def stop(self):
+        self._running = False
+        self.draw()
+
+    def draw(self):
+        output = self.render()
+        if self.stream.isatty():
+            output = CLEAR_SCREEN + output
+        self.stream.write(output + "\n")
+        self.stream.flush()
+
+    def snapshot(self) -> tuple:
+        """
+        Takes a snapshot of the counters and drops the snapshots older than the window.
+        :return: The oldest snapshot still in the window and the new one, as (time, sent, completed, errors, buckets) tuples.
+        """
+        metrics = self.metrics
+        now = time.monotonic()
+        current = (now, metrics.requests_sent, metrics.requests_completed, sum(metrics.errors.values()), list(metrics.latency_buckets))
+        self._snapshots.append(current)
+        while len(self._snapshots) > 1 and self._snapshots[0][0] < now - self.window_seconds:
+            self._snapshots.popleft()
+        return self._snapshots[0], current
+
+    def render(self) -> str:
+        """
+        Formats the current state of the benchmark.
+        :return: The dashboard text.
+        """
+        metrics = self.metrics
+        oldest, current = self.snapshot()
+        elapsed = current[0] - oldest[0]
+        completed = current[2] - oldest[2]
+        errors = current[3] - oldest[3]
+        buckets = [new - old for new, old in zip(current[4], oldest[4])]
+
+        lines = [f"cluster-tester {time.strftime('%H:%M:%S')}"]
+        if metrics.test_case is not None:
+            lines.append(f"Probe         {metrics.test_case} at load {metrics.load}")
+        if metrics.execution_started_at is not None:
+            lines.append(f"RPS           {metrics.get_achieved_rps():.1f} achieved / {metrics.target_rps} target")
+        else:
+            lines.append("RPS           resting between probes")
+        lines.append(f"In flight     {metrics.in_flight}")
+
+        window = f"last {elapsed:.0f} s" if elapsed > 0 else "no data yet"
+        if sum(buckets) > 0:
+            lines.append(f"Latency       p50 {format_seconds(estimate_quantile(buckets, 0.5))}  p99 {format_seconds(estimate_quantile(buckets, 0.99))} ({window})")
+        else:
+            lines.append(f"Latency       - ({window})")
+        lines.append(f"Errors        {errors / completed:.1%} of {completed} completed ({window}), {sum(metrics.errors.values())} in total" if completed else f"Errors        {sum(metrics.errors.values())} in total")
+
+        if metrics.search_test_case is not None:
+            state = metrics.search_state
+            values = ", ".join(
+                f"{key}={value}" for key, value in state.items()
+                if key != "phase" and isinstance(value, (int, float)) and not isinstance(value, bool)
+            )
+            lines.append(f"Search        {metrics.search_test_case}: {state.get('phase', '-')}" + (f" ({values})" if values else ""))
+            if state.get("found_loads"):
+                lines.append("Found loads   " + ", ".join(f"load {load}: {rps} RPS" for load, rps in state["found_loads"].items()))
+
+        if metrics.hosts:
+            lines.append("")
+            lines.append(f"{'Host':<24}{'CPU':>8}{'RAM':>20}")
+            for host, values in sorted(metrics.hosts.items()):
+                # the registry converts the KiB of free to bytes, the dashboard only picks the unit
+                memory = f"{values['memory_used_bytes'] / 2**30:.1f}/{values['memory_total_bytes'] / 2**30:.1f} GiB"
+                lines.append(f"{host:<24}{values['cpu_busy_percent']:>7.1f}%{memory:>20}")
+
+        return "\n".join(lines)
+
+def estimate_quantile(buckets: list[int], quantile: float) -> float:
+    """
+    Estimates a quantile from latency histogram counts, interpolating linearly inside the bucket it falls in.
+    :param buckets: Counts of each bucket of LATENCY_BUCKETS, followed by the count above the last bound.
+    :param quantile: The quantile, between 0 and 1.
+    :return: The estimated value, in seconds. Values above the last bound are reported as the last bound.
+    """
+    target = quantile * sum(buckets)
+    cumulative = 0
+    for i, count in enumerate(buckets):
+        if count and cumulative + count >= target:
+            if i == len(LATENCY_BUCKETS):
+                return LATENCY_BUCKETS[-1]
+            lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+            return lower + (LATENCY_BUCKETS[i] - lower) * (target - cumulative) / count
+        cumulative += count
+    return LATENCY_BUCKETS[-1]
+
+def format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.2f} s"
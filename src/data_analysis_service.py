@@ -1,13 +1,24 @@
 from json_storage_service import JsonStorageService
-import matplotlib as plt 
 from datetime import datetime
 
 class DataAnalysisService:
     def __init__(self, storage_service: JsonStorageService):
         self.storage_service = storage_service
+        # parsed files, so analyses and reports over the same files read and parse each one once
+        self._loaded = {}
+
+    def load_benchmark(self, benchmark_filename: str) -> dict:
+        """
+        Loads a benchmark file, parsing it only the first time.
+        :param benchmark_filename: The benchmark file.
+        :return: The parsed benchmark.
+        """
+        if benchmark_filename not in self._loaded:
+            self._loaded[benchmark_filename] = self.storage_service.load(benchmark_filename)
+        return self._loaded[benchmark_filename]
 
     def avg_response_time_benchmark(self, benchmark_filename: str) -> list[dict]:
-        benchmark_data = self.storage_service.load(benchmark_filename)
+        benchmark_data = self.load_benchmark(benchmark_filename)
         load_response_time_requests = []
         
         for execution in benchmark_data['test_executions']:
@@ -26,24 +37,30 @@ class DataAnalysisService:
         return load_response_time_requests
     
     def response_times_benchmark(self, benchmark_filename: str) -> list[dict]:
-        benchmark_data = self.storage_service.load(benchmark_filename)
+        """
+        Collects the server processing times of every execution of a benchmark.
+        :param benchmark_filename: The benchmark file.
+        :return: A list of dictionaries with the load, rps and response times (a numpy array) of each execution.
+        """
+        from timeline import parse_timestamps
+        benchmark_data = self.load_benchmark(benchmark_filename)
         load_response_times = []
         
         for execution in benchmark_data['test_executions']:
-            load = 0
-            response_times = []
+            results = execution['results']
+            load = results[-1]['load'] if results else 0
             requests_per_second = execution.get('request_per_second', 1)
-
-            for result in execution['results']:
-                load = result['load']
-                response_time = (datetime.fromisoformat(result['server_processing_span']['end']) - datetime.fromisoformat(result['server_processing_span']['start'])).total_seconds()
-                response_times.append(response_time)
+            # parsed in one vectorized pass, long runs hold millions of results
+            response_times = (
+                parse_timestamps([result['server_processing_span']['end'] for result in results])
+                - parse_timestamps([result['server_processing_span']['start'] for result in results])
+            )
             load_response_times.append({'load': load,'rps': requests_per_second, 'response_times': response_times})
 
         return load_response_times
     
     def min_response_time_benchmark(self, benchmark_filename: str) -> list[dict]:
-        benchmark_data = self.storage_service.load(benchmark_filename)
+        benchmark_data = self.load_benchmark(benchmark_filename)
         load_min_response_time = []
         
         for execution in benchmark_data['test_executions']:
@@ -61,7 +78,7 @@ class DataAnalysisService:
         return load_min_response_time
     
     def max_response_time_benchmark(self, benchmark_filename: str) -> list[dict]:
-        benchmark_data = self.storage_service.load(benchmark_filename)
+        benchmark_data = self.load_benchmark(benchmark_filename)
         load_max_response_time = []
         
         for execution in benchmark_data['test_executions']:
@@ -86,7 +103,7 @@ class DataAnalysisService:
         return combined_ram_usage
     
     def ram_usage_benchmark(self, benchmark_filename: str) -> list[dict]:
-        benchmark_data = self.storage_service.load(benchmark_filename)
+        benchmark_data = self.load_benchmark(benchmark_filename)
         load_ram_usage = []
         
         for execution in benchmark_data['test_executions']:
@@ -122,7 +139,7 @@ class DataAnalysisService:
         return combined_cpu_usage
     
     def cpu_usage_benchmark(self, benchmark_filename: str) -> list[dict]:
-        benchmark_data = self.storage_service.load(benchmark_filename)
+        benchmark_data = self.load_benchmark(benchmark_filename)
         load_cpu_usage = []
         
         for execution in benchmark_data['test_executions']:
@@ -206,4 +223,46 @@ class DataAnalysisService:
                         "rps": entry['rps']
                     }
 
-        return response_time_comparison
\ No newline at end of file
+        return response_time_comparison
+
+    def timeline_benchmark(self, benchmark_filename: str, bucket_seconds: float = 1.0) -> list[dict]:
+        """
+        Builds the aligned timeline of every execution of a benchmark, or of a single execution file.
+        Executions saved without their results (e.g. in the short format) are skipped.
+        :param benchmark_filename: The benchmark or test execution file.
+        :param bucket_seconds: Length of each window, in seconds.
+        :return: A list of dictionaries with the load, rps and Timeline of each execution.
+        """
+        from timeline import Timeline
+        data = self.load_benchmark(benchmark_filename)
+        executions = data['test_executions'] if 'test_executions' in data else [data]
+        timelines = []
+        for execution in executions:
+            if not isinstance(execution.get('results'), list):
+                continue
+            results = execution['results']
+            timelines.append({
+                'load': execution.get('load') if execution.get('load') is not None else (results[0]['load'] if results else 0),
+                'rps': execution.get('request_per_second', 1),
+                'timeline': Timeline.from_execution(execution, bucket_seconds)
+            })
+        return timelines
+
+    def regression_compare(self, baseline_filename: str, candidate_filename: str, alpha: float = 0.05, threshold: float = 0.05, bootstrap_samples: int = 2000, seed: int = None) -> dict:
+        """
+        Compares a candidate benchmark with a baseline benchmark of the same test case, load by load.
+        :param baseline_filename: The baseline benchmark file.
+        :param candidate_filename: The candidate benchmark file.
+        :param alpha: Significance level of the tests.
+        :param threshold: Smallest relative change reported as a regression or an improvement.
+        :param bootstrap_samples: Number of bootstrap resamples.
+        :param seed: Optional seed of the bootstrap.
+        :return: The report of regression.compare_benchmarks.
+        """
+        from regression import compare_benchmarks
+        baseline = self.load_benchmark(baseline_filename)
+        candidate = self.load_benchmark(candidate_filename)
+        for filename, data in ((baseline_filename, baseline), (candidate_filename, candidate)):
+            if not data or 'test_executions' not in data:
+                raise ValueError(f"{filename} is not a benchmark file.")
+        return compare_benchmarks(baseline, candidate, alpha=alpha, threshold=threshold, bootstrap_samples=bootstrap_samples, seed=seed)
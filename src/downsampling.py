@@ -0,0 +1,127 @@
+import numpy as np
+import math
+
+class LatencyHistogram:
+    """
+    Fixed-size summary of a latency sample: a histogram between its minimum and maximum, with
+    its exact count, mean, median and standard deviation.
+
+    A violin plot drawn from it costs the same for a thousand or ten million latencies: the
+    density is a kernel estimate over the bins instead of over every value, and the summary is
+    small enough to send to the processes rendering the charts.
+    """
+
+    def __init__(self, counts: np.ndarray, low: float, high: float, mean: float, median: float, std: float):
+        """
+        Initializes the LatencyHistogram.
+        :param counts: Number of values in each of the equal-width bins between low and high.
+        :param low: The smallest value.
+        :param high: The largest value.
+        :param mean: Mean of the values.
+        :param median: Median of the values.
+        :param std: Standard deviation of the values.
+        """
+        self.counts = counts
+        self.low = low
+        self.high = high
+        self.mean = mean
+        self.median = median
+        self.std = std
+
+    @staticmethod
+    def from_values(values, bins: int = 1024) -> "LatencyHistogram":
+        """
+        Summarises a sample in one pass over it for each statistic, without sorting it.
+        :param values: The latencies.
+        :param bins: Number of bins.
+        :return: The LatencyHistogram.
+        """
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            raise ValueError("Cannot summarise an empty sample.")
+        low, high = float(values.min()), float(values.max())
+        counts, _ = np.histogram(values, bins=bins, range=(low, high if high > low else low + 1e-9))
+        return LatencyHistogram(
+            counts=counts,
+            low=low,
+            high=high,
+            mean=float(values.mean()),
+            median=float(np.median(values)),
+            std=float(values.std())
+        )
+
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def quantile(self, quantile: float) -> float:
+        """
+        Estimates a quantile, interpolating linearly inside the bin it falls in.
+        :param quantile: The quantile, between 0 and 1.
+        :return: The estimated value.
+        """
+        edges = np.linspace(self.low, self.high, len(self.counts) + 1)
+        cumulative = np.concatenate(([0], np.cumsum(self.counts)))
+        return float(np.interp(quantile * cumulative[-1], cumulative, edges))
+
+    def violin_stats(self, points: int = 100) -> dict:
+        """
+        Computes the statistics matplotlib's Axes.violin draws, as Axes.violinplot would from the raw values.
+        The density is a Gaussian kernel estimate with Scott's bandwidth, the default of violinplot,
+        over the bin centers; the kernel is widened by the spread binning removed from every bin.
+        :param points: Number of points the density is evaluated at.
+        :return: A dictionary with coords, vals, mean, median, min, max and quantiles.
+        """
+        count = self.count()
+        bin_width = (self.high - self.low) / len(self.counts)
+        centers = self.low + bin_width * (np.arange(len(self.counts)) + 0.5)
+        bandwidth = math.sqrt((self.std * count ** (-1 / 5)) ** 2 + bin_width ** 2 / 12) or 1e-12
+        coords = np.linspace(self.low, self.high, points)
+        used = self.counts > 0
+        kernel = np.exp(-0.5 * ((coords[:, None] - centers[used][None, :]) / bandwidth) ** 2)
+        vals = kernel @ self.counts[used] / (count * bandwidth * math.sqrt(2 * math.pi))
+        return {
+            "coords": coords,
+            "vals": vals,
+            "mean": self.mean,
+            "median": self.median,
+            "min": self.low,
+            "max": self.high,
+            "quantiles": np.array([]),
+        }
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling of a series, which keeps its visual shape (peaks
+    and dips) with a fixed number of points. Points with a NaN value are dropped first.
+    :param x: The x values, increasing.
+    :param y: The y values.
+    :param threshold: Number of points kept, at least 3.
+    :return: The kept x and y values. The series is returned unchanged when it is not longer than threshold.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    mask = ~np.isnan(y)
+    x, y = x[mask], y[mask]
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return x, y
+
+    # the first and last points are kept; the others are split in threshold - 2 buckets
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, length - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # the third point of the triangle is the average of the next bucket, or the last point
+        if bucket + 2 < len(edges):
+            next_x = x[end:edges[bucket + 2]].mean()
+            next_y = y[end:edges[bucket + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return x[selected], y[selected]
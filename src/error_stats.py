@@ -0,0 +1,139 @@
+from in_flight_limit import InFlightLimitExceeded
+import httpx
+
+ERROR_KINDS = ("connect", "timeout", "http_status", "decode", "in_flight_limit", "other")
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classifies the exception of a failed request.
+    :param error: The exception raised by the request.
+    :return: One of ERROR_KINDS.
+    """
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.HTTPStatusError):
+        return "http_status"
+    if isinstance(error, (httpx.NetworkError, httpx.ProtocolError, httpx.ProxyError, ConnectionError)):
+        return "connect"
+    if isinstance(error, InFlightLimitExceeded):
+        return "in_flight_limit"
+    # a response that is not JSON, lacks the timestamps or holds a malformed one
+    if isinstance(error, (ValueError, KeyError, TypeError, httpx.DecodingError)):
+        return "decode"
+    return "other"
+
+class ErrorStats:
+    """
+    Counts the failed requests of a test execution by kind, HTTP status and second of the
+    execution, keeping only a few example messages of each kind instead of every exception.
+    """
+
+    def __init__(self, max_examples: int = 5):
+        """
+        Initializes the ErrorStats.
+        :param max_examples: Maximum number of distinct example messages kept per kind.
+        """
+        self.max_examples = max_examples
+        self.counts: dict[str, int] = {}
+        self.status_codes: dict[str, int] = {}
+        # kind -> second of the execution -> count
+        self.per_second: dict[str, dict[int, int]] = {}
+        self.examples: dict[str, list[str]] = {}
+        # HTTP status -> second of the execution -> count, only to split the status codes; not saved
+        self.__status_codes_per_second: dict[str, dict[int, int]] = {}
+
+    def record(self, error: BaseException, at_seconds: float = 0.0):
+        """
+        Counts a failed request.
+        :param error: The exception raised by the request.
+        :param at_seconds: When the request failed, in seconds since the start of the execution.
+        """
+        kind = classify_error(error)
+        if kind == "http_status":
+            status = str(error.response.status_code)
+            self.status_codes[status] = self.status_codes.get(status, 0) + 1
+            series = self.__status_codes_per_second.setdefault(status, {})
+            series[int(at_seconds)] = series.get(int(at_seconds), 0) + 1
+        message = f"{type(error).__name__}: {error}"
+        self.record_kind(kind, at_seconds, message)
+
+    def record_kind(self, kind: str, at_seconds: float = 0.0, message: str = None):
+        """
+        Counts a failed request whose kind is already known.
+        :param kind: One of ERROR_KINDS.
+        :param at_seconds: When the request failed, in seconds since the start of the execution.
+        :param message: Optional example message.
+        """
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        series = self.per_second.setdefault(kind, {})
+        second = int(at_seconds)
+        series[second] = series.get(second, 0) + 1
+        if message is not None:
+            examples = self.examples.setdefault(kind, [])
+            if len(examples) < self.max_examples and message not in examples:
+                examples.append(message)
+
+    def split(self, at_seconds: float) -> tuple["ErrorStats", "ErrorStats"]:
+        """
+        Splits the errors at a point of the execution, e.g. the end of the warm-up. A second of the
+        execution belongs to the first part when it starts before that point.
+        :param at_seconds: The point to split at, in seconds since the start of the execution.
+        :return: The errors before the point and the errors from it on.
+        """
+        before, after = ErrorStats(self.max_examples), ErrorStats(self.max_examples)
+        for kind, series in self.per_second.items():
+            for second, count in series.items():
+                part = before if second < at_seconds else after
+                part.counts[kind] = part.counts.get(kind, 0) + count
+                part.per_second.setdefault(kind, {})[second] = count
+        for status, count in self.status_codes.items():
+            # status codes loaded from a file have no seconds and stay with the errors after the point
+            series = self.__status_codes_per_second.get(status, {})
+            in_before = sum(count for second, count in series.items() if second < at_seconds)
+            for part, part_count in ((before, in_before), (after, count - in_before)):
+                if part_count:
+                    part.status_codes[status] = part_count
+                    part.__status_codes_per_second[status] = {second: count for second, count in series.items() if (second < at_seconds) == (part is before)}
+        # the examples have no seconds: both parts keep those of the kinds they hold
+        for part in (before, after):
+            part.examples = {kind: list(examples) for kind, examples in self.examples.items() if kind in part.counts}
+        return before, after
+
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def __len__(self) -> int:
+        return self.total()
+
+    def __str__(self) -> str:
+        if not self.counts:
+            return "no errors"
+        return ", ".join(f"{count} {kind}" for kind, count in self.counts.items()) + f" (e.g. {next(iter(self.examples.values()), [''])[0]})"
+
+    def to_json(self) -> dict:
+        return {
+            "total": self.total(),
+            "counts": self.counts,
+            "status_codes": self.status_codes,
+            "per_second": {kind: {str(second): count for second, count in sorted(series.items())} for kind, series in self.per_second.items()},
+            "examples": self.examples
+        }
+
+    @staticmethod
+    def from_json(data) -> "ErrorStats":
+        """
+        Creates an ErrorStats instance from a dictionary produced by to_json.
+        Files written before errors were classified hold a list of messages; those are counted as 'other'.
+        :param data: A dictionary representation of the ErrorStats, or a list of error messages.
+        :return: An ErrorStats instance.
+        """
+        stats = ErrorStats()
+        if isinstance(data, list):
+            for message in data:
+                stats.record_kind("other", message=message)
+            return stats
+        stats.counts = dict(data.get("counts", {}))
+        stats.status_codes = dict(data.get("status_codes", {}))
+        stats.per_second = {kind: {int(second): count for second, count in series.items()} for kind, series in data.get("per_second", {}).items()}
+        stats.examples = {kind: list(examples) for kind, examples in data.get("examples", {}).items()}
+        return stats
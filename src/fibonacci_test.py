@@ -1,9 +1,10 @@
-import httpx
 from test_case import TestCase
 from test_result import TestResult
 import datetime
 from timespan import Timespan
 import logging
+from request_trace import RequestTrace
+import runtime
 
 class FibonacciTest(TestCase):
 
@@ -21,19 +22,22 @@ class FibonacciTest(TestCase):
 
     async def run(self, load: int) -> TestResult:
         load = max(1, load)  # Ensure load is non-negative
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            start_request = datetime.datetime.now(datetime.timezone.utc)
-            logging.debug(f"Starting request to {self._application_base_url}/fibonacci/{load} with load {load}")
-            response = await client.get(f'{self._application_base_url}/fibonacci/{load}')  # Example endpoint  
-            logging.debug(f"Received response: {response.status_code} for load {load}")
-            end_request = datetime.datetime.now(datetime.timezone.utc)
-            start_server = datetime.datetime.fromisoformat(response.json().get('start'))
-            end_server = datetime.datetime.fromisoformat(response.json().get('end'))
-            
-            return TestResult(
-                test_case_name=self.get_name(),
-                request_span=Timespan(start_request, end_request),
-                server_processing_span=Timespan(start_server, end_server),
-                load=load
-            )
-
+        client = runtime.get_http_client()
+        trace = RequestTrace()
+        start_request = datetime.datetime.now(datetime.timezone.utc)
+        logging.debug(f"Starting request to {self._application_base_url}/fibonacci/{load} with load {load}")
+        response = await client.get(f'{self._application_base_url}/fibonacci/{load}', extensions=trace.extensions)  # Example endpoint  
+        logging.debug(f"Received response: {response.status_code} for load {load}")
+        end_request = datetime.datetime.now(datetime.timezone.utc)
+        response.raise_for_status()
+        body = runtime.json_loads(response.content)
+        start_server = datetime.datetime.fromisoformat(body.get('start'))
+        end_server = datetime.datetime.fromisoformat(body.get('end'))
+        
+        return TestResult(
+            test_case_name=self.get_name(),
+            request_span=Timespan(start_request, end_request),
+            server_processing_span=Timespan(start_server, end_server),
+            load=load,
+            phases=trace.phases()
+        )
@@ -8,6 +8,11 @@ def get_cluster_from_config(config)-> Cluster:
     :param config: Configuration dictionary containing cluster details.
     :return: An instance of Cluster initialized with the provided configuration.
     """
+    cluster_configs = get_cluster_configs_from_config(config)
+    if len(cluster_configs) != 1:
+        raise ValueError(f"Configuration describes {len(cluster_configs)} clusters, but only one cluster can be used here.")
+    config = cluster_configs[0]
+
     servers = []
     for server_config in config['monitorServers']:
         server = Monitor.from_user_password(
@@ -18,4 +23,26 @@ def get_cluster_from_config(config)-> Cluster:
         )
         servers.append(server)
 
-    return Cluster(name=config['app']['name'], servers=servers, config=config)
\ No newline at end of file
+    return Cluster(name=config['app']['name'], servers=servers, config=config)
+
+def get_cluster_configs_from_config(config) -> list[dict]:
+    """
+    Splits a configuration into the configurations of each cluster it describes.
+    A configuration either describes a single cluster (with 'app' and 'monitorServers' keys)
+    or several clusters under a 'clusters' key, each one in the single cluster format.
+
+    :param config: Configuration dictionary containing one or more clusters.
+    :return: A list with the configuration dictionary of each cluster.
+    """
+    if 'clusters' not in config:
+        return [config]
+
+    cluster_configs = config['clusters']
+    if not cluster_configs:
+        raise ValueError("Configuration 'clusters' list is empty.")
+
+    names = [cluster_config['app']['name'] for cluster_config in cluster_configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Cluster names must be unique, got: {names}.")
+
+    return cluster_configs
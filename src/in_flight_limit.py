@@ -0,0 +1,114 @@
+from percentiles import percentiles
+from collections import deque
+import asyncio
+
+POLICIES = ("drop", "queue", "abort")
+
+class InFlightLimitExceeded(Exception):
+    """
+    Raised by a queued request that did not get a slot within the maximum queue delay.
+    """
+
+class InFlightLimit:
+    """
+    Caps the number of requests in flight during one test execution.
+
+    When the cap is reached, a scheduled request is either dropped ('drop'), queued until a
+    slot frees up for at most max_queue_delay seconds ('queue'), or the probe stops sending
+    ('abort'). Queued requests get slots in the order they were scheduled. Every request
+    the cap affects is counted, so the execution reports how much of its schedule it lost.
+    """
+
+    def __init__(self, max_in_flight: int, policy: str = "drop", max_queue_delay: float = 1.0):
+        """
+        Initializes the InFlightLimit.
+        :param max_in_flight: Maximum number of requests in flight.
+        :param policy: What happens to a request scheduled while the cap is reached: 'drop', 'queue' or 'abort'.
+        :param max_queue_delay: With the 'queue' policy, longest time a request waits for a slot, in seconds.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown in-flight policy: {policy}. Supported policies are: {', '.join(POLICIES)}.")
+        self.max_in_flight = max_in_flight
+        self.policy = policy
+        self.max_queue_delay = max_queue_delay
+
+        self.dropped = 0
+        self.queued = 0
+        self.expired = 0
+        self.unsent = 0
+        self.aborted = False
+        self._in_flight = 0
+        self._waiters = deque()
+        self._queue_delays = []
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a slot if one is free and no queued request is waiting for it.
+        :return: True if the request can be sent right away.
+        """
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            return True
+        return False
+
+    def release(self):
+        """
+        Frees the slot of a finished request, handing it to the oldest queued request if there is one.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    async def run(self, run):
+        """
+        Runs a request that already holds a slot, releasing it when the request finishes.
+        :param run: A callable returning the request coroutine.
+        """
+        try:
+            return await run()
+        finally:
+            self.release()
+
+    async def run_queued(self, run):
+        """
+        Waits for a slot, for at most max_queue_delay seconds, then runs the request.
+        :param run: A callable returning the request coroutine.
+        :raises InFlightLimitExceeded: If no slot freed up in time.
+        """
+        self.queued += 1
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_queue_delay)
+        except asyncio.TimeoutError:
+            self.expired += 1
+            raise InFlightLimitExceeded(f"No request slot freed up within {self.max_queue_delay} seconds ({self.max_in_flight} requests in flight).")
+        self._queue_delays.append(loop.time() - start)
+        return await self.run(run)
+
+    def get_affected_requests(self) -> int:
+        """
+        Counts the scheduled requests the cap changed: dropped, queued (sent late or expired) and left unsent by an abort.
+        """
+        return self.dropped + self.queued + self.unsent
+
+    def to_json(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "policy": self.policy,
+            "max_queue_delay": self.max_queue_delay,
+            "dropped": self.dropped,
+            "queued": self.queued,
+            "expired": self.expired,
+            "unsent": self.unsent,
+            "aborted": self.aborted,
+            "affected_requests": self.get_affected_requests(),
+            "queue_delay": percentiles(self._queue_delays)
+        }
@@ -1,12 +1,23 @@
+import os
+
 class JsonStorageService:
     def __init__(self, base_path: str,):
         
         self.base_path = base_path
 
     def save(self, file_name: str, data):
+        """
+        Writes data as JSON. The data is written to a temporary file first, which then replaces the
+        file, so a crash during the write leaves the previous version instead of truncated JSON.
+        """
         import json
-        with open(f"{self.base_path}/{file_name}", 'w') as file:
+        path = f"{self.base_path}/{file_name}"
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'w') as file:
             json.dump(data, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
     
 
     def load(self, file_name: str):
@@ -16,4 +27,47 @@ class JsonStorageService:
                 return json.load(file)
         except FileNotFoundError:
             return None
-    
\ No newline at end of file
+
+    def append_line(self, file_name: str, data):
+        """
+        Appends data as one JSON line, without rewriting what the file already holds.
+        """
+        import json
+        with open(f"{self.base_path}/{file_name}", 'a') as file:
+            file.write(json.dumps(data) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def save_lines(self, file_name: str, values: list):
+        """
+        Replaces a file read with load_lines by one line per value, as save does, through a temporary file.
+        """
+        import json
+        path = f"{self.base_path}/{file_name}"
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'w') as file:
+            file.writelines(json.dumps(value) + "\n" for value in values)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+
+    def load_lines(self, file_name: str) -> list | None:
+        """
+        Reads a file written by append_line.
+        :return: The value of every complete line, without a last line cut short by a crash; None when the file does not exist.
+        """
+        import json
+        try:
+            with open(f"{self.base_path}/{file_name}", 'r') as file:
+                lines = file.read().split("\n")
+        except FileNotFoundError:
+            return None
+        values = []
+        for line in lines:
+            if not line:
+                continue
+            try:
+                values.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+        return values
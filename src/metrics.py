@@ -0,0 +1,229 @@
+from cluster_stats import ClusterStats
+from error_stats import classify_error
+from bisect import bisect_left
+import asyncio
+import logging
+import time
+
+# upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+class MetricsRegistry:
+    """
+    Live state of the tester: request counters, latency histogram, errors, the current
+    probe and search state, and the latest statistics of every monitored host.
+
+    The hot path only increments plain attributes; everything derived (rates, labels,
+    text formatting) is computed when the metrics are read, so an idle or scraped
+    registry costs the load generator the same.
+    """
+
+    def __init__(self, labels: dict = None):
+        """
+        Initializes the MetricsRegistry.
+        :param labels: Labels added to every sample, e.g. {'cluster': 'cluster-a'}.
+        """
+        self.labels = labels or {}
+
+        self.requests_sent = 0
+        self.requests_completed = 0
+        self.in_flight = 0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.errors: dict[str, int] = {}
+
+        self.test_case = None
+        self.target_rps = 0
+        self.load = None
+        self.execution_started_at = None
+        self.execution_requests_sent = 0
+
+        self.search_test_case = None
+        self.search_state: dict = {}
+        self.hosts: dict[str, dict] = {}
+
+    def execution_started(self, test_case_name: str, target_rps: int, load: int):
+        """
+        Marks the start of a probe, resetting the counters its achieved rate is computed from.
+        """
+        self.test_case = test_case_name
+        self.target_rps = target_rps
+        self.load = load
+        self.execution_started_at = time.monotonic()
+        self.execution_requests_sent = 0
+
+    def execution_finished(self):
+        self.target_rps = 0
+        self.execution_started_at = None
+
+    def request_sent(self, task: asyncio.Task):
+        """
+        Counts a request as sent and in flight until its task finishes.
+        :param task: The task running the request.
+        """
+        self.requests_sent += 1
+        self.execution_requests_sent += 1
+        self.in_flight += 1
+        task.add_done_callback(self.__request_done)
+
+    def __request_done(self, task: asyncio.Task):
+        self.in_flight -= 1
+        self.requests_completed += 1
+        if task.cancelled():
+            self.record_error("other")
+            return
+        error = task.exception()
+        if error is not None:
+            self.record_error(classify_error(error))
+            return
+        response_time = task.result().get_response_time()
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS, response_time)] += 1
+        self.latency_sum += response_time
+
+    def record_error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def get_achieved_rps(self) -> float:
+        """
+        Send rate of the running probe.
+        :return: The requests sent per second since the probe started, or 0 when no probe runs.
+        """
+        if self.execution_started_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self.execution_started_at
+        return self.execution_requests_sent / elapsed if elapsed > 0 else 0.0
+
+    def set_search_state(self, test_case_name: str, **state):
+        """
+        Merges the state of the running search, e.g. its phase and bounds.
+        The state is reset when the search moves to another test case.
+        """
+        if test_case_name != self.search_test_case:
+            self.search_test_case = test_case_name
+            self.search_state = {}
+        self.search_state.update(state)
+
+    def set_cluster_stats(self, cluster_stats: ClusterStats):
+        """
+        Keeps the latest CPU, memory and ping figures of every host of the cluster.
+        :param cluster_stats: The statistics just collected from the cluster.
+        """
+        for server in cluster_stats.servers:
+            values = {
+                "cpu_busy_percent": 100.0 - float(server.stats['idle']),
+                # the memory figures come from free, in KiB
+                "memory_used_bytes": server.memory['used'] * 1024,
+                "memory_total_bytes": server.memory['total'] * 1024,
+            }
+            for key, value in server.ping.items():
+                if isinstance(value, (int, float)):
+                    values[f"ping_{key}"] = value
+            self.hosts[server.host] = values
+
+    def render(self) -> str:
+        """
+        Formats every metric in the OpenMetrics text format.
+        :return: The exposition, ending with '# EOF'.
+        """
+        lines = []
+
+        def metric(name: str, kind: str, help: str, samples: list[tuple[str, dict, float]]):
+            lines.append(f"# TYPE cluster_tester_{name} {kind}")
+            lines.append(f"# HELP cluster_tester_{name} {help}")
+            for suffix, labels, value in samples:
+                lines.append(f"cluster_tester_{name}{suffix}{self.__format_labels(labels)} {value}")
+
+        metric("requests_sent", "counter", "Requests sent by the tester.", [("_total", {}, self.requests_sent)])
+        metric("requests_completed", "counter", "Requests finished, successfully or not.", [("_total", {}, self.requests_completed)])
+        metric("in_flight_requests", "gauge", "Requests sent and not finished yet.", [("", {}, self.in_flight)])
+        metric("target_rps", "gauge", "Requests per second of the running probe.", [("", {}, self.target_rps)])
+        metric("achieved_rps", "gauge", "Send rate achieved by the running probe.", [("", {}, self.get_achieved_rps())])
+        metric("errors", "counter", "Failed requests by kind: connect, timeout, http_status, decode, in_flight_limit or other.", [("_total", {"type": kind}, count) for kind, count in sorted(self.errors.items())])
+
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets):
+            cumulative += count
+            buckets.append(("_bucket", {"le": str(bound)}, cumulative))
+        count = cumulative + self.latency_buckets[-1]
+        buckets.append(("_bucket", {"le": "+Inf"}, count))
+        buckets.append(("_sum", {}, self.latency_sum))
+        buckets.append(("_count", {}, count))
+        metric("request_duration_seconds", "histogram", "Response time of successful requests.", buckets)
+
+        if self.test_case is not None:
+            metric("probe", "info", "Test case and load of the latest probe.", [("_info", {"test_case": self.test_case, "load": str(self.load)}, 1)])
+
+        if self.search_test_case is not None:
+            metric("search", "info", "Test case and phase of the running search.", [("_info", {"test_case": self.search_test_case, "phase": str(self.search_state.get("phase", ""))}, 1)])
+            metric("search_value", "gauge", "Numeric values of the running search state, e.g. its bounds.", [
+                ("", {"name": key}, value)
+                for key, value in sorted(self.search_state.items())
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            ])
+
+        host_metrics = {}
+        for host, values in sorted(self.hosts.items()):
+            for key, value in values.items():
+                host_metrics.setdefault(key, []).append(("", {"host": host}, value))
+        for key, samples in host_metrics.items():
+            metric(f"host_{key}", "gauge", f"Latest {key.replace('_', ' ')} of each monitored host.", samples)
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def __format_labels(self, labels: dict) -> str:
+        labels = {**self.labels, **labels}
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class MetricsServer:
+    """
+    Serves a MetricsRegistry over HTTP at /metrics, from the event loop of the tester.
+    The exposition is only formatted when it is scraped.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        """
+        Initializes the MetricsServer.
+        :param registry: The registry to expose.
+        :param host: Interface to bind.
+        :param port: Port to bind.
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self.__handle, host=self.host, port=self.port)
+        logging.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            path = request.split(b" ", 2)[1] if request.count(b" ") >= 2 else b""
+            if path.split(b"?")[0] == b"/metrics":
+                status, content_type, body = "200 OK", CONTENT_TYPE, self.registry.render().encode()
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b"Not found, metrics are served at /metrics\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,110 @@
+from test_case import TestCase
+from test_result import TestResult
+from test_case_registry import create_test_case
+
+class MixComponent:
+    """
+    One test case of a MixTestCase, with the load it runs at and its share of the requests.
+    """
+
+    def __init__(self, test_case: TestCase, load: int, weight: float):
+        """
+        Initializes the MixComponent.
+        :param test_case: The test case sending the requests of this component.
+        :param load: The load of the component when the mix runs at load 0.
+        :param weight: The relative share of the requests sent by this component.
+        """
+        if weight <= 0:
+            raise ValueError(f"Weight of {test_case.get_name()} must be greater than zero.")
+        self.test_case = test_case
+        self.load = load
+        self.weight = weight
+
+    def to_json(self) -> dict:
+        return {
+            "test_case": self.test_case.get_name(),
+            "load": self.load,
+            "weight": self.weight
+        }
+
+class MixTestCase(TestCase):
+    """
+    A weighted traffic mix of several test cases sent under one requests per second schedule.
+
+    Each request goes to the next component of a smooth weighted round-robin, so the mix
+    is interleaved evenly and deterministically instead of drawn at random. The load the
+    mix runs at is an offset added to the load of every component, which lets the capacity
+    searches scale the whole mix as a single unit.
+    """
+
+    def __init__(self, components: list[MixComponent], application_base_url: str, name: str = None):
+        """
+        Initializes the MixTestCase.
+        :param components: The test cases of the mix with their loads and weights.
+        :param application_base_url: The base URL of the application to test.
+        :param name: The name of the mix. Defaults to one built from its components.
+        """
+        if not components:
+            raise ValueError("A mix needs at least one test case.")
+        total_weight = sum(component.weight for component in components)
+        super().__init__(
+            name=name or "mix-" + "-".join(f"{component.test_case.get_name()}@{component.load}" for component in components),
+            description="Weighted mix of " + ", ".join(
+                f"{component.weight / total_weight:.0%} {component.test_case.get_name()} at load {component.load}" for component in components
+            ),
+            application_base_url=application_base_url,
+            min_recommended_load=0
+        )
+        self._components = components
+        self._total_weight = total_weight
+        self._current_weights = [0.0] * len(components)
+
+    def get_components(self) -> list[MixComponent]:
+        return self._components
+
+    def next_component(self) -> MixComponent:
+        """
+        Picks the component of the next request with a smooth weighted round-robin.
+        :return: The MixComponent that sends the next request.
+        """
+        best = 0
+        for i, component in enumerate(self._components):
+            self._current_weights[i] += component.weight
+            if self._current_weights[i] > self._current_weights[best]:
+                best = i
+        self._current_weights[best] -= self._total_weight
+        return self._components[best]
+
+    async def run(self, load: int) -> TestResult:
+        # picked before the first await, so requests follow the schedule order
+        component = self.next_component()
+        return await component.test_case.run(load=component.load + load)
+
+    def to_json(self) -> dict:
+        return {
+            **super().to_json(),
+            "components": [component.to_json() for component in self._components]
+        }
+
+def parse_mix(mix: list[str], app_url: str) -> MixTestCase:
+    """
+    Builds a MixTestCase from 'name@load:weight' entries, e.g. ['fibonacci@15:0.8', 'bubble-sort@12:0.2'].
+    The load defaults to the minimum recommended load of the test case and the weight to 1.
+    :param mix: The components of the mix.
+    :param app_url: The base URL of the application to test.
+    :return: The MixTestCase.
+    """
+    components = []
+    for entry in mix:
+        name_and_load, _, weight = entry.partition(':')
+        name, _, load = name_and_load.partition('@')
+        test_case = create_test_case(name, app_url)
+        try:
+            components.append(MixComponent(
+                test_case=test_case,
+                load=int(load) if load else test_case.get_min_recommended_load(),
+                weight=float(weight) if weight else 1.0
+            ))
+        except ValueError as e:
+            raise ValueError(f"Invalid mix entry {entry}, expected name@load:weight: {e}")
+    return MixTestCase(components, application_base_url=app_url)
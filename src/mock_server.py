@@ -0,0 +1,60 @@
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from queueing_model import QueueingModel, fibonacci
+from datetime import datetime
+
+def _to_json_date(value: datetime) -> str:
+    # same format as JavaScript's Date.toJSON, used by the real application
+    return value.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+def create_mock_app(model: QueueingModel) -> Starlette:
+    """
+    Creates an ASGI application with the same endpoints and response contract as app/index.js.
+    :param model: The QueueingModel deciding how long each request takes.
+    :return: The Starlette application.
+    """
+
+    async def index(request: Request) -> JSONResponse:
+        return JSONResponse({
+            "message": "Welcome to the performance test service",
+            "endpoints": [
+                {"method": "GET", "path": "/fibonacci/:n"},
+                {"method": "GET", "path": "/bubble-sort?n=<number>"},
+            ],
+        })
+
+    async def fibonacci_endpoint(request: Request) -> JSONResponse:
+        n = int(request.path_params["n"])
+        span = await model.serve(model.fibonacci_service_time(n))
+        if span is None:
+            return JSONResponse({"error": "queue full"}, status_code=503)
+        start, end = span
+        return JSONResponse({"start": _to_json_date(start), "fibonacci": fibonacci(n), "end": _to_json_date(end)})
+
+    async def bubble_sort_endpoint(request: Request) -> JSONResponse:
+        n = int(request.query_params.get("n", 0))
+        span = await model.serve(model.bubble_sort_service_time(n))
+        if span is None:
+            return JSONResponse({"error": "queue full"}, status_code=503)
+        start, end = span
+        return JSONResponse({"start": _to_json_date(start), "end": _to_json_date(end)})
+
+    return Starlette(routes=[
+        Route("/", index),
+        Route("/fibonacci/{n:int}", fibonacci_endpoint),
+        Route("/bubble-sort", bubble_sort_endpoint),
+    ])
+
+async def serve_mock_app(model: QueueingModel, host: str = "127.0.0.1", port: int = 8080):
+    """
+    Serves the mock application with uvicorn until the process is interrupted.
+    :param model: The QueueingModel deciding how long each request takes.
+    :param host: The interface to bind.
+    :param port: The port to bind.
+    """
+    import uvicorn
+
+    config = uvicorn.Config(create_mock_app(model), host=host, port=port, log_level="warning")
+    await uvicorn.Server(config).serve()
@@ -0,0 +1,235 @@
+from benchmark_service import BenchmarkService
+from benchmark_checkpoint import BenchmarkCheckpoint
+from calibration_cache import CalibrationCache
+from cluster_service import ClusterService
+from test_execution_service import TestExecutionService
+from json_storage_service import JsonStorageService
+from get_cluster_from_config import get_cluster_from_config
+from adaptive_cool_down import AdaptiveCoolDown
+from steady_state_detector import SteadyStateDetector
+from test_case_registry import create_test_case, load_scenarios
+from mix_test_case import parse_mix
+from metrics import MetricsRegistry, MetricsServer
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+import asyncio
+import logging
+import runtime
+
+class MultiClusterBenchmarkService:
+    """
+    Benchmarks several independent clusters in parallel.
+
+    Every cluster runs in its own worker process, with its own event loop, ClusterService
+    and monitoring, so the load generated for one cluster does not compete for the
+    tester's CPU with the load generated for another.
+    """
+
+    def __init__(self, storage_path: str, max_parallel_clusters: int = None):
+        """
+        Initializes the MultiClusterBenchmarkService.
+        :param storage_path: Path to the storage directory where each worker saves its results.
+        :param max_parallel_clusters: Maximum number of clusters benchmarked at the same time. Defaults to all of them.
+        """
+        self.storage_path = storage_path
+        self.max_parallel_clusters = max_parallel_clusters
+
+    async def run_benchmarks(
+            self,
+            cluster_configs: list[dict],
+            test_case_names: list[str],
+            resume: bool = False,
+            adaptive_cool_down: bool = False,
+            steady_state_detector: SteadyStateDetector = None,
+            scenario_files: list[str] = None,
+            mix: list[str] = None,
+            metrics_host: str = "127.0.0.1",
+            metrics_port: int = None,
+            test_execution_options: dict = None,
+            **benchmark_options
+        ) -> tuple[dict[str, list[str]], dict[str, str]]:
+        """
+        Benchmarks every cluster in its own process. A cluster whose benchmark fails does not stop the others.
+        :param cluster_configs: The configuration of each cluster, as returned by get_cluster_configs_from_config.
+        :param test_case_names: Names of the test cases to run against every cluster.
+        :param resume: Whether each cluster resumes from its last checkpoint.
+        :param adaptive_cool_down: Whether rests wait for each cluster to return to its baseline usage.
+        :param steady_state_detector: Optional SteadyStateDetector separating the warm-up of every execution.
+        :param scenario_files: YAML scenario files each worker loads before resolving the test case names.
+        :param mix: Optional 'name@load:weight' entries benchmarked as a single weighted mix instead of test_case_names.
+        :param metrics_host: Interface the metrics endpoint of each worker binds.
+        :param metrics_port: Optional port of the metrics endpoint of the first cluster; the next clusters use the following ports.
+        :param test_execution_options: Keyword arguments forwarded to the TestExecutionService of every cluster, e.g. max_in_flight.
+        :param benchmark_options: Keyword arguments forwarded to BenchmarkService.run_benchmark.
+        :return: A dictionary mapping each cluster name to the benchmark files saved for it, and one mapping each cluster whose benchmark failed to its error.
+        """
+        if not cluster_configs:
+            raise ValueError("No clusters provided for benchmarking.")
+
+        loop = asyncio.get_running_loop()
+        # spawn gives each worker a fresh interpreter instead of a fork of the running event loop
+        context = multiprocessing.get_context("spawn")
+        max_workers = self.max_parallel_clusters or len(cluster_configs)
+
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            futures = [
+                loop.run_in_executor(
+                    executor,
+                    run_cluster_benchmark,
+                    cluster_config,
+                    test_case_names,
+                    self.storage_path,
+                    resume,
+                    adaptive_cool_down,
+                    steady_state_detector,
+                    scenario_files or [],
+                    mix,
+                    (metrics_host, metrics_port + i) if metrics_port is not None else None,
+                    test_execution_options or {},
+                    runtime.describe(),
+                    benchmark_options,
+                )
+                for i, cluster_config in enumerate(cluster_configs)
+            ]
+            results = await asyncio.gather(*futures, return_exceptions=True)
+
+        saved_files, failures = {}, {}
+        for cluster_config, result in zip(cluster_configs, results):
+            name = cluster_config['app']['name']
+            if isinstance(result, Exception):
+                logging.error(f"Benchmark of cluster {name} failed: {result}")
+                failures[name] = f"{type(result).__name__}: {result}"
+                continue
+            saved_files[name] = result
+
+        return saved_files, failures
+
+    @staticmethod
+    async def benchmark_cluster(
+            cluster_config: dict,
+            test_case_names: list[str],
+            storage_service: JsonStorageService,
+            resume: bool = False,
+            adaptive_cool_down: bool = False,
+            steady_state_detector: SteadyStateDetector = None,
+            mix: list[str] = None,
+            metrics: MetricsRegistry = None,
+            test_execution_options: dict = None,
+            calibration: bool = True,
+            **benchmark_options
+        ) -> list[str]:
+        """
+        Benchmarks a single cluster in the current process and saves its results.
+        The optional 'loadBudget' entry of the cluster configuration caps the requests per second used on it.
+        :param cluster_config: The configuration of the cluster.
+        :param test_case_names: Names of the test cases to run.
+        :param storage_service: The storage service where results and checkpoints are saved.
+        :param resume: Whether to resume from the last checkpoint of the cluster.
+        :param adaptive_cool_down: Whether rests wait for the cluster to return to its baseline usage, capped by the rest time.
+        :param steady_state_detector: Optional SteadyStateDetector separating the warm-up of every execution.
+        :param mix: Optional 'name@load:weight' entries benchmarked as a single weighted mix instead of test_case_names.
+        :param metrics: Optional MetricsRegistry updated live during the benchmark.
+        :param test_execution_options: Keyword arguments forwarded to the TestExecutionService, e.g. max_in_flight.
+        :param calibration: Whether the searches start from the calibration cache of the cluster, which is updated either way.
+        :param benchmark_options: Keyword arguments forwarded to BenchmarkService.run_benchmark.
+        :return: The names of the saved benchmark files.
+        """
+        cluster = get_cluster_from_config(cluster_config)
+        checkpoint = BenchmarkCheckpoint(
+            storage_service=storage_service,
+            file_name=f"{cluster.name}_benchmark_checkpoint.json",
+            resume=resume,
+        )
+        cluster_service = ClusterService()
+        benchmark_service = BenchmarkService(
+            test_execution_service=TestExecutionService(
+                cluster_service=cluster_service,
+                checkpoint=checkpoint,
+                max_requests_per_second=cluster_config.get('loadBudget', {}).get('maxRequestsPerSecond'),
+                cool_down=AdaptiveCoolDown(cluster_service=cluster_service, cluster=cluster) if adaptive_cool_down else None,
+                steady_state_detector=steady_state_detector,
+                metrics=metrics,
+                **(test_execution_options or {}),
+            ),
+            calibration_cache=CalibrationCache(
+                storage_service=storage_service,
+                file_name=f"{cluster.name}_calibration.json",
+                use_cached=calibration,
+            ),
+        )
+        if mix:
+            test_cases = [parse_mix(mix, cluster_config['app']['url'])]
+        else:
+            test_cases = [create_test_case(test_case, cluster_config['app']['url']) for test_case in test_case_names]
+
+        for test_case in test_cases:
+            print(f"Running benchmark for test case: {test_case.__class__.__name__} on cluster {cluster.name}")
+
+        benchmarks = await benchmark_service.run_benchmark(
+            test_cases=test_cases,
+            cluster=cluster,
+            **benchmark_options
+        )
+
+        saved_files = []
+        for benchmark in benchmarks:
+
+            file_name = f"{benchmark.cluster.name}-{benchmark.test_case.get_name()}-{datetime.now().strftime('%Y%m%d_%H%M%S')}_benchmark.json"
+            print(f"Benchmark completed. Saving results to {file_name} in {storage_service.base_path}")
+
+            storage_service.save(
+                file_name=file_name,
+                data=benchmark.to_json()  # Save the benchmark in a short JSON format
+            )
+            saved_files.append(file_name)
+
+        # the results are saved: a later --resume must not replay this benchmark
+        checkpoint.complete()
+        return saved_files
+
+def run_cluster_benchmark(
+        cluster_config: dict,
+        test_case_names: list[str],
+        storage_path: str,
+        resume: bool,
+        adaptive_cool_down: bool,
+        steady_state_detector: SteadyStateDetector,
+        scenario_files: list[str],
+        mix: list[str],
+        metrics_address: tuple[str, int],
+        test_execution_options: dict,
+        runtime_options: dict,
+        benchmark_options: dict
+    ) -> list[str]:
+    """
+    Worker process entry point: benchmarks one cluster on a fresh event loop,
+    using the same runtime (event loop and JSON codec) as the parent process.
+    :return: The names of the saved benchmark files.
+    """
+    logging.basicConfig(level=logging.INFO, format=f"%(levelname)s:{cluster_config['app']['name']}:%(message)s")
+    runtime.use_event_loop(runtime_options['event_loop'])
+    runtime.use_json_codec(runtime_options['json_codec'])
+    # the registry of the parent process is not inherited by spawned workers
+    for scenario_file in scenario_files:
+        load_scenarios(scenario_file)
+
+    async def benchmark():
+        metrics = None
+        if metrics_address is not None:
+            metrics = MetricsRegistry(labels={"cluster": cluster_config['app']['name']})
+            await MetricsServer(metrics, host=metrics_address[0], port=metrics_address[1]).start()
+        return await MultiClusterBenchmarkService.benchmark_cluster(
+            cluster_config=cluster_config,
+            test_case_names=test_case_names,
+            storage_service=JsonStorageService(storage_path),
+            resume=resume,
+            adaptive_cool_down=adaptive_cool_down,
+            steady_state_detector=steady_state_detector,
+            mix=mix,
+            metrics=metrics,
+            test_execution_options=test_execution_options,
+            **benchmark_options
+        )
+
+    return asyncio.run(benchmark())
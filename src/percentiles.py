@@ -0,0 +1,19 @@
+import math
+
+def percentiles(values: list[float], quantiles: tuple[float, ...] = (50, 90, 99)) -> dict:
+    """
+    Calculates nearest-rank percentiles and the maximum of a list of values.
+    :param values: The values to summarise.
+    :param quantiles: The percentiles to calculate, between 0 and 100.
+    :return: A dictionary like {'p50': ..., 'p90': ..., 'p99': ..., 'max': ...}, with None values when there are no values.
+    """
+    if not values:
+        return {**{f"p{quantile:g}": None for quantile in quantiles}, "max": None}
+
+    ordered = sorted(values)
+    summary = {}
+    for quantile in quantiles:
+        rank = max(1, math.ceil(quantile / 100 * len(ordered)))
+        summary[f"p{quantile:g}"] = ordered[rank - 1]
+    summary["max"] = ordered[-1]
+    return summary
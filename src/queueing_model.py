@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+import runtime
+import asyncio
+import random
+
+DISTRIBUTIONS = ("deterministic", "exponential")
+
+class QueueingModel:
+    """
+    Simple multi-server queueing model emulating the test application, behind the mock server and
+    the offline simulation (see simulation.py).
+
+    Requests wait for one of `servers` workers (FIFO), then hold it for a service time derived
+    from the work the real application would do. Requests arriving while `max_queue` requests
+    are already waiting are rejected, like an overloaded service.
+    """
+
+    def __init__(
+            self,
+            servers: int = 4,
+            base_service_time: float = 0.001,
+            fibonacci_call_time: float = 0.0005,
+            bubble_sort_operation_time: float = 2e-9,
+            distribution: str = "deterministic",
+            max_queue: int = None,
+            seed: int = None,
+        ):
+        """
+        Initializes the QueueingModel.
+        :param servers: Number of requests served concurrently.
+        :param base_service_time: Fixed cost of every request, in seconds.
+        :param fibonacci_call_time: Cost of each recursive call of /fibonacci/:n, in seconds.
+        :param bubble_sort_operation_time: Cost of each comparison of /bubble-sort, in seconds.
+        :param distribution: Service time distribution: 'deterministic' or 'exponential' (with the same mean).
+        :param max_queue: Maximum number of waiting requests before rejecting new ones. Unbounded when None.
+        :param seed: Seed for the service time distribution.
+        """
+        if servers <= 0:
+            raise ValueError("servers must be greater than zero.")
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown service time distribution: {distribution}. Supported distributions are: {', '.join(DISTRIBUTIONS)}.")
+
+        self.servers = servers
+        self.base_service_time = base_service_time
+        self.fibonacci_call_time = fibonacci_call_time
+        self.bubble_sort_operation_time = bubble_sort_operation_time
+        self.distribution = distribution
+        self.max_queue = max_queue
+        self._random = random.Random(seed)
+        self._semaphore = None
+        self.waiting = 0
+
+    def fibonacci_service_time(self, n: int) -> float:
+        # the application computes fibonacci(n) with 2 * fibonacci(n) - 1 recursive requests
+        calls = 2 * fibonacci(n) - 1
+        return self.base_service_time + calls * self.fibonacci_call_time
+
+    def bubble_sort_service_time(self, n: int) -> float:
+        operations = n * (n - 1) / 2
+        return self.base_service_time + operations * self.bubble_sort_operation_time
+
+    def saturation_rate(self, mean_service_time: float) -> float:
+        """
+        Highest rate the servers complete requests of a mean service time at, in requests per second.
+        Above it the queue only grows.
+        """
+        return self.servers / mean_service_time if mean_service_time > 0 else float("inf")
+
+    def sample(self, mean: float) -> float:
+        if self.distribution == "exponential":
+            return self._random.expovariate(1.0 / mean) if mean > 0 else 0.0
+        return mean
+
+    async def serve(self, mean_service_time: float) -> tuple[datetime, datetime] | None:
+        """
+        Waits for a free server and holds it for a sampled service time.
+        :param mean_service_time: The mean service time of the request, in seconds.
+        :return: The start and end of the service, or None if the request was rejected.
+        """
+        if self._semaphore is None:
+            # created lazily so it belongs to the event loop serving the requests
+            self._semaphore = asyncio.Semaphore(self.servers)
+
+        if self.max_queue is not None and self._semaphore.locked() and self.waiting >= self.max_queue:
+            return None
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        try:
+            start = runtime.now(timezone.utc)
+            await asyncio.sleep(self.sample(mean_service_time))
+            return start, runtime.now(timezone.utc)
+        finally:
+            self._semaphore.release()
+
+def fibonacci(n: int) -> int:
+    previous, current = 0, 1
+    for _ in range(max(n, 1) - 1):
+        previous, current = current, previous + current
+    return current
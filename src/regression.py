@@ -0,0 +1,169 @@
+from timeline import parse_timestamps
+import numpy as np
+import math
+
+# exit codes of 'data-analysis regression', for pipelines
+NO_REGRESSION = 0
+REGRESSION = 1
+NOT_COMPARABLE = 2
+
+def load_latencies(benchmark: dict) -> dict[int, dict]:
+    """
+    Loads the response times of every load of a benchmark, parsing the timestamps of each execution in one vectorized pass.
+    When a load was probed by several executions, the last one is kept, as in the saved benchmark it is the one the search settled on.
+    :param benchmark: The benchmark, as saved by Benchmark.to_json.
+    :return: A dictionary mapping each load to its requests per second and response times (a numpy array, empty when the results were not saved).
+    """
+    loads = {}
+    for execution in benchmark["test_executions"]:
+        results = execution.get("results")
+        load = execution.get("load")
+        if load is None:
+            load = results[0]["load"] if results else 0
+        latencies = np.array([])
+        if isinstance(results, list) and results:
+            latencies = (
+                parse_timestamps([result["request_span"]["end"] for result in results])
+                - parse_timestamps([result["request_span"]["start"] for result in results])
+            )
+        loads[load] = {"rps": execution.get("request_per_second"), "latencies": latencies}
+    return loads
+
+def mann_whitney_u(baseline: np.ndarray, candidate: np.ndarray) -> dict:
+    """
+    One-sided Mann-Whitney U test of whether the candidate values tend to be larger than the baseline values,
+    with the normal approximation and the tie correction.
+    :param baseline: The baseline sample.
+    :param candidate: The candidate sample.
+    :return: A dictionary with U of the candidate, the p-value, and the probability that a candidate value is larger than a baseline value (ties counted half).
+    """
+    n1, n2 = len(baseline), len(candidate)
+    values = np.concatenate((baseline, candidate))
+    ranks = _average_ranks(values)
+    u = ranks[n1:].sum() - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    _, tie_counts = np.unique(values, return_counts=True)
+    variance = n1 * n2 / 12 * ((n + 1) - (tie_counts ** 3 - tie_counts).sum() / (n * (n - 1)))
+    if variance <= 0:
+        p_value = 1.0
+    else:
+        # continuity correction towards the mean
+        z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+        p_value = 0.5 * math.erfc(z / math.sqrt(2))
+    return {"u": float(u), "p_value": p_value, "probability_larger": float(u / (n1 * n2))}
+
+def bootstrap_ratio(baseline: np.ndarray, candidate: np.ndarray, quantile: float, samples: int = 2000, confidence: float = 0.95, seed: int = None) -> dict:
+    """
+    Bootstrap confidence interval of the ratio between a nearest-rank quantile of the candidate and the same quantile of the baseline.
+    :param baseline: The baseline sample.
+    :param candidate: The candidate sample.
+    :param quantile: The quantile compared, between 0 and 1.
+    :param samples: Number of bootstrap resamples.
+    :param confidence: Confidence level of the interval.
+    :param seed: Optional seed, for reproducible reports.
+    :return: A dictionary with the baseline and candidate quantiles, their ratio and the interval of the ratio.
+    """
+    rng = np.random.default_rng(seed)
+    baseline, candidate = np.sort(baseline), np.sort(candidate)
+    ratios = _resampled_quantiles(rng, candidate, quantile, samples) / _resampled_quantiles(rng, baseline, quantile, samples)
+    tail = (1 - confidence) / 2
+    baseline_value = float(baseline[_rank(len(baseline), quantile) - 1])
+    candidate_value = float(candidate[_rank(len(candidate), quantile) - 1])
+    return {
+        "baseline": baseline_value,
+        "candidate": candidate_value,
+        "ratio": candidate_value / baseline_value,
+        "low": float(np.quantile(ratios, tail)),
+        "high": float(np.quantile(ratios, 1 - tail)),
+    }
+
+def compare_benchmarks(baseline: dict, candidate: dict, alpha: float = 0.05, threshold: float = 0.05, bootstrap_samples: int = 2000, seed: int = None) -> dict:
+    """
+    Compares a candidate benchmark with a baseline, load by load.
+
+    The latency of a load regressed when the candidate is slower with statistical significance and
+    by more than the threshold: for the median, the Mann-Whitney p-value is below alpha and the
+    bootstrap interval of the median ratio lies above 1; for the p99, its bootstrap interval lies
+    above 1. In both cases the ratio itself must exceed 1 + threshold. The maximum sustainable RPS
+    is a single search result per load, so it regressed when it dropped by more than the threshold.
+    Improvements are reported the same way, mirrored.
+    :param baseline: The baseline benchmark, as saved by Benchmark.to_json.
+    :param candidate: The candidate benchmark.
+    :param alpha: Significance level of the tests.
+    :param threshold: Smallest relative change reported, e.g. 0.05 for 5%.
+    :param bootstrap_samples: Number of bootstrap resamples.
+    :param seed: Optional seed of the bootstrap.
+    :return: The report: one entry per load found in both benchmarks, the loads found in only one, the regressions and the exit code.
+    """
+    baseline_loads = load_latencies(baseline)
+    candidate_loads = load_latencies(candidate)
+    common = sorted(set(baseline_loads) & set(candidate_loads))
+    loads = []
+    regressions = []
+    for load in common:
+        base, cand = baseline_loads[load], candidate_loads[load]
+        entry = {"load": load, "baseline_rps": base["rps"], "candidate_rps": cand["rps"], "regressions": [], "improvements": []}
+
+        if base["rps"] and cand["rps"] is not None:
+            entry["rps_change"] = cand["rps"] / base["rps"] - 1
+            if entry["rps_change"] < -threshold:
+                entry["regressions"].append("max_rps")
+            elif entry["rps_change"] > threshold:
+                entry["improvements"].append("max_rps")
+
+        if len(base["latencies"]) >= 2 and len(cand["latencies"]) >= 2:
+            test = mann_whitney_u(base["latencies"], cand["latencies"])
+            entry["mann_whitney"] = test
+            for name, quantile in (("p50", 0.5), ("p99", 0.99)):
+                interval = bootstrap_ratio(base["latencies"], cand["latencies"], quantile, bootstrap_samples, 1 - alpha, seed)
+                entry[name] = interval
+                # the median needs both tests to agree; the tail has no rank test of its own
+                slower = interval["low"] > 1 and interval["ratio"] > 1 + threshold and (name != "p50" or test["p_value"] < alpha)
+                faster = interval["high"] < 1 and interval["ratio"] < 1 - threshold and (name != "p50" or 1 - test["p_value"] < alpha)
+                if slower:
+                    entry["regressions"].append(f"latency_{name}")
+                elif faster:
+                    entry["improvements"].append(f"latency_{name}")
+        else:
+            entry["note"] = "latency not compared: one of the benchmarks was saved without the results of this load"
+
+        regressions.extend(f"load {load}: {name}" for name in entry["regressions"])
+        loads.append(entry)
+
+    return {
+        "alpha": alpha,
+        "threshold": threshold,
+        "loads": loads,
+        "only_in_baseline": sorted(set(baseline_loads) - set(candidate_loads)),
+        "only_in_candidate": sorted(set(candidate_loads) - set(baseline_loads)),
+        "regressions": regressions,
+        "exit_code": NOT_COMPARABLE if not common else REGRESSION if regressions else NO_REGRESSION
+    }
+
+def _average_ranks(values: np.ndarray) -> np.ndarray:
+    order = np.argsort(values, kind="mergesort")
+    ordered = values[order]
+    # first and last position of every run of equal values
+    starts = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))
+    ends = np.concatenate((starts[1:], [len(values)]))
+    run_ranks = (starts + ends + 1) / 2
+    ranks = np.empty(len(values))
+    ranks[order] = np.repeat(run_ranks, ends - starts)
+    return ranks
+
+def _rank(count: int, quantile: float) -> int:
+    return max(1, math.ceil(quantile * count))
+
+def _resampled_quantiles(rng: np.random.Generator, ordered: np.ndarray, quantile: float, samples: int) -> np.ndarray:
+    """
+    Draws the quantile of many bootstrap resamples without building them.
+    A resample draws len(ordered) indices uniformly, and its k-th smallest index is the floor of n times
+    the k-th smallest of n uniform variables, which follows a Beta(k, n - k + 1) distribution. So the
+    quantile of a resample is the sorted value at that index, drawn in O(1) instead of O(n).
+    :param ordered: The sample, sorted.
+    :return: The quantile of each resample.
+    """
+    count = len(ordered)
+    rank = _rank(count, quantile)
+    indexes = (rng.beta(rank, count - rank + 1, samples) * count).astype(np.int64)
+    return ordered[np.minimum(indexes, count - 1)]
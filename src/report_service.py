@@ -0,0 +1,137 @@
+from data_analysis_service import DataAnalysisService
+from downsampling import LatencyHistogram
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+import asyncio
+import logging
+import base64
+import html
+import os
+
+class ReportService:
+    """
+    Builds a single HTML report comparing benchmarks: throughput and response time against the
+    load, CPU and RAM usage per host and response time distributions at each load, and the
+    timeline of every execution.
+
+    Every file is loaded and parsed once through the DataAnalysisService, the chart data is
+    prepared in this process, and the charts are rendered in parallel worker processes on the
+    non-interactive Agg backend. The PNGs are embedded in the HTML, so the report is one file.
+    """
+
+    def __init__(self, data_analysis_service: DataAnalysisService, max_workers: int = None, dpi: int = 150):
+        """
+        Initializes the ReportService.
+        :param data_analysis_service: The service the benchmark files are loaded and analyzed with.
+        :param max_workers: Maximum number of rendering processes. Defaults to the number of CPUs.
+        :param dpi: Resolution of the charts.
+        """
+        self.data_analysis_service = data_analysis_service
+        self.max_workers = max_workers
+        self.dpi = dpi
+
+    def plan_charts(self, benchmark_files: list[str], benchmark_names: list[str] = None, alias_hosts: dict[str, str] = None, loads: list[int] = None, bucket_seconds: float = 1.0) -> list[dict]:
+        """
+        Prepares the data of every chart of the report.
+        :param benchmark_files: The benchmark files to compare.
+        :param benchmark_names: Names of the benchmarks, in the order of the files. Defaults to benchmark_1, benchmark_2, ...
+        :param alias_hosts: Mapping of hosts to the names shown in the charts.
+        :param loads: Loads compared. Defaults to the loads found in every file.
+        :param bucket_seconds: Length of the windows of the timelines, in seconds.
+        :return: A list of charts as dictionaries with the 'section', 'title', 'kind' and 'args' of each chart.
+        """
+        analysis = self.data_analysis_service
+        if not benchmark_names or len(benchmark_names) != len(benchmark_files):
+            benchmark_names = [f"benchmark_{i+1}" for i in range(len(benchmark_files))]
+        alias_hosts = alias_hosts or {}
+
+        curves = {name: analysis.avg_response_time_benchmark(file) for file, name in zip(benchmark_files, benchmark_names)}
+        charts = [{"section": "Throughput", "title": "Max RPS and average response time per load", "kind": "throughput-load", "args": (curves,)}]
+
+        if loads is None:
+            loads = sorted(set.intersection(*({entry['load'] for entry in entries} for entries in curves.values())))
+        for load in loads:
+            cpu_per_host = analysis.cpu_usage_compare(benchmark_files, load, alias_hosts, benchmark_names)
+            if cpu_per_host:
+                charts.append({"section": f"Load {load}", "title": f"CPU usage at load {load}", "kind": "cpu-usage-compare", "args": (cpu_per_host,)})
+            ram_per_host = analysis.ram_usage_compare(benchmark_files, load, alias_hosts, benchmark_names)
+            if ram_per_host:
+                charts.append({"section": f"Load {load}", "title": f"RAM usage at load {load}", "kind": "ram-usage-compare", "args": (ram_per_host,)})
+            # summarised here so the workers receive a fixed-size histogram instead of every response time
+            response_times = {
+                name: {**data, 'response_times': LatencyHistogram.from_values(data['response_times'])}
+                for name, data in analysis.response_time_compare(benchmark_files, load, benchmark_names).items()
+                if len(data['response_times'])
+            }
+            if response_times:
+                charts.append({"section": f"Load {load}", "title": f"Response times at load {load}", "kind": "response-time-compare", "args": (response_times,)})
+
+        for file, name in zip(benchmark_files, benchmark_names):
+            for entry in analysis.timeline_benchmark(file, bucket_seconds):
+                title = f"{name}: load {entry['load']} at {entry['rps']} RPS"
+                charts.append({"section": f"Timelines of {name}", "title": title, "kind": "timeline", "args": (entry['timeline'].columns, title)})
+        return charts
+
+    async def render(self, charts: list[dict]) -> list[bytes | None]:
+        """
+        Renders the charts in parallel worker processes.
+        :param charts: The charts planned by plan_charts.
+        :return: The PNG of each chart, None for the charts that failed.
+        """
+        from charts import render_png
+        loop = asyncio.get_running_loop()
+        # spawn gives each worker a fresh interpreter instead of a fork of the running event loop
+        context = multiprocessing.get_context("spawn")
+        max_workers = min(self.max_workers or os.cpu_count() or 1, len(charts)) or 1
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, render_png, chart["kind"], self.dpi, *chart["args"]) for chart in charts),
+                return_exceptions=True
+            )
+        images = []
+        for chart, result in zip(charts, results):
+            if isinstance(result, Exception):
+                logging.error(f"Rendering chart '{chart['title']}' failed: {result}")
+                result = None
+            images.append(result)
+        return images
+
+    async def build(self, benchmark_files: list[str], benchmark_names: list[str] = None, alias_hosts: dict[str, str] = None, loads: list[int] = None, bucket_seconds: float = 1.0) -> str:
+        """
+        Builds the report.
+        :return: The HTML of the report.
+        """
+        charts = self.plan_charts(benchmark_files, benchmark_names, alias_hosts, loads, bucket_seconds)
+        images = await self.render(charts)
+        return to_html(charts, images, benchmark_files)
+
+def to_html(charts: list[dict], images: list[bytes | None], benchmark_files: list[str]) -> str:
+    """
+    Lays the rendered charts out as one self-contained HTML page.
+    :param charts: The charts planned by ReportService.plan_charts.
+    :param images: The PNG of each chart, None for the charts that failed.
+    :param benchmark_files: The compared files, listed in the header.
+    :return: The HTML.
+    """
+    parts = [
+        "<!DOCTYPE html>",
+        "<html><head><meta charset=\"utf-8\"><title>cluster-tester report</title>",
+        "<style>body{font-family:sans-serif;margin:2em;max-width:1200px}img{max-width:100%}figure{margin:1em 0 2em}</style>",
+        "</head><body>",
+        "<h1>cluster-tester report</h1>",
+        f"<p>Generated {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} from {', '.join(html.escape(file) for file in benchmark_files)}.</p>",
+    ]
+    section = None
+    for chart, image in zip(charts, images):
+        if chart["section"] != section:
+            section = chart["section"]
+            parts.append(f"<h2>{html.escape(section)}</h2>")
+        parts.append(f"<figure><figcaption>{html.escape(chart['title'])}</figcaption>")
+        if image is None:
+            parts.append("<p>This chart could not be rendered, see the log.</p>")
+        else:
+            parts.append(f"<img alt=\"{html.escape(chart['title'])}\" src=\"data:image/png;base64,{base64.b64encode(image).decode()}\">")
+        parts.append("</figure>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
@@ -0,0 +1,52 @@
+import time
+
+PHASES = ("pool_wait", "connect", "tls", "send", "ttfb", "body")
+
+class RequestTrace:
+    """
+    Collects the timings of one HTTP request through the httpx 'trace' extension and
+    splits its duration into phases:
+
+    - pool_wait: from the request call until a connection is opened or a pooled one starts sending
+    - connect: TCP connection setup, only when a new connection was opened
+    - tls: TLS handshake, only when a new HTTPS connection was opened
+    - send: sending the request headers and body
+    - ttfb: from the end of the request until the response headers arrived (network and server)
+    - body: reading the response body
+
+    Usage: ``client.get(url, extensions=trace.extensions)`` then ``trace.phases()``.
+    """
+    __slots__ = ("start", "marks", "extensions")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = {}
+        self.extensions = {"trace": self.__trace}
+
+    async def __trace(self, event_name: str, info: dict):
+        # 'http11.send_request_headers.started' and 'http2.send_request_headers.started' are the same mark
+        protocol, _, event = event_name.partition(".")
+        self.marks[event if protocol in ("http11", "http2") else event_name] = time.perf_counter()
+
+    def phases(self) -> dict:
+        """
+        Computes the phases of the traced request.
+        :return: A dictionary with the duration of each of PHASES in seconds, None for phases that did not happen.
+        """
+        marks = self.marks
+        headers_started = marks.get("send_request_headers.started")
+        connect_started = marks.get("connection.connect_tcp.started")
+        first_activity = connect_started or headers_started
+        return {
+            "pool_wait": first_activity - self.start if first_activity else None,
+            "connect": _span(marks, "connection.connect_tcp.started", "connection.connect_tcp.complete"),
+            "tls": _span(marks, "connection.start_tls.started", "connection.start_tls.complete"),
+            "send": _span(marks, "send_request_headers.started", "send_request_body.complete"),
+            "ttfb": _span(marks, "send_request_body.complete", "receive_response_headers.complete"),
+            "body": _span(marks, "receive_response_headers.complete", "receive_response_body.complete"),
+        }
+
+def _span(marks: dict, start: str, end: str):
+    if start in marks and end in marks:
+        return marks[end] - marks[start]
+    return None
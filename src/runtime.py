@@ -0,0 +1,125 @@
+"""
+Runtime layer of the load generator: event loop, clock, JSON decoder and HTTP client used on the request hot path.
+
+Faster implementations (uvloop, orjson) are used when selected and installed; otherwise the
+standard library is used, so none of them is a hard dependency.
+"""
+from datetime import datetime
+import asyncio
+import json
+import logging
+
+EVENT_LOOPS = ("asyncio", "uvloop")
+JSON_CODECS = ("json", "orjson")
+
+event_loop_name = "asyncio"
+json_codec_name = "json"
+json_loads = json.loads
+
+_http_clients = {}
+
+def use_event_loop(name: str) -> str:
+    """
+    Installs the event loop policy used by the next asyncio.run call.
+    Falls back to the default asyncio loop when the selected one is not installed.
+    :param name: The event loop to use: 'asyncio' or 'uvloop'.
+    :return: The name of the event loop actually installed.
+    """
+    global event_loop_name
+    if name not in EVENT_LOOPS:
+        raise ValueError(f"Unknown event loop: {name}. Supported event loops are: {', '.join(EVENT_LOOPS)}.")
+
+    if name == "uvloop":
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            logging.warning("uvloop is not installed, using the default asyncio event loop.")
+            name = "asyncio"
+
+    if name == "asyncio":
+        asyncio.set_event_loop_policy(None)
+
+    event_loop_name = name
+    return name
+
+def use_json_codec(name: str) -> str:
+    """
+    Selects the JSON decoder used for responses.
+    Falls back to the standard library when the selected one is not installed.
+    :param name: The JSON codec to use: 'json' or 'orjson'.
+    :return: The name of the JSON codec actually selected.
+    """
+    global json_codec_name, json_loads
+    if name not in JSON_CODECS:
+        raise ValueError(f"Unknown JSON codec: {name}. Supported JSON codecs are: {', '.join(JSON_CODECS)}.")
+
+    json_loads = json.loads
+    if name == "orjson":
+        try:
+            import orjson
+            json_loads = orjson.loads
+        except ImportError:
+            logging.warning("orjson is not installed, using the standard library json module.")
+            name = "json"
+
+    json_codec_name = name
+    return name
+
+def now(tz=None) -> datetime:
+    """
+    Returns the current time of the clock driving the running event loop, as datetime.now would.
+    That is the wall clock, except on a loop running on virtual time (simulation.VirtualTimeEventLoop),
+    where it is the simulated time, so schedules and spans stay consistent with asyncio.sleep.
+    :param tz: The time zone, as in datetime.now.
+    :return: The current time.
+    """
+    try:
+        loop_now = getattr(asyncio.get_running_loop(), "now", None)
+    except RuntimeError:
+        loop_now = None
+    return loop_now(tz) if loop_now else datetime.now(tz)
+
+def is_virtual_time() -> bool:
+    """
+    Tells whether the running event loop runs on virtual time, where the wall clock and CPU time of the process mean nothing.
+    """
+    try:
+        return getattr(asyncio.get_running_loop(), "virtual_time", False)
+    except RuntimeError:
+        return False
+
+def get_http_client():
+    """
+    Returns the HTTP client shared by every request sent from the running event loop.
+    Sharing it keeps idle connections alive between requests, instead of building a client,
+    its SSL context and a new connection for every request.
+    :return: An httpx.AsyncClient bound to the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None:
+        import httpx
+
+        # no connection limit: every scheduled request is sent right away, as with one client per request
+        client = httpx.AsyncClient(timeout=30.0, limits=httpx.Limits(max_connections=None, max_keepalive_connections=None))
+        _http_clients[loop] = client
+    return client
+
+async def close_http_client():
+    """
+    Closes the HTTP client of the running event loop, if one was created.
+    """
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+def describe() -> dict:
+    """
+    Describes the runtime selected for the hot path.
+    :return: A dictionary with the event loop and JSON codec in use.
+    """
+    return {
+        "event_loop": event_loop_name,
+        "json_codec": json_codec_name
+    }
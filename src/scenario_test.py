@@ -0,0 +1,152 @@
+from test_case import TestCase
+from test_result import TestResult
+from timespan import Timespan
+from urllib.parse import urlencode
+import datetime
+import json
+from request_trace import RequestTrace
+import runtime
+
+TRANSFORMS = ("identity", "power_of_two", "linear")
+
+class PreparedRequest:
+    """
+    A request of a scenario with every template already filled in for one load.
+    """
+    __slots__ = ("method", "url", "headers", "content")
+
+    def __init__(self, method: str, url: str, headers: dict, content: bytes | None):
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.content = content
+
+class ScenarioTest(TestCase):
+    """
+    A test case described declaratively, usually loaded from a YAML scenario file.
+
+    The scenario is validated and compiled once. The request for a given load is then built
+    the first time that load is used and reused for every following request, so sending a
+    request does no string formatting or encoding.
+    """
+
+    def __init__(self, spec: dict, application_base_url: str):
+        """
+        Initializes the ScenarioTest from its specification.
+        :param spec: The scenario: name, method, path, parameters, query, headers, body and response fields.
+        :param application_base_url: The base URL of the application to test.
+        """
+        super().__init__(
+            name=spec['name'],
+            description=spec.get('description', f"Scenario {spec['name']}"),
+            application_base_url=application_base_url,
+            min_recommended_load=spec.get('min_recommended_load', 1)
+        )
+        self._method = spec.get('method', 'GET').upper()
+        self._path = spec['path']
+        self._parameters = spec.get('parameters', {'load': {}})
+        self._query = spec.get('query', {})
+        self._headers = spec.get('headers', {})
+        self._body = spec.get('body')
+
+        response = spec.get('response', {})
+        self._start_field = response.get('start', 'start').split('.')
+        self._end_field = response.get('end', 'end').split('.')
+
+        for parameter, mapping in self._parameters.items():
+            transform = mapping.get('transform', 'identity')
+            if transform not in TRANSFORMS:
+                raise ValueError(f"Unknown transform {transform} for parameter {parameter} of scenario {self._name}. Supported transforms are: {', '.join(TRANSFORMS)}.")
+
+        self._prepared: dict[int, PreparedRequest] = {}
+        # fail on a bad template now rather than in the middle of a test execution
+        self.prepare(self._min_recommended_load)
+
+    def parameters_for_load(self, load: int) -> dict:
+        """
+        Maps a load to the values of the scenario parameters.
+        :param load: The load of the request.
+        :return: A dictionary with the value of each parameter.
+        """
+        values = {}
+        for parameter, mapping in self._parameters.items():
+            transform = mapping.get('transform', 'identity')
+            if transform == 'power_of_two':
+                values[parameter] = 2 ** load
+            elif transform == 'linear':
+                values[parameter] = mapping.get('scale', 1) * load + mapping.get('offset', 0)
+            else:
+                values[parameter] = load
+        return values
+
+    def prepare(self, load: int) -> PreparedRequest:
+        """
+        Returns the request for a load, building it the first time that load is used.
+        :param load: The load of the request.
+        :return: The PreparedRequest.
+        """
+        prepared = self._prepared.get(load)
+        if prepared is not None:
+            return prepared
+
+        values = self.parameters_for_load(load)
+        url = self._application_base_url + self._path.format(**values)
+        if self._query:
+            url += '?' + urlencode({key: _fill(value, values) for key, value in self._query.items()})
+
+        headers = {key: _fill(value, values) for key, value in self._headers.items()}
+        content = None
+        if self._body is not None:
+            content = json.dumps(_fill(self._body, values)).encode()
+            headers.setdefault('Content-Type', 'application/json')
+
+        prepared = PreparedRequest(self._method, url, headers, content)
+        self._prepared[load] = prepared
+        return prepared
+
+    async def run(self, load: int) -> TestResult:
+        prepared = self._prepared.get(load) or self.prepare(load)
+        client = runtime.get_http_client()
+        trace = RequestTrace()
+        start_request = datetime.datetime.now(datetime.timezone.utc)
+        response = await client.request(prepared.method, prepared.url, headers=prepared.headers, content=prepared.content, extensions=trace.extensions)
+        end_request = datetime.datetime.now(datetime.timezone.utc)
+        response.raise_for_status()
+        body = runtime.json_loads(response.content)
+        return TestResult(
+            test_case_name=self.get_name(),
+            request_span=Timespan(start_request, end_request),
+            server_processing_span=Timespan(
+                datetime.datetime.fromisoformat(_get_field(body, self._start_field)),
+                datetime.datetime.fromisoformat(_get_field(body, self._end_field))
+            ),
+            load=load,
+            phases=trace.phases()
+        )
+
+    def to_json(self) -> dict:
+        return {
+            **super().to_json(),
+            "method": self._method,
+            "path": self._path
+        }
+
+def _fill(template, values: dict):
+    """
+    Fills '{parameter}' placeholders in strings, recursively through lists and dictionaries.
+    A string that is exactly one placeholder takes the parameter's value and type.
+    """
+    if isinstance(template, str):
+        if template.startswith('{') and template.endswith('}') and template[1:-1] in values:
+            return values[template[1:-1]]
+        return template.format(**values)
+    if isinstance(template, dict):
+        return {key: _fill(value, values) for key, value in template.items()}
+    if isinstance(template, list):
+        return [_fill(value, values) for value in template]
+    return template
+
+def _get_field(body: dict, path: list[str]):
+    for key in path:
+        body = body[key]
+    return body
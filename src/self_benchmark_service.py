@@ -0,0 +1,222 @@
+from test_execution_service import TestExecutionService
+from test_case import TestCase
+from fibonacci_test import FibonacciTest
+import runtime
+from datetime import datetime, timezone
+import platform
+import asyncio
+import threading
+import logging
+import time
+import os
+
+SCHEMA_VERSION = 2
+
+class NoOpHttpTarget:
+    """
+    Minimal HTTP/1.1 server answering every request with the start/end JSON contract
+    of the test application, after an optional fixed delay. It does as little work as possible,
+    so what is measured against it is the cost of the tester itself.
+    It serves from its own event loop in a thread of the tester process, so it does not run on the
+    event loop of the tester and its CPU time can be told apart from the tester's.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        """
+        Initializes the NoOpHttpTarget.
+        :param delay: Time each request is held before answering, in seconds. Controls how many requests are in flight.
+        """
+        self.delay = delay
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._writers = set()
+        self.port = None
+        self.cpu_seconds = 0.0
+
+    async def start(self, host: str = "127.0.0.1"):
+        started = threading.Event()
+        self._thread = threading.Thread(target=self.__serve, args=(host, started), name="no-op-target", daemon=True)
+        self._thread.start()
+        await asyncio.to_thread(started.wait)
+        if self.port is None:
+            raise RuntimeError(f"The no-op target could not listen on {host}.")
+
+    async def stop(self):
+        """
+        Stops the server and its thread. cpu_seconds then holds the CPU time the thread spent serving.
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        await asyncio.to_thread(self._thread.join)
+
+    def __serve(self, host: str, started: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        try:
+            try:
+                self._server = self._loop.run_until_complete(asyncio.start_server(self.__handle, host=host, port=0))
+                self.port = self._server.sockets[0].getsockname()[1]
+            finally:
+                started.set()
+            # only the serving counts, as the tester measures its CPU time between start and stop
+            cpu_start = time.thread_time()
+            self._loop.run_forever()
+            self.cpu_seconds = time.thread_time() - cpu_start
+            self._loop.run_until_complete(self.__close())
+        finally:
+            self._loop.close()
+
+    async def __close(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        # closing a writer ends the read of its handler, let them finish before the loop closes
+        await asyncio.gather(*(asyncio.all_tasks() - {asyncio.current_task()}), return_exceptions=True)
+        await self._server.wait_closed()
+
+    def get_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                start = datetime.now(timezone.utc).isoformat()
+                if self.delay > 0:
+                    await asyncio.sleep(self.delay)
+                body = f'{{"start":"{start}","end":"{datetime.now(timezone.utc).isoformat()}"}}'.encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: "
+                    + str(len(body)).encode()
+                    + b"\r\n\r\n"
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+class SelfBenchmarkService:
+    """
+    Measures the ceiling of the load generator: sweeps request rates and in-flight request counts
+    against a NoOpHttpTarget and reports how well execute_test keeps up.
+    """
+
+    def __init__(self, test_execution_service: TestExecutionService, sample_interval: float = 0.1):
+        """
+        Initializes the SelfBenchmarkService.
+        :param test_execution_service: The TestExecutionService whose execute_test is measured.
+        :param sample_interval: Interval between samples of the process memory, in seconds.
+        """
+        self.test_execution_service = test_execution_service
+        self.sample_interval = sample_interval
+
+    async def run(self, rates: list[int], concurrencies: list[int], duration_seconds: int = 5) -> dict:
+        """
+        Runs every combination of request rate and concurrency.
+        The concurrency is the target number of requests in flight, obtained by making the
+        no-op target hold each request for concurrency / rate seconds.
+        :param rates: Requested rates, in requests per second.
+        :param concurrencies: Target numbers of requests in flight.
+        :param duration_seconds: Duration of each run, in seconds.
+        :return: A JSON-serializable report, comparable across versions of the tester.
+        """
+        runs = []
+        for rate in rates:
+            for concurrency in concurrencies:
+                logging.info(f"Self-benchmark: {rate} requests per second with {concurrency} requests in flight.")
+                runs.append(await self.run_single(rate, concurrency, duration_seconds))
+
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "timestamp": datetime.now().isoformat(),
+            "engine": self.get_engine_info(),
+            "duration_seconds": duration_seconds,
+            "runs": runs
+        }
+
+    async def run_single(self, rate: int, concurrency: int, duration_seconds: int, test_case: TestCase = None) -> dict:
+        """
+        Runs execute_test once against a fresh no-op target.
+        :param rate: Requested rate, in requests per second.
+        :param concurrency: Target number of requests in flight.
+        :param duration_seconds: Duration of the run, in seconds.
+        :param test_case: The test case used to send requests. Defaults to a FibonacciTest.
+        :return: A dictionary with achieved rate, send lag, CPU and memory figures of the run.
+            cpu_seconds_per_request is the CPU time of the tester alone: the time of the no-op target,
+            measured on its thread, is subtracted and reported as target_cpu_seconds_per_request.
+        """
+        target = NoOpHttpTarget(delay=concurrency / rate)
+        await target.start()
+        test_case = test_case or FibonacciTest(application_base_url=target.get_url())
+
+        samples = {"max_rss": 0}
+        sampling = True
+
+        async def sample():
+            while sampling:
+                samples["max_rss"] = max(samples["max_rss"], get_rss_bytes())
+                await asyncio.sleep(self.sample_interval)
+
+        baseline_rss = get_rss_bytes()
+        sampler = asyncio.create_task(sample())
+        cpu_start = time.process_time()
+        try:
+            execution = await self.test_execution_service.execute_test(
+                tests_per_second=rate,
+                duration_seconds=duration_seconds,
+                load=1,
+                test_case=test_case
+            )
+        finally:
+            cpu_seconds = time.process_time() - cpu_start
+            sampling = False
+            await sampler
+            await target.stop()
+
+        sent_requests = execution.tester_stats["sent_requests"]
+        max_in_flight = execution.tester_stats["max_in_flight"]
+        return {
+            "requested_rps": rate,
+            "concurrency": concurrency,
+            "achieved_rps": execution.tester_stats["achieved_rps"],
+            "send_lag": execution.tester_stats["send_lag"],
+            "completed_requests": len(execution.results) + len(execution.warm_up_results),
+            "errors": execution.errors.total() + execution.warm_up_errors.total(),
+            "cpu_seconds_per_request": (cpu_seconds - target.cpu_seconds) / sent_requests if sent_requests else None,
+            "target_cpu_seconds_per_request": target.cpu_seconds / sent_requests if sent_requests else None,
+            "max_in_flight": max_in_flight,
+            "memory_per_in_flight_bytes": (samples["max_rss"] - baseline_rss) / max_in_flight if max_in_flight > 0 else None,
+            "loop_lag": execution.tester_stats["loop_lag"],
+            "saturated": execution.tester_stats["saturated"]
+        }
+
+    @staticmethod
+    def get_engine_info() -> dict:
+        """
+        Describes the runtime the load generator runs on, so reports of different versions can be compared.
+        :return: A dictionary with the interpreter, event loop and JSON codec in use.
+        """
+        import httpx
+
+        return {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            **runtime.describe(),
+            "event_loop_class": type(asyncio.get_running_loop()).__name__,
+            "httpx": httpx.__version__
+        }
+
+def get_rss_bytes() -> int:
+    """
+    Reads the resident set size of the current process (Linux only).
+    :return: The resident memory in bytes, or 0 when it is not available.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
@@ -1,12 +1,14 @@
 import datetime
 
 class ServerStats:
-    def __init__(self, memory:dict, stats:dict, host:str, ping:dict, timestamp:datetime.datetime = datetime.datetime.now()):
+    def __init__(self, memory:dict, stats:dict, host:str, ping:dict, timestamp:datetime.datetime = datetime.datetime.now(), clock:dict = None):
         self.memory = memory
         self.stats = stats
         self.host = host
         self.timestamp = timestamp
         self.ping = ping
+        # NTP-style reading of the server clock taken with the stats, see clock_offset.read_server_clock
+        self.clock = clock
 
     def __repr__(self):
         return f"ServerStats(memory={self.memory}, stats={self.stats}, host={self.host}, timestamp={self.timestamp}, ping={self.ping})"
@@ -40,7 +42,8 @@ class ServerStats:
             },
             host=self.host,
             ping={k: (self.ping[k] + other.ping[k]) / 2 for k in self.ping},
-            timestamp=max(self.timestamp, other.timestamp)
+            timestamp=max(self.timestamp, other.timestamp),
+            clock=other.clock or self.clock
         )
 
     def __div__(self, other):
@@ -70,7 +73,8 @@ class ServerStats:
             },
             host=self.host,
             ping={k: self.ping[k] / other for k in self.ping},
-            timestamp=self.timestamp
+            timestamp=self.timestamp,
+            clock=self.clock
         )
     
     def to_json(self) -> dict:
@@ -83,5 +87,22 @@ class ServerStats:
             "stats": self.stats,
             "host": self.host,
             "timestamp": self.timestamp.isoformat(),
-            "ping": self.ping
-        }
\ No newline at end of file
+            "ping": self.ping,
+            "clock": self.clock
+        }
+
+    @staticmethod
+    def from_json(data: dict) -> "ServerStats":
+        """
+        Creates a ServerStats instance from a dictionary produced by to_json.
+        :param data: A dictionary representation of the ServerStats.
+        :return: A ServerStats instance.
+        """
+        return ServerStats(
+            memory=data["memory"],
+            stats=data["stats"],
+            host=data["host"],
+            ping=data["ping"],
+            timestamp=datetime.datetime.fromisoformat(data["timestamp"]),
+            clock=data.get("clock")
+        )
@@ -0,0 +1,261 @@
+"""
+Offline simulation of a cluster, to develop and compare search strategies without one.
+
+The real benchmark (BenchmarkService.run_benchmark with the TestExecutionService searches) runs
+against a SimulatedCluster, whose test cases are answered by a discrete-event QueueingModel, on a
+VirtualTimeEventLoop: the loop's timer heap is the event list, and the clock jumps from one event
+to the next instead of waiting, so a benchmark of hours of probes finishes in seconds.
+"""
+from test_case import TestCase
+from test_result import TestResult
+from timespan import Timespan
+from cluster import Cluster
+from cluster_service import ClusterService
+from test_execution_service import TestExecutionService
+from benchmark_service import BenchmarkService
+from benchmark import Benchmark
+from calibration_cache import CalibrationCache
+from queueing_model import QueueingModel
+from datetime import datetime, timezone
+from typing import Callable
+import selectors
+import asyncio
+import runtime
+import httpx
+import time
+
+SIMULATION_URL = "simulation://cluster"
+
+# test cases a SimulatedCluster provides: test case name, smallest load and mean service time of a request of each load
+LOAD_SCALINGS: dict[str, tuple[str, int, Callable[[QueueingModel, int], float]]] = {
+    # the same names and smallest loads as the real test cases, so simulated and real benchmarks compare
+    "fibonacci": ("FibonacciTestCase", 10, lambda model, load: model.fibonacci_service_time(max(1, load))),
+    "bubble-sort": ("BubbleSortTestCase", 10, lambda model, load: model.bubble_sort_service_time(2 ** load)),
+    "linear": ("LinearTestCase", 1, lambda model, load: model.base_service_time * max(1, load)),
+}
+
+class _VirtualTimeSelector(selectors.DefaultSelector):
+    """
+    Selector that polls the file descriptors instead of blocking until the next timer of the loop,
+    and moves the virtual clock forward to that timer when nothing is ready.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.time = 0.0
+
+    def select(self, timeout=None):
+        if timeout is None:
+            # no timer pending: only real I/O, e.g. an executor thread finishing, can wake the loop up
+            return super().select(None)
+        events = super().select(0)
+        if not events and timeout > 0:
+            self.time += timeout
+        return events
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop running on virtual time. Whenever no callback is ready, the clock jumps to the next
+    timer instead of waiting for it, so asyncio.sleep and every timeout return at once, while the
+    callbacks still run in the order and at the virtual times they were scheduled for. Running the
+    callbacks takes no virtual time: only what they sleep for does.
+
+    runtime.now reads this clock, so the datetimes of the load generator agree with loop.time.
+    Real I/O still works, but is not waited for while a timer is pending.
+    """
+    virtual_time = True
+
+    def __init__(self, start: datetime = None):
+        """
+        Initializes the VirtualTimeEventLoop.
+        :param start: The time the virtual clock starts at. Defaults to now.
+        """
+        self._clock = _VirtualTimeSelector()
+        super().__init__(selector=self._clock)
+        self._epoch = (start or datetime.now()).timestamp()
+
+    def time(self) -> float:
+        return self._clock.time
+
+    def now(self, tz=None) -> datetime:
+        return datetime.fromtimestamp(self._epoch + self._clock.time, tz)
+
+class SimulatedTestCase(TestCase):
+    """
+    Test case answered by a QueueingModel instead of the application: each request holds one of the
+    servers of the model for the service time of its load, on the clock of the running event loop.
+    A request the model rejects fails with HTTP 503, as it does on the mock server.
+    """
+
+    def __init__(self, name: str, model: QueueingModel, service_time: Callable[[int], float], min_recommended_load: int = 1):
+        """
+        Initializes the SimulatedTestCase.
+        :param name: The name of the test case.
+        :param model: The QueueingModel serving the requests.
+        :param service_time: The mean service time of a request of each load, in seconds.
+        :param min_recommended_load: The smallest load the searches start from.
+        """
+        super().__init__(
+            name=name,
+            description=f"Simulated {name}, served by a queueing model.",
+            application_base_url=SIMULATION_URL,
+            min_recommended_load=min_recommended_load
+        )
+        self.model = model
+        self.service_time = service_time
+
+    async def run(self, load: int) -> TestResult:
+        start_request = runtime.now(timezone.utc)
+        span = await self.model.serve(self.service_time(load))
+        if span is None:
+            request = httpx.Request("GET", f"{self._application_base_url}/{self.get_name()}/{load}")
+            httpx.Response(503, request=request).raise_for_status()
+        end_request = runtime.now(timezone.utc)
+        return TestResult(
+            test_case_name=self.get_name(),
+            request_span=Timespan(start_request, end_request),
+            server_processing_span=Timespan(*span),
+            load=load
+        )
+
+class SimulatedCluster(Cluster):
+    """
+    Cluster backed by a QueueingModel instead of machines. It has no monitored servers, so its stats
+    are empty and nothing is reached over SSH, and all of its test cases share the servers of the model,
+    as requests to the same application do.
+    """
+
+    def __init__(self, model: QueueingModel, name: str = "simulation"):
+        """
+        Initializes the SimulatedCluster.
+        :param model: The QueueingModel serving the requests.
+        :param name: The name of the cluster.
+        """
+        super().__init__(name=name, servers=[], config={"app": {"name": name, "url": SIMULATION_URL}, "monitorServers": []})
+        self.model = model
+
+    def create_test_case(self, scaling: str) -> SimulatedTestCase:
+        """
+        Creates a test case served by the model.
+        :param scaling: One of LOAD_SCALINGS.
+        :return: The SimulatedTestCase.
+        """
+        if scaling not in LOAD_SCALINGS:
+            raise ValueError(f"Unknown load scaling: {scaling}. Supported scalings are: {', '.join(LOAD_SCALINGS)}.")
+        name, min_load, service_time = LOAD_SCALINGS[scaling]
+        return SimulatedTestCase(name, self.model, lambda load: service_time(self.model, load), min_recommended_load=min_load)
+
+    def to_json(self) -> dict:
+        return {
+            **super().to_json(),
+            "model": {
+                "servers": self.model.servers,
+                "base_service_time": self.model.base_service_time,
+                "fibonacci_call_time": self.model.fibonacci_call_time,
+                "bubble_sort_operation_time": self.model.bubble_sort_operation_time,
+                "distribution": self.model.distribution,
+                "max_queue": self.model.max_queue,
+            }
+        }
+
+class SimulationService:
+    """
+    Runs the benchmark against a SimulatedCluster on virtual time and measures the searches against
+    what the queueing model allows: the probes and virtual time each test case took, the max acceptable
+    load found next to the highest load whose mean service time meets the maximum response time, and
+    the max requests per second found for each load next to the rate that saturates the servers.
+    """
+
+    def __init__(self, cluster: SimulatedCluster, test_execution_options: dict = None, calibration_cache: CalibrationCache = None):
+        """
+        Initializes the SimulationService.
+        :param cluster: The simulated cluster.
+        :param test_execution_options: Keyword arguments forwarded to the TestExecutionService, e.g. max_error_rate.
+        :param calibration_cache: Optional CalibrationCache the searches start from, as in a real benchmark.
+        """
+        self.cluster = cluster
+        self.test_execution_options = test_execution_options or {}
+        self.calibration_cache = calibration_cache
+
+    def run(self, scalings: list[str], max_response_time: float = 2.0, **benchmark_options) -> tuple[dict, list[Benchmark]]:
+        """
+        Benchmarks the test cases on a new VirtualTimeEventLoop. It blocks until done, so from a running
+        event loop it has to be called in another thread, e.g. with asyncio.to_thread.
+        :param scalings: The test cases to benchmark, each one of LOAD_SCALINGS.
+        :param max_response_time: The maximum acceptable response time, in seconds.
+        :param benchmark_options: Keyword arguments forwarded to BenchmarkService.run_benchmark, e.g. duration_per_test.
+        :return: The report, with the 'wall_seconds' and 'virtual_seconds' of the whole run and the measures of each test case, and the benchmarks.
+        """
+        test_cases = [self.cluster.create_test_case(scaling) for scaling in scalings]
+        start = time.perf_counter()
+        with asyncio.Runner(loop_factory=VirtualTimeEventLoop) as runner:
+            measures, benchmarks = runner.run(self.__run(test_cases, max_response_time, benchmark_options))
+        wall_seconds = time.perf_counter() - start
+        virtual_seconds = sum(measure["virtual_seconds"] for measure in measures)
+        report = {
+            "cluster": self.cluster.to_json(),
+            "max_response_time": max_response_time,
+            "benchmark_options": benchmark_options,
+            "wall_seconds": wall_seconds,
+            "virtual_seconds": virtual_seconds,
+            "speed_up": virtual_seconds / wall_seconds if wall_seconds > 0 else None,
+            "test_cases": [
+                self.__measure(test_case, benchmark, measure, max_response_time)
+                for test_case, benchmark, measure in zip(test_cases, benchmarks, measures)
+            ],
+        }
+        return report, benchmarks
+
+    async def __run(self, test_cases: list[SimulatedTestCase], max_response_time: float, benchmark_options: dict) -> tuple[list[dict], list[Benchmark]]:
+        test_execution_service = TestExecutionService(cluster_service=ClusterService(), **self.test_execution_options)
+        benchmark_service = BenchmarkService(test_execution_service, calibration_cache=self.calibration_cache)
+        loop = asyncio.get_running_loop()
+        measures, benchmarks = [], []
+        try:
+            for test_case in test_cases:
+                probes, start = test_execution_service.executed_probes, loop.time()
+                benchmarks.extend(await benchmark_service.run_benchmark(
+                    test_cases=[test_case],
+                    cluster=self.cluster,
+                    max_response_time=max_response_time,
+                    **benchmark_options
+                ))
+                measures.append({"probes": test_execution_service.executed_probes - probes, "virtual_seconds": loop.time() - start})
+        finally:
+            await runtime.close_http_client()
+        return measures, benchmarks
+
+    def __measure(self, test_case: SimulatedTestCase, benchmark: Benchmark, measure: dict, max_response_time: float) -> dict:
+        """
+        Compares what the benchmark of a test case found with what the model allows.
+        """
+        max_acceptable_load = max(execution.get_load() for execution in benchmark.test_executions)
+        loads = []
+        for execution in sorted(benchmark.test_executions, key=lambda execution: execution.get_load()):
+            saturation = self.cluster.model.saturation_rate(test_case.service_time(execution.get_load()))
+            loads.append({
+                "load": execution.get_load(),
+                "request_per_second": execution.request_per_second,
+                "saturation_request_per_second": saturation,
+                "saturation_share": execution.request_per_second / saturation,
+            })
+        return {
+            "test_case": test_case.get_name(),
+            "probes": measure["probes"],
+            "virtual_seconds": measure["virtual_seconds"],
+            "load_search": benchmark.load_search,
+            "max_acceptable_load": max_acceptable_load,
+            "expected_max_acceptable_load": self.__expected_max_acceptable_load(test_case, max_response_time),
+            "loads": loads,
+        }
+
+    @staticmethod
+    def __expected_max_acceptable_load(test_case: SimulatedTestCase, max_response_time: float, max_load: int = 1_000_000) -> int:
+        """
+        Finds the highest load whose mean service time meets the maximum response time, which is what
+        the load search finds when its probes do not queue, or the smallest load when none does.
+        """
+        load = test_case.get_min_recommended_load()
+        while load < max_load and test_case.service_time(load + 1) <= max_response_time:
+            load += 1
+        return load
@@ -0,0 +1,113 @@
+from test_result import TestResult
+from datetime import datetime
+import logging
+import math
+
+class SteadyStateDetector:
+    """
+    Separates the warm-up (transient) part of a test execution from its steady state.
+
+    Either a fixed warm-up period is used, or the warm-up ends at the first window from which
+    the per-window average latency and throughput stay stable for a number of consecutive windows.
+    """
+
+    def __init__(
+            self,
+            warm_up_seconds: float = 0.0,
+            automatic: bool = False,
+            window_seconds: float = 1.0,
+            stable_windows: int = 3,
+            tolerance: float = 0.2,
+            max_warm_up_fraction: float = 0.5,
+        ):
+        """
+        Initializes the SteadyStateDetector.
+        :param warm_up_seconds: Fixed warm-up period at the start of each execution, in seconds. Ignored when automatic is set.
+        :param automatic: Whether to detect the end of the warm-up from the results instead of using a fixed period.
+        :param window_seconds: Width of the windows used for the automatic detection, in seconds.
+        :param stable_windows: Number of consecutive windows that must be stable to consider the execution steady.
+        :param tolerance: Maximum relative spread ((max - min) / mean) of latency and throughput across the stable windows.
+        :param max_warm_up_fraction: Upper bound on the fraction of the execution that may be treated as warm-up.
+        """
+        if warm_up_seconds < 0:
+            raise ValueError("warm_up_seconds must not be negative.")
+        self.warm_up_seconds = warm_up_seconds
+        self.automatic = automatic
+        self.window_seconds = window_seconds
+        self.stable_windows = stable_windows
+        self.tolerance = tolerance
+        self.max_warm_up_fraction = max_warm_up_fraction
+
+    def split(self, results: list[TestResult], start: datetime, duration_seconds: float) -> tuple[float, list[TestResult], list[TestResult]]:
+        """
+        Splits the results of an execution into warm-up and steady-state results, by the time each request was sent.
+        :param results: The results of the execution.
+        :param start: When the execution started sending requests.
+        :param duration_seconds: How long the execution sent requests, in seconds.
+        :return: A tuple with the warm-up length in seconds, the warm-up results and the steady-state results.
+        """
+        if self.automatic:
+            warm_up_seconds = self.detect_warm_up_seconds(results, start, duration_seconds)
+        else:
+            warm_up_seconds = min(self.warm_up_seconds, duration_seconds * self.max_warm_up_fraction)
+
+        if warm_up_seconds <= 0:
+            return 0.0, [], results
+
+        steady_start = start.timestamp() + warm_up_seconds
+        warm_up_results = []
+        steady_results = []
+        for result in results:
+            if result.request_span.start.timestamp() < steady_start:
+                warm_up_results.append(result)
+            else:
+                steady_results.append(result)
+
+        return warm_up_seconds, warm_up_results, steady_results
+
+    def detect_warm_up_seconds(self, results: list[TestResult], start: datetime, duration_seconds: float) -> float:
+        """
+        Finds where the steady state begins, using windowed latency and throughput.
+        :param results: The results of the execution.
+        :param start: When the execution started sending requests.
+        :param duration_seconds: How long the execution sent requests, in seconds.
+        :return: The length of the warm-up period, in seconds. Zero when no steady state was found.
+        """
+        n_windows = math.ceil(duration_seconds / self.window_seconds)
+        if n_windows < self.stable_windows:
+            return 0.0
+
+        start_timestamp = start.timestamp()
+        latency_sums = [0.0] * n_windows
+        sent = [0] * n_windows
+        completed = [0] * n_windows
+
+        for result in results:
+            sent_window = int((result.request_span.start.timestamp() - start_timestamp) // self.window_seconds)
+            if 0 <= sent_window < n_windows:
+                latency_sums[sent_window] += result.get_response_time()
+                sent[sent_window] += 1
+            completed_window = int((result.request_span.end.timestamp() - start_timestamp) // self.window_seconds)
+            if 0 <= completed_window < n_windows:
+                completed[completed_window] += 1
+
+        latencies = [latency_sums[i] / sent[i] if sent[i] else None for i in range(n_windows)]
+        last_candidate = int(n_windows * self.max_warm_up_fraction)
+
+        for first in range(0, min(last_candidate, n_windows - self.stable_windows) + 1):
+            window_latencies = latencies[first:first + self.stable_windows]
+            window_throughputs = completed[first:first + self.stable_windows]
+            if None in window_latencies:
+                continue
+            if self.__is_stable(window_latencies) and self.__is_stable(window_throughputs):
+                return first * self.window_seconds
+
+        logging.warning("No steady state detected, keeping every result of the execution.")
+        return 0.0
+
+    def __is_stable(self, values: list[float]) -> bool:
+        mean = sum(values) / len(values)
+        if mean == 0:
+            return False
+        return (max(values) - min(values)) / mean <= self.tolerance
+
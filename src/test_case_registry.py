@@ -0,0 +1,63 @@
+from test_case import TestCase
+from typing import Callable
+
+_factories: dict[str, Callable[[str], TestCase]] = {}
+
+def register_test_case(name: str, factory: Callable[[str], TestCase]):
+    """
+    Registers a test case under a CLI name.
+    :param name: The name used to select the test case, e.g. in --test-cases.
+    :param factory: A callable receiving the application base URL and returning the TestCase.
+    """
+    if name in _factories:
+        raise ValueError(f"Test case {name} is already registered.")
+    _factories[name] = factory
+
+def create_test_case(name: str, app_url: str) -> TestCase:
+    """
+    Creates a registered test case.
+    :param name: The name the test case was registered under.
+    :param app_url: The base URL of the application to test.
+    :return: The TestCase instance.
+    """
+    factory = _factories.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown test case: {name}. Supported cases are: {', '.join(get_test_case_names())}.")
+    return factory(app_url)
+
+def get_test_case_names() -> list[str]:
+    """
+    Lists the registered test case names.
+    :return: The names, in registration order.
+    """
+    return list(_factories)
+
+def load_scenarios(path: str) -> list[str]:
+    """
+    Registers every scenario of a YAML scenario file as a test case.
+    :param path: Path to the scenario file.
+    :return: The names of the registered scenarios.
+    """
+    import yaml
+    from scenario_test import ScenarioTest
+
+    with open(path, 'r') as file:
+        data = yaml.safe_load(file) or {}
+
+    names = []
+    for spec in data.get('scenarios', []):
+        name = spec['name']
+        register_test_case(name, lambda app_url, spec=spec: ScenarioTest(spec, application_base_url=app_url))
+        names.append(name)
+    return names
+
+def _fibonacci(app_url: str) -> TestCase:
+    from fibonacci_test import FibonacciTest
+    return FibonacciTest(application_base_url=app_url)
+
+def _bubble_sort(app_url: str) -> TestCase:
+    from bubble_sort_test import BubbleSortTest
+    return BubbleSortTest(application_base_url=app_url)
+
+register_test_case("fibonacci", _fibonacci)
+register_test_case("bubble-sort", _bubble_sort)
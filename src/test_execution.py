@@ -2,6 +2,9 @@ from timespan import Timespan
 from test_case import TestCase
 from test_result import TestResult
 from cluster_stats import ClusterStats
+from percentiles import percentiles
+from error_stats import ErrorStats
+from request_trace import PHASES
 
 class TestExecution:
     def __init__(
@@ -12,8 +15,16 @@ class TestExecution:
             results: list[TestResult],
             request_per_second: int = 0,
             seconds_making_requests: int = 0,
-            errors: list[Exception] = None,
-            cluster_stats: list[ClusterStats] = None
+            errors: ErrorStats = None,
+            cluster_stats: list[ClusterStats] = None,
+            cool_down_seconds: float = 0.0,
+            warm_up_seconds: float = 0.0,
+            warm_up_results: list[TestResult] = None,
+            warm_up_errors: ErrorStats = None,
+            tester_stats: dict = None,
+            load: int = None,
+            in_flight_limit: dict = None,
+            clock: dict = None
     ):
         self.total_span = total_span
         self.span_making_requests = span_making_requests
@@ -22,8 +33,21 @@ class TestExecution:
         self.results = results
         self.request_per_second = request_per_second
         self.seconds_making_requests = seconds_making_requests
-        self.errors = errors if errors is not None else []
+        self.errors = errors if errors is not None else ErrorStats()
         self.cluster_stats = cluster_stats if cluster_stats is not None else []
+        self.cool_down_seconds = cool_down_seconds
+        # results sent during the warm-up period, excluded from every statistic of the execution
+        self.warm_up_seconds = warm_up_seconds
+        self.warm_up_results = warm_up_results if warm_up_results is not None else []
+        self.warm_up_errors = warm_up_errors if warm_up_errors is not None else ErrorStats()
+        # how well the tester itself kept up: achieved rate, send lag, event-loop lag, CPU and requests in flight
+        self.tester_stats = tester_stats if tester_stats is not None else {}
+        # load the execution was run with; for a mix its results carry the load of each component instead
+        self.load = load
+        # what the in-flight cap did during the execution, None when there was no cap
+        self.in_flight_limit = in_flight_limit
+        # offset of the server clock, estimated from the requests ('requests') and read through SSH ('hosts')
+        self.clock = clock
 
     def avg_response_time(self) -> float:
         """
@@ -52,6 +76,8 @@ class TestExecution:
         Get the load used for the test execution.
         :return: The load used for the test execution.
         """
+        if self.load is not None:
+            return self.load
         if not self.results:
             if self.errors:
                 raise ValueError(f"No test results available to determine load. But test execution encountered errors: {self.errors}")
@@ -59,6 +85,44 @@ class TestExecution:
         
         return self.results[0].load
     
+    def get_response_time_by_test_case(self) -> dict[str, dict]:
+        """
+        Aggregate the response times of the results per test case, e.g. for each component of a mix.
+        :return: A dictionary mapping each test case name to its request count, load, average and percentile response times.
+        """
+        response_times = {}
+        loads = {}
+        for result in self.results:
+            response_times.setdefault(result.test_case_name, []).append(result.get_response_time())
+            loads[result.test_case_name] = result.load
+
+        return {
+            name: {
+                "requests": len(times),
+                "load": loads[name],
+                "avg_response_time": sum(times) / len(times),
+                "response_time": percentiles(times)
+            }
+            for name, times in response_times.items()
+        }
+
+    def get_phase_stats(self) -> dict[str, dict]:
+        """
+        Summarise the per-phase timings of the results (pool wait, connect, TLS, send, time to first byte, body).
+        :return: A dictionary mapping each phase to the percentiles of its duration and the number of results it happened in.
+        """
+        durations = {phase: [] for phase in PHASES}
+        for result in self.results:
+            if result.phases:
+                for phase, duration in result.phases.items():
+                    if duration is not None:
+                        durations.setdefault(phase, []).append(duration)
+
+        return {
+            phase: {"count": len(values), **percentiles(values)}
+            for phase, values in durations.items()
+        }
+
     def get_avg_cluster_stats(self) -> ClusterStats:
         """
         Calculate the average cluster statistics from the test execution.
@@ -100,10 +164,48 @@ class TestExecution:
             "results": [result.to_json() for result in self.results],
             "request_per_second": self.request_per_second,
             "seconds_making_requests": self.seconds_making_requests,
-            "errors": [str(error) for error in self.errors],
-            "cluster_stats": [stat.to_json() for stat in self.cluster_stats] if self.cluster_stats else None
+            "errors": self.errors.to_json(),
+            "error_rate": self.error_rate(),
+            "cluster_stats": [stat.to_json() for stat in self.cluster_stats] if self.cluster_stats else None,
+            "cool_down_seconds": self.cool_down_seconds,
+            "warm_up_seconds": self.warm_up_seconds,
+            "warm_up_results": [result.to_json() for result in self.warm_up_results],
+            "warm_up_errors": self.warm_up_errors.to_json(),
+            "tester_stats": self.tester_stats,
+            "load": self.load,
+            "in_flight_limit": self.in_flight_limit,
+            "clock": self.clock,
+            "response_time_by_test_case": self.get_response_time_by_test_case(),
+            "phases": self.get_phase_stats()
         }
     
+    @staticmethod
+    def from_json(data: dict, test_case: TestCase) -> "TestExecution":
+        """
+        Creates a TestExecution instance from a dictionary produced by to_json.
+        :param data: A dictionary representation of the TestExecution.
+        :param test_case: The TestCase instance the execution belongs to.
+        :return: A TestExecution instance.
+        """
+        return TestExecution(
+            total_span=Timespan.from_json(data["total_span"]),
+            span_making_requests=Timespan.from_json(data["span_making_requests"]),
+            test_case=test_case,
+            results=[TestResult.from_json(result) for result in data["results"]],
+            request_per_second=data["request_per_second"],
+            seconds_making_requests=data["seconds_making_requests"],
+            errors=ErrorStats.from_json(data["errors"]),
+            cluster_stats=[ClusterStats.from_json(stat) for stat in data["cluster_stats"]] if data.get("cluster_stats") else None,
+            cool_down_seconds=data.get("cool_down_seconds", 0.0),
+            warm_up_seconds=data.get("warm_up_seconds", 0.0),
+            warm_up_results=[TestResult.from_json(result) for result in data.get("warm_up_results", [])],
+            warm_up_errors=ErrorStats.from_json(data["warm_up_errors"]) if data.get("warm_up_errors") else None,
+            tester_stats=data.get("tester_stats"),
+            load=data.get("load"),
+            in_flight_limit=data.get("in_flight_limit"),
+            clock=data.get("clock")
+        )
+
     def to_short_json(self) -> dict:
         """
         Converts the TestExecution instance to a JSON-serializable dictionary with only essential fields.
@@ -118,13 +220,48 @@ class TestExecution:
             "seconds_making_requests": self.seconds_making_requests,
             "span_making_requests": self.span_making_requests.to_json(),
             "total_span": self.total_span.to_json(),
-            "errors": [str(error) for error in self.errors],
-            "cluster_stats": self.get_avg_cluster_stats().to_json() if self.cluster_stats else None
+            "errors": self.errors.to_json(),
+            "error_rate": self.error_rate(),
+            "cluster_stats": self.get_avg_cluster_stats().to_json() if self.cluster_stats else None,
+            "cool_down_seconds": self.cool_down_seconds,
+            "warm_up_seconds": self.warm_up_seconds,
+            "warm_up_requests": len(self.warm_up_results),
+            "warm_up_errors": self.warm_up_errors.total(),
+            "tester_stats": self.tester_stats,
+            "in_flight_limit": self.in_flight_limit,
+            "clock": self.clock,
+            "response_time_by_test_case": self.get_response_time_by_test_case(),
+            "phases": self.get_phase_stats()
         }
 
+    def is_valid(self) -> bool:
+        """
+        Check if the execution measured the cluster rather than the tester.
+        :return: False if the tester saturated during the execution, True otherwise.
+        """
+        return not self.tester_stats.get("saturated", False)
+
+    def is_overloaded(self) -> bool:
+        """
+        Check if the in-flight cap kept part of the schedule from reaching the cluster.
+        :return: True if requests were dropped, expired in the queue or left unsent by an abort.
+        """
+        if not self.in_flight_limit:
+            return False
+        return bool(self.in_flight_limit["dropped"] or self.in_flight_limit["expired"] or self.in_flight_limit["aborted"])
+
     def has_errors(self) -> bool:
         """
         Check if there are any errors in the test execution.
         :return: True if there are errors, False otherwise.
         """
-        return len(self.errors) > 0
\ No newline at end of file
+        return self.errors.total() > 0
+
+    def error_rate(self) -> float:
+        """
+        Calculate the share of the requests that reached the cluster and failed, after the warm-up.
+        :return: The failed requests divided by all finished requests, 0 when there are none.
+        """
+        failed = self.errors.total()
+        finished = failed + len(self.results)
+        return failed / finished if finished else 0.0
\ No newline at end of file
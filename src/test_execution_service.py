@@ -3,21 +3,130 @@ import asyncio
 import logging
 from test_execution import TestExecution
 from test_result import TestResult
-from datetime import datetime
 from timespan import Timespan
 from cluster_service import ClusterService
 from cluster import Cluster
 from background_cluster_monitoring import BackgroundClusterMonitoring 
+from benchmark_checkpoint import BenchmarkCheckpoint
+from adaptive_cool_down import AdaptiveCoolDown
+from steady_state_detector import SteadyStateDetector
+from percentiles import percentiles
+from tester_monitor import TesterMonitor
+from metrics import MetricsRegistry
+from in_flight_limit import InFlightLimit, InFlightLimitExceeded
+from error_stats import ErrorStats
+from clock_offset import ClockOffsetEstimator, correct_results, estimate_host_offsets
+from capacity_model import CapacityModel
+from typing import Callable
+import runtime
+import math
 
 class TestExecutionService:
-    def __init__(self, cluster_service: ClusterService):
+    def __init__(
+            self,
+            cluster_service: ClusterService,
+            checkpoint: BenchmarkCheckpoint = None,
+            max_requests_per_second: int = None,
+            cool_down: AdaptiveCoolDown = None,
+            steady_state_detector: SteadyStateDetector = None,
+            metrics: MetricsRegistry = None,
+            max_in_flight: int = None,
+            in_flight_policy: str = "drop",
+            max_queue_delay: float = 1.0,
+            max_error_rate: float = 0.0,
+            correct_clock_offset: bool = True,
+            capacity_model: CapacityModel = None
+        ):
         """
         Initializes the TestExecutionService with a ClusterService instance.
         :param cluster_service: An instance of ClusterService to manage cluster statistics.
+        :param checkpoint: Optional BenchmarkCheckpoint used to record and replay probes.
+        :param max_requests_per_second: Optional load-generation budget; searches never probe above this rate.
+        :param cool_down: Optional AdaptiveCoolDown; when set, rest times become a cap on waiting for the cluster to recover.
+        :param steady_state_detector: Optional SteadyStateDetector; warm-up results it finds are kept apart from the results used for decisions.
+        :param metrics: Optional MetricsRegistry updated live with requests, probes, search state and cluster stats.
+        :param max_in_flight: Optional cap on the requests in flight during an execution.
+        :param in_flight_policy: What happens to a request scheduled while the cap is reached: 'drop', 'queue' or 'abort'.
+        :param max_queue_delay: With the 'queue' policy, longest time a request waits for a slot, in seconds.
+        :param max_error_rate: Highest share of failed requests a probe may have and still meet the SLA. 0 fails a probe on any error.
+        :param correct_clock_offset: Whether server timestamps are moved onto the tester clock using the offset estimated from the requests.
+        :param capacity_model: Optional CapacityModel every probe is fed to.
         """
         self.cluster_service = cluster_service
+        self.checkpoint = checkpoint
+        self.max_requests_per_second = max_requests_per_second
+        self.cool_down = cool_down
+        self.steady_state_detector = steady_state_detector
+        self.metrics = metrics
+        self.max_in_flight = max_in_flight
+        self.in_flight_policy = in_flight_policy
+        self.max_queue_delay = max_queue_delay
+        self.max_error_rate = max_error_rate
+        self.correct_clock_offset = correct_clock_offset
+        self.capacity_model = capacity_model
+        self.last_load_search: dict = None
+        self.total_cool_down_seconds = 0.0
+        self.executed_probes = 0
+        self._pending_cool_down_seconds = 0.0
 
     async def execute_test(self, tests_per_second: int, duration_seconds: int, load: int, test_case: TestCase) -> TestExecution:
+        # probes replayed from a checkpoint count too: the count measures the searches, not the cluster time
+        self.executed_probes += 1
+        if not self.checkpoint:
+            execution = await self.__execute_test(tests_per_second, duration_seconds, load, test_case)
+        else:
+            execution = await self.checkpoint.probe(
+                kind="execute",
+                test_case=test_case,
+                params={"tests_per_second": tests_per_second, "duration_seconds": duration_seconds, "load": load},
+                run=lambda: self.__execute_test(tests_per_second, duration_seconds, load, test_case)
+            )
+        if self.capacity_model:
+            self.capacity_model.observe(execution)
+        return execution
+
+    async def rest(self, rest_time: int) -> float:
+        """
+        Waits between probes so the cluster can recover.
+        With an adaptive cool-down, rest_time is only the cap on the wait.
+        The wait is skipped while probes are being replayed from a checkpoint.
+        The time spent is attached to the next execution as its cool-down.
+        :param rest_time: The time to rest, in seconds.
+        :return: The time actually spent resting, in seconds.
+        """
+        if rest_time <= 0 or (self.checkpoint and self.checkpoint.is_replaying()):
+            return 0.0
+
+        if self.cool_down:
+            spent = await self.cool_down.wait(rest_time)
+        else:
+            await asyncio.sleep(rest_time)
+            spent = float(rest_time)
+
+        self._pending_cool_down_seconds += spent
+        self.total_cool_down_seconds += spent
+        return spent
+
+    def exceeds_max_error_rate(self, execution: TestExecution) -> bool:
+        """
+        Checks an execution against the error-rate SLA.
+        :param execution: The execution to check.
+        :return: True if its share of failed requests is above max_error_rate.
+        """
+        return execution.has_errors() and execution.error_rate() > self.max_error_rate
+
+    def record_search_state(self, test_case: TestCase, **state):
+        """
+        Records the state of a running search in the checkpoint and the metrics, if there are any.
+        :param test_case: The test case being searched.
+        :param state: The values describing the search state.
+        """
+        if self.checkpoint:
+            self.checkpoint.update_search_state(test_case, **state)
+        if self.metrics:
+            self.metrics.set_search_state(test_case.get_name(), **state)
+
+    async def __execute_test(self, tests_per_second: int, duration_seconds: int, load: int, test_case: TestCase) -> TestExecution:
         
         running_results = []
         if tests_per_second <= 0:
@@ -25,13 +134,61 @@ class TestExecutionService:
         interval = 1.0 / tests_per_second
         requests_to_send = tests_per_second * duration_seconds
 
-        start_execution_time = datetime.now()
+        # building the shared client blocks the loop for a while, so it must not happen inside the send schedule
+        runtime.get_http_client()
+        tester_monitor = TesterMonitor()
+        tester_monitor_task = asyncio.create_task(tester_monitor.run())
+
+        if self.metrics:
+            self.metrics.execution_started(test_case.get_name(), tests_per_second, load)
+        start_execution_time = runtime.now()
+        loop = asyncio.get_running_loop()
+        start_loop_time = loop.time()
+        # failed requests are counted as they finish, so their exceptions are not kept for the report
+        errors = ErrorStats()
+
+        def record_error(task: asyncio.Task):
+            if task.cancelled():
+                return
+            error = task.exception()
+            # requests that expired in the in-flight queue never reached the cluster, they are counted by the limit instead
+            if error is not None and not isinstance(error, InFlightLimitExceeded):
+                errors.record(error, loop.time() - start_loop_time)
+
+        # how late each request was sent compared to its schedule, to spot a saturated tester
+        send_lags = []
         print(f"Starting test execution for {test_case.get_name()} with {tests_per_second} requests per second, duration {duration_seconds} seconds, and load {load}.")
+        in_flight_limit = InFlightLimit(self.max_in_flight, self.in_flight_policy, self.max_queue_delay) if self.max_in_flight else None
+        scheduled_requests = 0
         for sended_requests in range(requests_to_send):
             # Calculate the absolute time this request should be sent
             target_time = start_execution_time.timestamp() + interval * (sended_requests + 1)
-            running_results.append(asyncio.create_task(test_case.run(load=load)))
-            now = datetime.now().timestamp()
+            send_lags.append(runtime.now().timestamp() - (target_time - interval))
+            if in_flight_limit is None:
+                request = test_case.run(load=load)
+            elif in_flight_limit.try_acquire():
+                request = in_flight_limit.run(lambda: test_case.run(load=load))
+            elif in_flight_limit.policy == "queue":
+                request = in_flight_limit.run_queued(lambda: test_case.run(load=load))
+            elif in_flight_limit.policy == "drop":
+                in_flight_limit.dropped += 1
+                if self.metrics:
+                    self.metrics.record_error("in_flight_limit")
+                request = None
+            else:
+                in_flight_limit.aborted = True
+                in_flight_limit.unsent = requests_to_send - sended_requests
+                logging.warning(f"{self.max_in_flight} requests in flight at {tests_per_second} requests per second, aborting the probe.")
+                break
+            scheduled_requests += 1
+            if request is not None:
+                task = asyncio.create_task(request)
+                tester_monitor.request_sent(task)
+                task.add_done_callback(record_error)
+                if self.metrics:
+                    self.metrics.request_sent(task)
+                running_results.append(task)
+            now = runtime.now().timestamp()
             sleep_time = target_time - now
             if sleep_time > 0:
                 await asyncio.sleep(sleep_time)
@@ -39,26 +196,76 @@ class TestExecutionService:
 
         span_making_requests = Timespan(
             start=start_execution_time,
-            end=datetime.now()
+            end=runtime.now()
         )
+        tester_stats = {
+            "requested_rps": tests_per_second,
+            "sent_requests": len(running_results),
+            # rate of the schedule itself: requests the in-flight limit held back do not make the tester look slow
+            "achieved_rps": scheduled_requests / span_making_requests.get_seconds() if span_making_requests.get_seconds() > 0 else 0.0,
+            "send_lag": percentiles(send_lags)
+        }
         # Wait for all test case runs to complete
         running_results = await asyncio.gather(*running_results,return_exceptions=True)
-        # Filter out any exceptions that may have occurred during the test case runs
+        await tester_monitor.stop()
+        await tester_monitor_task
+        if self.metrics:
+            self.metrics.execution_finished()
+        tester_stats.update(tester_monitor.summary(tests_per_second, tester_stats["achieved_rps"]))
+        if tester_stats["saturated"]:
+            logging.warning(f"Tester saturated while sending {tests_per_second} requests per second, the execution is invalid: {'; '.join(tester_stats['saturation_reasons'])}.")
+        # Filter out any exceptions that may have occurred during the test case runs, they were counted in errors
         okay_results = [result for result in running_results if isinstance(result, TestResult)]
-        # Collect any exceptions that occurred during the test case runs
-        errors = [result for result in running_results if isinstance(result, Exception)]
+        if errors.total():
+            logging.warning(f"{errors.total()} requests failed at {tests_per_second} requests per second: {errors}.")
+        if in_flight_limit and in_flight_limit.get_affected_requests():
+            logging.warning(f"In-flight limit of {self.max_in_flight} affected {in_flight_limit.get_affected_requests()} requests at {tests_per_second} requests per second: {in_flight_limit.dropped} dropped, {in_flight_limit.queued} queued ({in_flight_limit.expired} expired), {in_flight_limit.unsent} unsent.")
+
+        # the server timestamps come from the server clock; estimate its offset from the same requests
+        clock = None
+        estimator = ClockOffsetEstimator()
+        for result in okay_results:
+            estimator.add_result(result)
+        clock_offset = estimator.estimate()
+        if clock_offset:
+            clock = {"requests": clock_offset.to_json(), "corrected": self.correct_clock_offset}
+            if self.correct_clock_offset:
+                okay_results = correct_results(okay_results, clock_offset)
+            if abs(clock_offset.offset) > max(clock_offset.uncertainty, 0.001):
+                logging.info(f"Server clock is {clock_offset.offset * 1000:+.1f} ms (± {clock_offset.uncertainty * 1000:.1f} ms) off the tester clock.")
+
+        warm_up_seconds, warm_up_results, warm_up_errors = 0.0, [], None
+        if self.steady_state_detector:
+            warm_up_seconds, warm_up_results, okay_results = self.steady_state_detector.split(
+                okay_results,
+                start=start_execution_time,
+                duration_seconds=duration_seconds
+            )
+            # the errors are timed from the start of the loop, like the execution
+            warm_up_errors, errors = errors.split(warm_up_seconds)
+
+        cool_down_seconds = self._pending_cool_down_seconds
+        self._pending_cool_down_seconds = 0.0
 
         return TestExecution(
             total_span=Timespan(
                 start=start_execution_time,
-                end=datetime.now()
+                end=runtime.now()
             ),
             span_making_requests=span_making_requests,
             request_per_second=tests_per_second,
             seconds_making_requests=duration_seconds,
             test_case=test_case,
             results=okay_results,
-            errors=errors
+            errors=errors,
+            cool_down_seconds=cool_down_seconds,
+            warm_up_seconds=warm_up_seconds,
+            warm_up_results=warm_up_results,
+            warm_up_errors=warm_up_errors,
+            tester_stats=tester_stats,
+            load=load,
+            in_flight_limit=in_flight_limit.to_json() if in_flight_limit else None,
+            clock=clock
         )
 
     async def rerun_test(self, test_execution: TestExecution) -> TestExecution:
@@ -87,7 +294,8 @@ class TestExecutionService:
 
         monitoring = BackgroundClusterMonitoring(
             cluster_service=self.cluster_service,
-            cluster=cluster
+            cluster=cluster,
+            metrics=self.metrics
         )
         monitoring_task = asyncio.create_task(monitoring.run(monitoring_interval))
         execution = await self.execute_test(
@@ -99,6 +307,7 @@ class TestExecutionService:
         await monitoring.stop()
         await monitoring_task
         execution.cluster_stats = monitoring.stats
+        self.__record_host_offsets(execution)
         return execution
 
     async def rerun_while_monitoring(
@@ -106,24 +315,61 @@ class TestExecutionService:
         test_execution: TestExecution,
         monitoring_interval:float,
         cluster: Cluster)-> TestExecution:
+
+        if not self.checkpoint:
+            return await self.__rerun_while_monitoring(test_execution, monitoring_interval, cluster)
+
+        return await self.checkpoint.probe(
+            kind="rerun_while_monitoring",
+            test_case=test_execution.test_case,
+            params={
+                "tests_per_second": test_execution.request_per_second,
+                "duration_seconds": test_execution.seconds_making_requests,
+                "load": test_execution.get_load() if test_execution.get_load() else 0,
+                "monitoring_interval": monitoring_interval
+            },
+            run=lambda: self.__rerun_while_monitoring(test_execution, monitoring_interval, cluster)
+        )
+
+    async def __rerun_while_monitoring(
+        self, 
+        test_execution: TestExecution,
+        monitoring_interval:float,
+        cluster: Cluster)-> TestExecution:
     
         monitoring = BackgroundClusterMonitoring(
             cluster_service=self.cluster_service,
-            cluster=cluster
+            cluster=cluster,
+            metrics=self.metrics
         )
 
         monitoring_task = asyncio.create_task(monitoring.run(monitoring_interval))
 
 
 
-        rerun = await self.rerun_test(test_execution)
+        rerun = await self.__execute_test(
+            tests_per_second=test_execution.request_per_second,
+            duration_seconds=test_execution.seconds_making_requests,
+            load=test_execution.get_load() if test_execution.get_load() else 0,
+            test_case=test_execution.test_case
+        )
         await monitoring.stop()
         await monitoring_task
 
         rerun.cluster_stats = monitoring.stats
+        self.__record_host_offsets(rerun)
 
         return rerun
 
+    @staticmethod
+    def __record_host_offsets(execution: TestExecution):
+        """
+        Adds the clock offsets of the monitored hosts, read through SSH, to the clock of the execution.
+        """
+        host_offsets = estimate_host_offsets(execution.cluster_stats)
+        if host_offsets:
+            execution.clock = {**(execution.clock or {}), "hosts": host_offsets}
+
     async def find_max_acceptable_load(
             self, 
             test_case: TestCase, 
@@ -132,39 +378,120 @@ class TestExecutionService:
             max_avg_response_time: float, 
             load_increment: int = 1, 
             max_iterations: int = 100,
-            rest_time: int = 0
+            rest_time: int = 0,
+            expected_load: int = None
             ) -> TestExecution:
-    
-        load = test_case.get_min_recommended_load()
-        last_execution = None
-        for _ in range(max_iterations):
+        """
+        Finds the highest load whose probe meets the maximum average response time, among the loads
+        get_min_recommended_load() + k * load_increment.
+        The search gallops: the step doubles after every probe that meets the limits, then the
+        interval between the last load that met them and the first that did not is bisected, reusing
+        the probes of both ends. Costs that grow fast with the load, like fibonacci's, need a few
+        probes instead of one per load.
+        The probe count and the time saved compared with probing every load are kept in last_load_search.
+        :param test_case: The test case to run.
+        :param request_per_second: The requests per second of every probe.
+        :param duration_seconds: The duration of every probe in seconds.
+        :param max_avg_response_time: The maximum average response time allowed.
+        :param load_increment: The resolution of the search over the load.
+        :param max_iterations: The maximum number of probes.
+        :param rest_time: The time to rest between probes, in seconds.
+        :param expected_load: Optional load expected to be the answer, e.g. from a CalibrationCache. It and the next load are
+        probed first; when the first meets the limits and the next does not, the search ends there, otherwise both probes
+        serve as bounds of the full search.
+        :return: The probe of the highest acceptable load, or of the first load when even it exceeds the limits.
+        """
+        min_load = test_case.get_min_recommended_load()
+        probes: dict[int, TestExecution] = {}
+        rest_seconds = 0.0
+
+        async def probe(step: int) -> TestExecution:
+            nonlocal rest_seconds
+            if step in probes:
+                return probes[step]
+            load = min_load + step * load_increment
             logging.info(f"Testing with load {load} and {request_per_second} requests per second.")
-            try:
-                await asyncio.sleep(rest_time) if rest_time > 0 else None
-                execution = await self.execute_test(request_per_second, duration_seconds, load, test_case)
-                
-            except Exception as e:
-                logging.error(f"Error during test execution: {e}")
-                if last_execution:
-                    logging.warning(f"Returning last successful execution with load {last_execution.request_per_second}.")
-                    return last_execution
-                raise e
-            
-            avg_result = execution.avg_response_time() if execution.results else float('inf')
-            
+            self.record_search_state(test_case, phase="max_acceptable_load", load=load, request_per_second=request_per_second)
+            rest_seconds += await self.rest(rest_time)
+            probes[step] = await self.execute_test(request_per_second, duration_seconds, load, test_case)
+            avg_result = probes[step].avg_response_time() if probes[step].results else float('inf')
             logging.info(f"Average result: {avg_result}")
+            if not probes[step].is_valid():
+                logging.warning(f"Tester saturated with load {load}, not trusting the probe.")
+            return probes[step]
 
+        passed_step, failed_step = None, None
+        step, step_size = 0, 1
+        try:
+            if expected_load is not None and expected_load >= min_load:
+                expected_step = (expected_load - min_load) // load_increment
+                logging.info(f"Verifying the expected max acceptable load {min_load + expected_step * load_increment}.")
+                if self.__meets_sla(await probe(expected_step), max_avg_response_time):
+                    passed_step, step = expected_step, expected_step + 1
+                    if self.__meets_sla(await probe(step), max_avg_response_time):
+                        logging.info("The expected load was too low, searching above it.")
+                        passed_step = step
+                        step += step_size
+                        step_size *= 2
+                    else:
+                        failed_step = step
+                else:
+                    logging.info("The expected load exceeds the limits, searching below it.")
+                    failed_step = expected_step
+
+            # gallop until a load fails, or, below a known failure, until one passes
+            while (failed_step is None or (passed_step is None and step < failed_step)) and len(probes) < max_iterations:
+                if failed_step is not None:
+                    step = min(step, failed_step - 1)
+                if self.__meets_sla(await probe(step), max_avg_response_time):
+                    passed_step = step
+                    step += step_size
+                    step_size *= 2
+                else:
+                    logging.info(f"Exceeded max average response time or error rate with load: {min_load + step * load_increment}.")
+                    failed_step = step
+
+            while failed_step is not None and passed_step is not None and failed_step - passed_step > 1 and len(probes) < max_iterations:
+                mid = (passed_step + failed_step) // 2
+                if self.__meets_sla(await probe(mid), max_avg_response_time):
+                    passed_step = mid
+                else:
+                    failed_step = mid
+        except Exception as e:
+            logging.error(f"Error during test execution: {e}")
+            if passed_step is None:
+                raise e
+            logging.warning(f"Returning last successful execution with load {probes[passed_step].get_load()}.")
+            failed_step = None
+
+        self.last_load_search = self.__load_search_summary(probes, passed_step, failed_step, rest_seconds)
+        if expected_load is not None:
+            self.last_load_search["expected_load"] = expected_load
+            self.last_load_search["expected_load_held"] = passed_step is not None and probes[passed_step].get_load() == expected_load
+        if passed_step is None:
+            return probes[failed_step]
+        if failed_step is None and len(probes) >= max_iterations:
+            logging.error(f"Max iterations reached without exceeding max average response time, at load {probes[passed_step].get_load()}.")
+        return probes[passed_step]
 
-            if avg_result > max_avg_response_time or execution.has_errors():
-                logging.info(f"Exceeded max average response time with load: {load} requests per second.")
-                return last_execution if last_execution else execution
-            
-            last_execution = execution
-            load += load_increment
-
-        logging.error(f"Max acceptable load reached: {load} requests per second.")
+    @staticmethod
+    def __load_search_summary(probes: dict[int, TestExecution], passed_step: int | None, failed_step: int | None, rest_seconds: float) -> dict:
+        """
+        Compares a load search with probing every load in turn, which would have probed each load
+        up to the highest acceptable one and the next one.
+        :return: The probes made, the probes the linear walk would have made, and the time saved, estimated from the average time of the probes made.
+        """
+        linear_probes = (passed_step + 1 if passed_step is not None else 0) + (1 if failed_step is not None else 0)
+        seconds = sum(execution.total_span.get_seconds() for execution in probes.values()) + rest_seconds
+        probes_saved = max(linear_probes - len(probes), 0)
+        return {
+            "probes": len(probes),
+            "linear_probes": linear_probes,
+            "probes_saved": probes_saved,
+            "seconds": seconds,
+            "seconds_saved": probes_saved * seconds / len(probes) if probes else 0.0,
+        }
 
-        return await self.execute_test(request_per_second, duration_seconds, load, test_case)
     async def find_max_requests_per_second(
         self, 
         test_case: TestCase, 
@@ -173,7 +500,8 @@ class TestExecutionService:
         max_avg_response_time: float = 2.0, 
         max_power: int = 10, 
         start_power: int = 0,
-        rest_time: int = 0
+        rest_time: int = 0,
+        prediction: dict = None
     ) -> TestExecution:
         """
         Finds the maximum requests per second that can be made without exceeding the maximum average response time.
@@ -184,6 +512,7 @@ class TestExecutionService:
         :param max_power: The maximum power of two to test.
         :param start_power: The starting power of two to test.
         :param rest_time: The time to rest between tests, in seconds.
+        :param prediction: Optional prediction of CapacityModel.predict; when given, its bounds are checked first and the search stays between them if they hold.
         :return: A TestExecution object containing the results of the test with the maximum requests per second that does not exceed the max average response time.
         """
         return await self.__find_max_requests_per_second_aux(
@@ -194,7 +523,8 @@ class TestExecutionService:
             max_power=max_power,
             start_power=start_power,
             retries=10,
-            rest_time=rest_time
+            rest_time=rest_time,
+            prediction=prediction
         )
 
     async def __find_max_requests_per_second_aux(
@@ -205,7 +535,8 @@ class TestExecutionService:
         max_power: int = 10,
         start_power: int = 0, 
         retries: int = 10,
-        rest_time: int = 0
+        rest_time: int = 0,
+        prediction: dict = None
     ) -> TestExecution:
         """
         Finds the maximum requests per second that can be made without exceeding the maximum average response time.
@@ -214,50 +545,66 @@ class TestExecutionService:
         :param load: The load to apply during the test.
         :param duration_seconds: The duration of the test in seconds.
         :param max_power: The maximum power of two to test.
+        :param retries: How many times the search starts over when none of its probes met the SLA.
+        :param rest_time: The cool-down before each probe, in seconds; retries keep it.
+        :param prediction: Optional bounds predicted by the CapacityModel; retries start from them again.
         :return: A TestExecution object containing the results of the test with the maximum requests per second that does not exceed the max average response time.
         """
-        start_execution_time = datetime.now()
-
-        test_power_of_two = await self.__test_powers_of_two_requests_until_exceeds_max_avg_response_time(
-            test_case, 
-            max_avg_response_time, 
-            load, duration_seconds, 
-            max_power, 
-            start_power=start_power, 
-            rest_time=rest_time
-        )
-        
-        if not test_power_of_two:
-            logging.error("No test executions were performed.")
-            return TestExecution(
-                total_span=Timespan(start=start_execution_time, end=datetime.now()),
-                span_making_requests=Timespan(start=start_execution_time, end=datetime.now()),
-                test_case=test_case,
-                results=[],
-                request_per_second=0,
-                seconds_making_requests=duration_seconds
+        start_execution_time = runtime.now()
+
+        lower_bound, upper_bound, execution_results = 0, None, []
+        if prediction:
+            lower_bound, upper_bound, execution_results = await self.__check_predicted_bounds(
+                test_case, max_avg_response_time, load, duration_seconds, prediction, rest_time
             )
 
-        last_power_two_execution = test_power_of_two[-1]
+        if upper_bound is None:
+            test_power_of_two = await self.__test_powers_of_two_requests_until_exceeds_max_avg_response_time(
+                test_case, 
+                max_avg_response_time, 
+                load, duration_seconds, 
+                max_power, 
+                # above a prediction that was too low, the doubling goes on from the rate that met the SLA
+                start_power=max(start_power, math.floor(math.log2(lower_bound)) + 1) if lower_bound else start_power, 
+                rest_time=rest_time
+            )
+            
+            if not test_power_of_two:
+                logging.error("No test executions were performed.")
+                return TestExecution(
+                    total_span=Timespan(start=start_execution_time, end=runtime.now()),
+                    span_making_requests=Timespan(start=start_execution_time, end=runtime.now()),
+                    test_case=test_case,
+                    results=[],
+                    request_per_second=0,
+                    seconds_making_requests=duration_seconds,
+                    load=load
+                )
+
+            last_power_two_execution = test_power_of_two[-1]
+            upper_bound = last_power_two_execution.request_per_second
 
         # Use binary search to find the maximum requests per second
-        lower_bound = 1
-        upper_bound = last_power_two_execution.request_per_second
-        execution_results = []
-
-        await asyncio.sleep(rest_time) if rest_time > 0 else None
-        execution = await self.execute_test(lower_bound, duration_seconds, load, test_case)
-        execution_results.append(execution)
+        if not lower_bound:
+            lower_bound = 1
+            await self.rest(rest_time)
+            execution = await self.execute_test(lower_bound, duration_seconds, load, test_case)
+            execution_results.append(execution)
 
         while lower_bound < upper_bound:
             mid = (lower_bound + upper_bound + 1) // 2
+            self.record_search_state(test_case, phase="max_requests_per_second", load=load, lower_bound=lower_bound, upper_bound=upper_bound)
 
-            await asyncio.sleep(rest_time) if rest_time > 0 else None
+            await self.rest(rest_time)
             execution = await self.execute_test(mid, duration_seconds, load, test_case)
             
             execution_results.append(execution)
 
-            if (execution.avg_response_time() if execution.results else float('inf')) > max_avg_response_time:
+            if not execution.is_valid():
+                # the tester, not the cluster, was the limit: the probe says nothing about the cluster at this rate
+                logging.warning(f"Tester saturated at {mid} requests per second, not trusting the probe.")
+                upper_bound = mid - 1
+            elif not self.__meets_sla(execution, max_avg_response_time):
                 upper_bound = mid - 1
             else:
                 lower_bound = mid
@@ -266,7 +613,8 @@ class TestExecutionService:
         try:
             biggest_execution =  self.biggest_execution_avg_lower_than_max_avg_response_time(
                 test_executions=execution_results,
-                max_avg_response_time=max_avg_response_time
+                max_avg_response_time=max_avg_response_time,
+                meets_sla=lambda execution: self.__meets_sla(execution, max_avg_response_time)
             )
         except ValueError as e:
             if not retries:
@@ -281,19 +629,78 @@ class TestExecutionService:
                 duration_seconds=duration_seconds,
                 max_power=max_power,
                 start_power=0,
-                retries=retries - 1
+                retries=retries - 1,
+                rest_time=rest_time,
+                prediction=prediction
             )
 
 
         return TestExecution(
-            total_span=Timespan(start=start_execution_time, end=datetime.now()),
-            span_making_requests=Timespan(start=start_execution_time, end=datetime.now()),
+            total_span=Timespan(start=start_execution_time, end=runtime.now()),
+            span_making_requests=Timespan(start=start_execution_time, end=runtime.now()),
             test_case=test_case,
             results=biggest_execution.results,
             request_per_second=lower_bound,
-            seconds_making_requests=duration_seconds
+            seconds_making_requests=duration_seconds,
+            tester_stats=biggest_execution.tester_stats,
+            load=load,
+            in_flight_limit=biggest_execution.in_flight_limit,
+            clock=biggest_execution.clock
         )
 
+    async def __check_predicted_bounds(
+        self, test_case: TestCase,
+        max_avg_response_time: float,
+        load: int,
+        duration_seconds: int,
+        prediction: dict,
+        rest_time: int = 0
+    ) -> tuple[int, int | None, list[TestExecution]]:
+        """
+        Probes the bounds of a predicted maximum, one probe each, so the binary search only has to cover the predicted interval.
+        :param prediction: The prediction of CapacityModel.predict.
+        :return: The highest rate known to meet the SLA (0 if none), the highest rate that may still meet it (None when the
+        upper bound met the SLA too, so it has to be searched), and the probes.
+        """
+        low = max(1, math.floor(prediction["low"]))
+        high = max(low, math.ceil(prediction["high"]))
+        if self.max_requests_per_second is not None:
+            low = min(low, self.max_requests_per_second)
+            high = min(high, self.max_requests_per_second)
+        logging.info(f"Predicted max requests per second with load {load}: {prediction['request_per_second']:.1f}, checking {low} to {high}.")
+        self.record_search_state(test_case, phase="predicted_bounds", load=load, lower_bound=low, upper_bound=high)
+
+        executions = []
+        await self.rest(rest_time)
+        execution = await self.execute_test(low, duration_seconds, load, test_case)
+        executions.append(execution)
+        if not self.__meets_sla(execution, max_avg_response_time):
+            logging.info(f"The prediction was too high: {low} requests per second already exceed the limits.")
+            return 0, max(low - 1, 1), executions
+        if self.max_requests_per_second is not None and high >= self.max_requests_per_second:
+            return low, high, executions
+
+        await self.rest(rest_time)
+        execution = await self.execute_test(high + 1, duration_seconds, load, test_case)
+        executions.append(execution)
+        if self.__meets_sla(execution, max_avg_response_time):
+            logging.info(f"The prediction was too low: {high + 1} requests per second still meet the limits.")
+            return high + 1, None, executions
+        return low, high, executions
+
+    def __meets_sla(self, execution: TestExecution, max_avg_response_time: float) -> bool:
+        """
+        Checks an execution against every limit of the searches: a valid execution whose average
+        response time, error rate and in-flight cap all stay within the limits.
+        :param execution: The execution to check.
+        :param max_avg_response_time: The maximum average response time.
+        :return: True if the execution meets them all.
+        """
+        if not execution.is_valid():
+            return False
+        avg_result = execution.avg_response_time() if execution.results else float('inf')
+        return avg_result <= max_avg_response_time and not self.exceeds_max_error_rate(execution) and not execution.is_overloaded()
+
     async def __test_powers_of_two_requests_until_exceeds_max_avg_response_time(
         self, test_case: TestCase,
         max_avg_response_time: float,
@@ -316,9 +723,13 @@ class TestExecutionService:
 
         for _ in range(max_power):
             tests_per_second = 2 ** power_of_two
+            reached_budget = self.max_requests_per_second is not None and tests_per_second >= self.max_requests_per_second
+            if reached_budget:
+                tests_per_second = self.max_requests_per_second
             logging.info(f"Testing with {tests_per_second} tests per second.")
+            self.record_search_state(test_case, phase="powers_of_two", load=load, tests_per_second=tests_per_second)
 
-            await asyncio.sleep(rest_time) if rest_time > 0 else None
+            await self.rest(rest_time)
 
             execution = await self.execute_test(tests_per_second, duration_seconds, load, test_case)
 
@@ -327,8 +738,16 @@ class TestExecutionService:
             avg_result =  execution.avg_response_time() if execution.results else float('inf')
             logging.info(f"Average result: {avg_result}")
 
-            if avg_result > max_avg_response_time or execution.has_errors():
-                logging.info(f"Exceeded max average response time with {tests_per_second} tests per second.")
+            if not execution.is_valid():
+                logging.warning(f"Tester saturated at {tests_per_second} tests per second, using it as the upper bound.")
+                return test_executions
+
+            if not self.__meets_sla(execution, max_avg_response_time):
+                logging.info(f"Exceeded max average response time or error rate with {tests_per_second} tests per second.")
+                return test_executions
+
+            if reached_budget:
+                logging.warning(f"Reached the load-generation budget of {tests_per_second} requests per second without exceeding max average response time with load {load}.")
                 return test_executions
 
             power_of_two += 1
@@ -341,27 +760,37 @@ class TestExecutionService:
     @staticmethod
     def biggest_execution_avg_lower_than_max_avg_response_time(
         test_executions: list[TestExecution], 
-        max_avg_response_time: float
+        max_avg_response_time: float,
+        meets_sla: Callable[[TestExecution], bool] = None
     ) -> TestExecution:
         """
-        Finds the test execution with the largest average response time that is still lower than the specified maximum average response time.
+        Finds the test execution with the largest average response time that still meets the specified maximum average response time, as the load search does.
         :param test_executions: List of TestExecution objects to search through.
         :param max_avg_response_time: The maximum average response time to compare against.
-        :return: The TestExecution object with the largest average response time that is still lower than max_avg_response_time.
+        :param meets_sla: Optional check of every limit an execution has to meet, e.g. the error rate too. Defaults to a valid,
+        not overloaded execution whose average response time is not above max_avg_response_time.
+        :return: The TestExecution object with the largest average response time that is not above max_avg_response_time.
         """
+        if meets_sla is None:
+            meets_sla = lambda execution: (
+                execution.is_valid() and not execution.is_overloaded() and bool(execution.results)
+                and execution.avg_response_time() <= max_avg_response_time
+            )
         biggest_execution = None
         if not test_executions:
             raise ValueError("No test executions provided.")
             
         
         for execution in test_executions:
-            avg_result = execution.avg_response_time()
-            if avg_result < max_avg_response_time:
-                if not biggest_execution or avg_result > biggest_execution.avg_response_time():
-                    biggest_execution = execution
-        test_executions.sort(key=lambda x: x.avg_response_time(), reverse=True)
+            if not meets_sla(execution):
+                continue
+            if not biggest_execution or execution.avg_response_time() > biggest_execution.avg_response_time():
+                biggest_execution = execution
+        # an execution whose requests all failed has no response time
+        test_executions.sort(key=lambda x: x.avg_response_time() if x.results else float('inf'), reverse=True)
 
         if not biggest_execution:
-            raise ValueError(f"No test execution found with average response time lower than the maximum allowed, min response time was {test_executions[-1].avg_response_time()} seconds with {test_executions[-1].request_per_second} requests per second.")
+            fastest = test_executions[-1]
+            raise ValueError(f"No test execution found meeting the maximum average response time and error rate, min response time was {fastest.avg_response_time() if fastest.results else float('inf')} seconds with {fastest.request_per_second} requests per second.")
 
         return biggest_execution
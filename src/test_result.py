@@ -5,18 +5,20 @@ class TestResult:
     Represents the result of a test case execution.
     """
 
-    def __init__(self, test_case_name: str, load: int, request_span: Timespan, server_processing_span: Timespan):
+    def __init__(self, test_case_name: str, load: int, request_span: Timespan, server_processing_span: Timespan, phases: dict = None):
         """
         Initializes the TestResult with the name of the test case and its performance metrics.
         :param test_case_name: The name of the test case.
         :param request_span: The time taken for the request.
         :param server_processing_span: The time taken by the server to process the request.
+        :param phases: Optional duration in seconds of each phase of the request, as returned by RequestTrace.phases.
         """
 
         self.test_case_name = test_case_name
         self.load = load
         self.request_span = request_span
         self.server_processing_span = server_processing_span
+        self.phases = phases
     
     def get_response_time(self) -> float:
         """
@@ -33,7 +35,7 @@ class TestResult:
         Converts the TestResult instance to a JSON-serializable dictionary.
         :return: A dictionary representation of the TestResult.
         """
-        return {
+        data = {
             "test_case_name": self.test_case_name,
             "load": self.load,
             "request_span": {
@@ -45,3 +47,21 @@ class TestResult:
                 "end": self.server_processing_span.end.isoformat()
             }
         }
+        if self.phases is not None:
+            data["phases"] = self.phases
+        return data
+
+    @staticmethod
+    def from_json(data: dict) -> "TestResult":
+        """
+        Creates a TestResult instance from a dictionary produced by to_json.
+        :param data: A dictionary representation of the TestResult.
+        :return: A TestResult instance.
+        """
+        return TestResult(
+            test_case_name=data["test_case_name"],
+            load=data["load"],
+            request_span=Timespan.from_json(data["request_span"]),
+            server_processing_span=Timespan.from_json(data["server_processing_span"]),
+            phases=data.get("phases")
+        )
@@ -0,0 +1,100 @@
+from percentiles import percentiles
+import runtime
+import asyncio
+import time
+
+class TesterMonitor:
+    """
+    Watches the tester process itself while a test execution runs: event-loop lag,
+    process CPU usage and requests in flight. When the tester saturates, the execution
+    measures the tester's limits rather than the cluster's, so it is flagged as invalid.
+    """
+
+    def __init__(
+            self,
+            interval: float = 0.1,
+            max_loop_lag: float = 0.05,
+            max_cpu_utilisation: float = 0.9,
+            min_send_rate_ratio: float = 0.95,
+        ):
+        """
+        Initializes the TesterMonitor.
+        :param interval: Interval between samples, in seconds.
+        :param max_loop_lag: Highest acceptable p99 event-loop lag, in seconds.
+        :param max_cpu_utilisation: Highest acceptable average CPU usage of the tester process, as a fraction of one core.
+        :param min_send_rate_ratio: Lowest acceptable achieved/requested send rate ratio.
+        """
+        self.interval = interval
+        self.max_loop_lag = max_loop_lag
+        self.max_cpu_utilisation = max_cpu_utilisation
+        self.min_send_rate_ratio = min_send_rate_ratio
+
+        self.sent_requests = 0
+        self.finished_requests = 0
+        self._loop_lags = []
+        self._cpu_utilisations = []
+        self._max_in_flight = 0
+        self._running = False
+
+    def request_sent(self, task: asyncio.Task):
+        """
+        Counts a request as in flight until its task finishes.
+        :param task: The task running the request.
+        """
+        self.sent_requests += 1
+        task.add_done_callback(self.__request_finished)
+
+    def __request_finished(self, task: asyncio.Task):
+        self.finished_requests += 1
+
+    def get_in_flight(self) -> int:
+        return self.sent_requests - self.finished_requests
+
+    async def run(self):
+        self._running = True
+        loop = asyncio.get_running_loop()
+        # on virtual time the process CPU time is not spent in the simulated time, so it is not sampled
+        sample_cpu = not runtime.is_virtual_time()
+        last_wall, last_cpu = loop.time(), time.process_time()
+
+        while self._running:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now, cpu = loop.time(), time.process_time()
+
+            self._loop_lags.append(max(0.0, now - expected))
+            if sample_cpu and now > last_wall:
+                self._cpu_utilisations.append((cpu - last_cpu) / (now - last_wall))
+            self._max_in_flight = max(self._max_in_flight, self.get_in_flight())
+            last_wall, last_cpu = now, cpu
+
+    async def stop(self):
+        self._running = False
+
+    def summary(self, requested_rps: float, achieved_rps: float) -> dict:
+        """
+        Summarises the samples and decides whether the tester saturated.
+        :param requested_rps: The send rate the execution asked for.
+        :param achieved_rps: The send rate the execution actually achieved.
+        :return: A JSON-serializable dictionary with the samples summary, 'saturated' and the reasons for it.
+        """
+        loop_lag = percentiles(self._loop_lags)
+        cpu_utilisation = sum(self._cpu_utilisations) / len(self._cpu_utilisations) if self._cpu_utilisations else 0.0
+        send_rate_ratio = achieved_rps / requested_rps if requested_rps else 1.0
+
+        reasons = []
+        if loop_lag["p99"] is not None and loop_lag["p99"] > self.max_loop_lag:
+            reasons.append(f"event-loop lag p99 {loop_lag['p99'] * 1000:.1f} ms above {self.max_loop_lag * 1000:.1f} ms")
+        if cpu_utilisation > self.max_cpu_utilisation:
+            reasons.append(f"tester CPU {cpu_utilisation:.0%} above {self.max_cpu_utilisation:.0%}")
+        if send_rate_ratio < self.min_send_rate_ratio:
+            reasons.append(f"achieved send rate {achieved_rps:.1f} RPS below {self.min_send_rate_ratio:.0%} of {requested_rps} RPS")
+
+        return {
+            "loop_lag": loop_lag,
+            "cpu_utilisation": cpu_utilisation,
+            "max_cpu_utilisation": max(self._cpu_utilisations, default=0.0),
+            "max_in_flight": self._max_in_flight,
+            "saturated": bool(reasons),
+            "saturation_reasons": reasons
+        }
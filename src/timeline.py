@@ -0,0 +1,251 @@
+from itertools import repeat
+from operator import itemgetter
+import numpy as np
+import time
+import csv
+
+HOST_METRICS = ("cpu_busy", "cpu_usr", "cpu_sys", "cpu_iowait", "memory_used")
+LATENCY_QUANTILES = (0.5, 0.9, 0.99)
+
+def parse_timestamps(values: list[str]) -> np.ndarray:
+    """
+    Parses ISO timestamps, as saved by the result files, in one vectorized pass. Timestamps with an
+    offset ('+02:00' or 'Z') are moved to UTC by it. Timestamps without one were written by runtime.now,
+    in the local time of the tester, and are moved by the local UTC offset of their hour.
+    :param values: The ISO timestamps.
+    :return: The timestamps as POSIX seconds.
+    """
+    # numpy reads every timestamp as UTC and warns on offsets, so they are stripped and applied here;
+    # a file holds few formats, so the common cases skip building the offset of every timestamp
+    first = _offset(values[0]) if values else ""
+    if first and all(map(str.endswith, values, repeat(first))):
+        seconds = np.array(list(map(itemgetter(slice(None, -len(first))), values)), dtype="datetime64[us]").astype(np.int64) / 1e6
+        return seconds - _offset_seconds(first)
+    if not first and not any(value[-6] in "+-" or value[-1] == "Z" for value in values):
+        seconds = np.array(values, dtype="datetime64[us]").astype(np.int64) / 1e6
+        return seconds - _local_utc_offsets(seconds)
+    offsets = [_offset(value) for value in values]
+    stripped = [value[:-len(offset)] if offset else value for value, offset in zip(values, offsets)]
+    seconds = np.array(stripped, dtype="datetime64[us]").astype(np.int64) / 1e6
+    offset_seconds = {offset: _offset_seconds(offset) for offset in set(offsets)}
+    utc_offsets = np.array([offset_seconds[offset] for offset in offsets], dtype=float)
+    local = np.isnan(utc_offsets)
+    utc_offsets[local] = _local_utc_offsets(seconds[local])
+    return seconds - utc_offsets
+
+def _offset(value: str) -> str:
+    """
+    Finds the offset an ISO timestamp ends with: '+HH:MM', '-HH:MM', 'Z' or '' for local time.
+    """
+    return value[-6:] if value[-6] in "+-" else "Z" if value[-1] == "Z" else ""
+
+def _offset_seconds(offset: str) -> float:
+    """
+    Converts an ISO offset to seconds east of UTC, NaN for a timestamp in local time.
+    """
+    if not offset:
+        return float("nan")
+    if offset == "Z":
+        return 0.0
+    hours, minutes = offset[1:].split(":")
+    return (1 if offset[0] == "+" else -1) * (int(hours) * 3600 + int(minutes) * 60)
+
+def _local_utc_offsets(wall_seconds: np.ndarray) -> np.ndarray:
+    """
+    Finds the local UTC offset of local wall-clock times given as if they were UTC. Offsets only change
+    on the hour, so they are looked up once per distinct hour.
+    """
+    hours, index = np.unique(wall_seconds // 3600 * 3600, return_inverse=True)
+    offsets = np.array([hour - time.mktime(time.gmtime(hour)[:8] + (-1,)) for hour in hours.tolist()], dtype=float)
+    return offsets[index.reshape(-1)]
+
+class Timeline:
+    """
+    Aligns the results, errors and cluster stats of one test execution on fixed time windows.
+
+    Every column is a numpy array with one value per window: the requests completed in the
+    window give its throughput and latency percentiles, and the cluster stats sampled in it
+    give the metrics of each host. Windows without a sample hold NaN, so a monitoring interval
+    longer than the window leaves gaps instead of made-up values.
+    """
+
+    def __init__(self, start: float, bucket_seconds: float, columns: dict[str, np.ndarray]):
+        """
+        Initializes the Timeline.
+        :param start: POSIX time the first window starts at.
+        :param bucket_seconds: Length of each window, in seconds.
+        :param columns: The aligned columns, all with the same length.
+        """
+        self.start = start
+        self.bucket_seconds = bucket_seconds
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["time"])
+
+    @staticmethod
+    def from_execution(execution: dict, bucket_seconds: float = 1.0) -> "Timeline":
+        """
+        Builds the timeline of a test execution saved with TestExecution.to_json.
+        Warm-up results and errors are included, the timeline covering the whole time requests were sent.
+        :param execution: The execution, as found in benchmark files.
+        :param bucket_seconds: Length of each window, in seconds.
+        :return: The Timeline.
+        """
+        results = execution.get("results", []) + execution.get("warm_up_results", [])
+        start = parse_timestamps([execution["span_making_requests"]["start"]])[0]
+        end = max(
+            parse_timestamps([execution["total_span"]["end"]])[0],
+            start + execution.get("seconds_making_requests", 0)
+        )
+        buckets = max(1, int(np.ceil((end - start) / bucket_seconds)))
+        columns = {"time": np.arange(buckets) * bucket_seconds}
+
+        request_start = parse_timestamps([result["request_span"]["start"] for result in results])
+        request_end = parse_timestamps([result["request_span"]["end"] for result in results])
+        server_start = parse_timestamps([result["server_processing_span"]["start"] for result in results])
+        server_end = parse_timestamps([result["server_processing_span"]["end"] for result in results])
+
+        # requests are placed in the window they completed in
+        index = _bucket_index(request_end, start, bucket_seconds, buckets)
+        completed = np.bincount(index, minlength=buckets)
+        columns["sent_rps"] = np.bincount(_bucket_index(request_start, start, bucket_seconds, buckets), minlength=buckets) / bucket_seconds
+        columns["throughput_rps"] = completed / bucket_seconds
+        latency = request_end - request_start
+        for quantile in LATENCY_QUANTILES:
+            columns[f"latency_p{round(quantile * 100)}"] = bucket_quantile(index, latency, quantile, buckets)
+        columns["latency_max"] = bucket_quantile(index, latency, 1.0, buckets)
+        columns["server_time_avg"] = _bucket_mean(index, server_end - server_start, buckets)
+
+        errors = np.zeros(buckets)
+        error_series = [
+            series
+            for key in ("errors", "warm_up_errors")
+            for series in (execution.get(key) or {}).get("per_second", {}).values()
+        ]
+        for series in error_series:
+            seconds = np.array([int(second) for second in series], dtype=float)
+            counts = np.array(list(series.values()), dtype=float)
+            errors += np.bincount(_bucket_index(seconds + start, start, bucket_seconds, buckets), weights=counts, minlength=buckets)
+        columns["errors_per_second"] = errors / bucket_seconds
+        with np.errstate(invalid="ignore", divide="ignore"):
+            columns["error_rate"] = np.where(completed + errors > 0, errors / (completed + errors), np.nan)
+
+        samples = {}
+        for stats in execution.get("cluster_stats") or []:
+            for server in stats.get("servers", []):
+                samples.setdefault(server["host"], []).append(server)
+        for host, servers in sorted(samples.items()):
+            index = _bucket_index(parse_timestamps([server["timestamp"] for server in servers]), start, bucket_seconds, buckets)
+            values = {
+                "cpu_busy": [100.0 - float(server["stats"]["idle"]) for server in servers],
+                "cpu_usr": [float(server["stats"]["usr"]) for server in servers],
+                "cpu_sys": [float(server["stats"]["sys"]) for server in servers],
+                "cpu_iowait": [float(server["stats"]["iowait"]) for server in servers],
+                "memory_used": [float(server["memory"]["used"]) for server in servers],
+            }
+            for metric in HOST_METRICS:
+                columns[f"{host}.{metric}"] = _bucket_mean(index, np.array(values[metric]), buckets)
+
+        return Timeline(start=start, bucket_seconds=bucket_seconds, columns=columns)
+
+    def host_columns(self) -> list[str]:
+        return [name for name in self.columns if "." in name]
+
+    def correlation(self, a: str, b: str, lag: int = 0) -> tuple[float, int]:
+        """
+        Pearson correlation between two columns, over the windows where both have a value.
+        :param a: Name of the first column.
+        :param b: Name of the second column.
+        :param lag: Number of windows b is shifted by: a positive lag pairs a[t] with b[t + lag], i.e. a leads b.
+        :return: The correlation (NaN with fewer than 3 windows or a constant column) and the number of windows used.
+        """
+        x, y = self.columns[a], self.columns[b]
+        if lag > 0:
+            x, y = x[:-lag], y[lag:]
+        elif lag < 0:
+            x, y = x[-lag:], y[:lag]
+        mask = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[mask], y[mask]
+        if len(x) < 3 or x.std() == 0 or y.std() == 0:
+            return float("nan"), int(len(x))
+        return float(np.corrcoef(x, y)[0, 1]), int(len(x))
+
+    def lag_analysis(self, a: str, b: str, max_lag: int = 5) -> dict:
+        """
+        Finds the shift between two columns with the strongest correlation.
+        :param a: Name of the first column.
+        :param b: Name of the second column.
+        :param max_lag: Largest shift tried in each direction, in windows.
+        :return: A dictionary with the correlation at every lag, and the best lag (in windows and seconds) with its correlation.
+        """
+        by_lag = {lag: self.correlation(a, b, lag)[0] for lag in range(-max_lag, max_lag + 1)}
+        valid = {lag: r for lag, r in by_lag.items() if not np.isnan(r)}
+        best_lag = max(valid, key=lambda lag: (abs(valid[lag]), -abs(lag))) if valid else 0
+        return {
+            "by_lag": by_lag,
+            "best_lag": best_lag,
+            "best_lag_seconds": best_lag * self.bucket_seconds,
+            "best_correlation": valid.get(best_lag, float("nan")),
+        }
+
+    def correlate_with_hosts(self, column: str = "latency_p99", max_lag: int = 5) -> list[dict]:
+        """
+        Correlates a column with every host metric.
+        :param column: The column, usually a latency percentile.
+        :param max_lag: Largest shift tried in each direction, in windows.
+        :return: One entry per host metric with its correlation at lag 0 and its lag analysis, strongest first.
+        """
+        entries = []
+        for host_column in self.host_columns():
+            correlation, windows = self.correlation(host_column, column)
+            entries.append({"metric": host_column, "correlation": correlation, "windows": windows, **self.lag_analysis(host_column, column, max_lag)})
+        return sorted(entries, key=lambda entry: -abs(entry["best_correlation"]) if not np.isnan(entry["best_correlation"]) else 0.0)
+
+    def to_json(self) -> dict:
+        return {
+            "start": float(self.start),
+            "bucket_seconds": self.bucket_seconds,
+            "columns": {name: [None if np.isnan(value) else float(value) for value in values] for name, values in self.columns.items()}
+        }
+
+    def to_csv(self, path: str):
+        """
+        Writes the timeline as CSV, one row per window, empty cells for missing values.
+        :param path: The file to write.
+        """
+        names = list(self.columns)
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(names)
+            for row in zip(*(self.columns[name] for name in names)):
+                writer.writerow(["" if np.isnan(value) else f"{value:.6g}" for value in row])
+
+def bucket_quantile(index: np.ndarray, values: np.ndarray, quantile: float, buckets: int) -> np.ndarray:
+    """
+    Nearest-rank quantile of the values in every bucket, without a loop over the buckets.
+    :param index: Bucket of each value.
+    :param values: The values.
+    :param quantile: The quantile, between 0 and 1.
+    :param buckets: Number of buckets.
+    :return: The quantile of each bucket, NaN for empty buckets.
+    """
+    result = np.full(buckets, np.nan)
+    if len(values) == 0:
+        return result
+    order = np.lexsort((values, index))
+    counts = np.bincount(index, minlength=buckets)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    filled = counts > 0
+    ranks = np.clip(np.ceil(quantile * counts[filled]).astype(np.int64) - 1, 0, None)
+    result[filled] = values[order][offsets[filled] + ranks]
+    return result
+
+def _bucket_index(timestamps: np.ndarray, start: float, bucket_seconds: float, buckets: int) -> np.ndarray:
+    return np.clip(((timestamps - start) // bucket_seconds).astype(np.int64), 0, buckets - 1)
+
+def _bucket_mean(index: np.ndarray, values: np.ndarray, buckets: int) -> np.ndarray:
+    counts = np.bincount(index, minlength=buckets)
+    sums = np.bincount(index, weights=values, minlength=buckets)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
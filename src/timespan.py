@@ -27,6 +27,18 @@ class Timespan:
             "end": self.end.isoformat()
         }
 
+    @staticmethod
+    def from_json(data: dict) -> "Timespan":
+        """
+        Creates a Timespan instance from a dictionary produced by to_json.
+        :param data: A dictionary representation of the Timespan.
+        :return: A Timespan instance.
+        """
+        return Timespan(
+            start=datetime.fromisoformat(data["start"]),
+            end=datetime.fromisoformat(data["end"])
+        )
+
     def get_seconds(self) -> float:
         """
         Calculates the duration of the timespan in seconds.
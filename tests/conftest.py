@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the modules of src import each other by their flat names, as when run with 'python src'
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,58 @@
+import asyncio
+from adaptive_cool_down import AdaptiveCoolDown, cpu_busy_percent
+from cluster_service import parse_cpu_times
+from cluster_stats import ClusterStats
+from server_stats import ServerStats
+from simulation import VirtualTimeEventLoop
+
+def stats(used_memory: int, idle_since_boot: float = 90.0) -> ClusterStats:
+    return ClusterStats(servers=[ServerStats(memory={"used": used_memory}, stats={"idle": idle_since_boot}, host="node-1", ping={})])
+
+class FakeClusterService:
+    """
+    Serves the same since-boot stats on every poll, as mpstat without an interval does, and CPU time
+    counters growing by the given busy ticks out of 100 at each reading.
+    """
+
+    def __init__(self, busy_per_reading: list[int], used_memory: int = 1000):
+        self.busy_per_reading = list(busy_per_reading)
+        self.used_memory = used_memory
+        self.busy, self.total = 0, 0
+
+    async def get_stats(self, cluster) -> ClusterStats:
+        return stats(self.used_memory)
+
+    async def get_cpu_times(self, cluster) -> dict[str, tuple[int, int]]:
+        self.busy += self.busy_per_reading.pop(0) if self.busy_per_reading else 0
+        self.total += 100
+        return {"node-1": (self.busy, self.total)}
+
+def cool_down_seconds(cluster_service: FakeClusterService, max_cool_down: float = 30.0) -> float:
+    async def run() -> float:
+        cool_down = AdaptiveCoolDown(cluster_service, cluster=None)
+        await cool_down.capture_baseline(stats(cluster_service.used_memory))
+        return await cool_down.wait(max_cool_down)
+    with asyncio.Runner(loop_factory=VirtualTimeEventLoop) as runner:
+        return runner.run(run())
+
+def test_parse_cpu_times_counts_idle_and_iowait_as_not_busy():
+    assert parse_cpu_times("cpu  4705 150 1120 16250 520 0 30 0 0 0\n") == (6005, 22775)
+
+def test_cpu_busy_percent_is_measured_over_the_interval():
+    assert cpu_busy_percent({"node-1": (100, 1000), "gone": (0, 10)}, {"node-1": (150, 1100), "new": (5, 10)}) == {"node-1": 50.0}
+
+def test_cool_down_waits_for_the_sampled_cpu_usage_not_the_average_since_boot():
+    # 10% busy over the baseline interval; after the probe, two intervals at 90% before the CPU settles back
+    cluster_service = FakeClusterService([0, 10, 0, 90, 90, 10])
+    assert cool_down_seconds(cluster_service) == 3.0
+
+def test_cool_down_waits_for_memory_and_is_capped():
+    cluster_service = FakeClusterService([])
+    cluster_service.used_memory = 1000
+
+    async def run() -> float:
+        cool_down = AdaptiveCoolDown(cluster_service, cluster=None)
+        await cool_down.capture_baseline(stats(500))
+        return await cool_down.wait(5.0)
+    with asyncio.Runner(loop_factory=VirtualTimeEventLoop) as runner:
+        assert runner.run(run()) == 5.0
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from json_storage_service import JsonStorageService
+from benchmark_checkpoint import BenchmarkCheckpoint
+from test_execution_service import TestExecutionService
+from benchmark_service import BenchmarkService
+from cluster_service import ClusterService
+from calibration_cache import CalibrationCache
+from queueing_model import QueueingModel
+from simulation import SimulatedCluster, VirtualTimeEventLoop
+import runtime
+
+CHECKPOINT = "benchmark_checkpoint.json"
+PROBES = "benchmark_checkpoint.probes.jsonl"
+
+def run_benchmark(storage: JsonStorageService, resume: bool) -> BenchmarkCheckpoint:
+    """
+    Benchmarks the simulated fibonacci test case on virtual time, with a checkpoint and a calibration cache,
+    and completes the checkpoint as benchmark_cluster does once the results are saved.
+    """
+    async def run() -> BenchmarkCheckpoint:
+        cluster = SimulatedCluster(QueueingModel(seed=1))
+        checkpoint = BenchmarkCheckpoint(storage, CHECKPOINT, resume=resume)
+        benchmark_service = BenchmarkService(
+            TestExecutionService(ClusterService(), checkpoint=checkpoint),
+            calibration_cache=CalibrationCache(storage, "calibration.json")
+        )
+        try:
+            await benchmark_service.run_benchmark([cluster.create_test_case("fibonacci")], cluster, duration_per_test=5, rest_time=1)
+            checkpoint.complete()
+        finally:
+            await runtime.close_http_client()
+        return checkpoint
+    with asyncio.Runner(loop_factory=VirtualTimeEventLoop) as runner:
+        return runner.run(run())
+
+def test_resume_replays_the_probes_of_a_calibrated_run(tmp_path, caplog):
+    storage = JsonStorageService(str(tmp_path))
+    # the first run starts from an empty cache and calibrates it when it completes
+    probes = run_benchmark(storage, resume=False).probes
+    assert storage.load("calibration.json")["entries"]
+
+    # an interrupted run: it never completed and only the first two thirds of its probes were recorded
+    storage.save(CHECKPOINT, {**storage.load(CHECKPOINT), "completed": False})
+    interrupted = probes[:len(probes) * 2 // 3]
+    storage.save_lines(PROBES, interrupted)
+
+    with caplog.at_level(logging.WARNING):
+        resumed = run_benchmark(storage, resume=True)
+    assert "diverged" not in caplog.text
+    assert [probe["key"] for probe in resumed.probes] == [probe["key"] for probe in probes]
+
+def test_resume_after_a_completed_run_starts_a_new_benchmark(tmp_path, caplog):
+    storage = JsonStorageService(str(tmp_path))
+    probes = run_benchmark(storage, resume=False).probes
+    assert storage.load(CHECKPOINT)["completed"]
+    assert storage.load_lines(PROBES) == []
+
+    with caplog.at_level(logging.INFO):
+        resumed = run_benchmark(storage, resume=True)
+    assert "completed benchmark" in caplog.text
+    assert "Replaying" not in caplog.text
+    # the new benchmark starts from the calibration the first one cached, so it probes anew
+    assert resumed.probes and resumed.probes != probes
@@ -0,0 +1,29 @@
+from pathlib import Path
+import subprocess
+import sys
+import json
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+HEAVY_MODULES = ("numpy", "matplotlib", "pandas", "paramiko", "httpx")
+# budget of docs/API_REFERENCE.md for importing cli, in microseconds as -X importtime reports it
+IMPORT_BUDGET_US = 100_000
+
+def import_cli() -> tuple[int, list[str]]:
+    """
+    Imports cli in a fresh interpreter, as 'python src' does.
+    :return: The cumulative import time of cli in microseconds and the heavy modules it loaded.
+    """
+    code = f"import cli, sys, json; print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=SRC, capture_output=True, text=True, check=True)
+    # lines are 'import time: self [us] | cumulative | imported package', nested imports indented
+    cumulative = next(int(line.split("|")[1]) for line in process.stderr.splitlines() if line.split("|")[-1] == " cli")
+    return cumulative, json.loads(process.stdout)
+
+def test_cli_import_loads_no_heavy_module():
+    _, loaded = import_cli()
+    assert loaded == []
+
+def test_cli_import_time_is_within_budget():
+    # the first import may read cold files and compile bytecode: the best of a few runs is the one that measures the imports
+    best = min(import_cli()[0] for _ in range(3))
+    assert best < IMPORT_BUDGET_US, f"importing cli took {best / 1000:.1f} ms, the budget is {IMPORT_BUDGET_US / 1000:.0f} ms"
@@ -0,0 +1,18 @@
+import io
+from cluster_stats import ClusterStats
+from server_stats import ServerStats
+from metrics import MetricsRegistry
+from dashboard import Dashboard
+
+def test_dashboard_shows_host_memory_in_gibibytes():
+    registry = MetricsRegistry()
+    # free reports KiB: 16 of 64 GiB used
+    registry.set_cluster_stats(ClusterStats(servers=[ServerStats(
+        memory={"used": 16 * 2 ** 20, "total": 64 * 2 ** 20},
+        stats={"idle": "75.0"},
+        host="node-1",
+        ping={}
+    )]))
+    host_line = next(line for line in Dashboard(registry, stream=io.StringIO()).render().splitlines() if line.startswith("node-1"))
+    assert "25.0%" in host_line
+    assert host_line.endswith("16.0/64.0 GiB")
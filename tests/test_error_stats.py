@@ -0,0 +1,68 @@
+import json
+import httpx
+import pytest
+from error_stats import ErrorStats, classify_error
+from in_flight_limit import InFlightLimitExceeded
+
+REQUEST = httpx.Request("GET", "http://app/fibonacci/20")
+
+def status_error(status: int) -> httpx.HTTPStatusError:
+    return httpx.HTTPStatusError(f"{status}", request=REQUEST, response=httpx.Response(status, request=REQUEST))
+
+@pytest.mark.parametrize("error, kind", [
+    (httpx.ReadTimeout("read timed out", request=REQUEST), "timeout"),
+    (httpx.ConnectTimeout("connect timed out", request=REQUEST), "timeout"),
+    (status_error(503), "http_status"),
+    (httpx.ConnectError("connection refused", request=REQUEST), "connect"),
+    (httpx.RemoteProtocolError("server disconnected", request=REQUEST), "connect"),
+    (ConnectionResetError(), "connect"),
+    (InFlightLimitExceeded("no slot"), "in_flight_limit"),
+    (json.JSONDecodeError("Expecting value", "<html>", 0), "decode"),
+    (KeyError("start"), "decode"),
+    (httpx.DecodingError("bad gzip", request=REQUEST), "decode"),
+    (RuntimeError("unexpected"), "other"),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+def test_split_at_the_end_of_the_warm_up():
+    stats = ErrorStats()
+    stats.record(status_error(503), at_seconds=0.5)
+    stats.record(status_error(503), at_seconds=3.2)
+    stats.record(status_error(500), at_seconds=4.0)
+    stats.record(httpx.ReadTimeout("read timed out", request=REQUEST), at_seconds=1.9)
+
+    warm_up, steady = stats.split(2.0)
+    assert warm_up.counts == {"http_status": 1, "timeout": 1}
+    assert warm_up.status_codes == {"503": 1}
+    assert warm_up.per_second == {"http_status": {0: 1}, "timeout": {1: 1}}
+    assert steady.counts == {"http_status": 2}
+    assert steady.status_codes == {"503": 1, "500": 1}
+    assert steady.per_second == {"http_status": {3: 1, 4: 1}}
+    # only the kinds a part holds keep their examples
+    assert set(warm_up.examples) == {"http_status", "timeout"}
+    assert set(steady.examples) == {"http_status"}
+    assert warm_up.total() + steady.total() == stats.total()
+
+def test_split_keeps_the_status_codes_of_a_loaded_file_after_the_point():
+    loaded = ErrorStats.from_json({"counts": {"http_status": 2}, "status_codes": {"503": 2}, "per_second": {"http_status": {"0": 1, "5": 1}}})
+    before, after = loaded.split(2.0)
+    assert before.counts == {"http_status": 1} and before.status_codes == {}
+    assert after.counts == {"http_status": 1} and after.status_codes == {"503": 2}
+
+def test_round_trip():
+    stats = ErrorStats()
+    stats.record(status_error(503), at_seconds=1.5)
+    stats.record(InFlightLimitExceeded("no slot"), at_seconds=2.0)
+    loaded = ErrorStats.from_json(json.loads(json.dumps(stats.to_json())))
+    assert loaded.to_json() == stats.to_json()
+    assert loaded.per_second == {"http_status": {1: 1}, "in_flight_limit": {2: 1}}
+
+def test_files_with_a_list_of_messages_count_them_as_other():
+    loaded = ErrorStats.from_json(["ReadTimeout: timed out", "ReadTimeout: timed out", "HTTPStatusError: 503"])
+    assert loaded.total() == 3
+    assert loaded.counts == {"other": 3}
+    assert loaded.per_second == {"other": {0: 3}}
+    # the examples are distinct messages
+    assert loaded.examples == {"other": ["ReadTimeout: timed out", "HTTPStatusError: 503"]}
+    assert ErrorStats.from_json([]).total() == 0
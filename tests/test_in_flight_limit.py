@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from in_flight_limit import InFlightLimit
+from queueing_model import QueueingModel
+from simulation import SimulatedTestCase, VirtualTimeEventLoop
+from test_execution import TestExecution
+from test_execution_service import TestExecutionService
+import runtime
+
+def execute(policy: str, max_queue_delay: float = 1.0) -> TestExecution:
+    """
+    Sends 4 requests per second for 2 seconds on virtual time, each served in 0.9 s with no queueing
+    on the model, while at most 2 requests may be in flight.
+    """
+    async def run() -> TestExecution:
+        test_case = SimulatedTestCase("slow", QueueingModel(servers=100), service_time=lambda load: 0.9)
+        service = TestExecutionService(cluster_service=None, max_in_flight=2, in_flight_policy=policy, max_queue_delay=max_queue_delay)
+        try:
+            return await service.execute_test(tests_per_second=4, duration_seconds=2, load=1, test_case=test_case)
+        finally:
+            await runtime.close_http_client()
+    with asyncio.Runner(loop_factory=VirtualTimeEventLoop) as runner:
+        return runner.run(run())
+
+def test_drop_skips_the_requests_scheduled_while_the_limit_is_reached():
+    execution = execute("drop")
+    # the requests at 0.5 s and 0.75 s find both slots taken, and so do those at 1.5 s and 1.75 s
+    assert execution.in_flight_limit["dropped"] == 4
+    assert execution.in_flight_limit["affected_requests"] == 4
+    assert len(execution.results) == 4
+    assert execution.errors.total() == 0
+    assert not execution.in_flight_limit["aborted"]
+
+def test_queue_delays_the_requests_and_expires_the_late_ones():
+    execution = execute("queue")
+    limit = execution.in_flight_limit
+    assert limit["queued"] == 6
+    # the request queued at 1.5 s would get its slot at 2.7 s, after the 1 s it may wait
+    assert limit["expired"] == 1
+    assert len(execution.results) == 7
+    # expired requests never reached the cluster: they are no errors
+    assert execution.errors.total() == 0
+    assert limit["queue_delay"]["max"] <= 1.0
+
+def test_a_freed_slot_goes_to_the_oldest_queued_request():
+    async def run() -> list[str]:
+        limit = InFlightLimit(1, policy="queue", max_queue_delay=10)
+        started = []
+
+        async def request(name: str):
+            started.append(name)
+            await asyncio.sleep(1)
+
+        assert limit.try_acquire()
+        first = asyncio.create_task(limit.run(lambda: request("first")))
+        queued = [asyncio.create_task(limit.run_queued(lambda name=name: request(name))) for name in ("second", "third")]
+        await asyncio.gather(first, *queued)
+        return started
+    with asyncio.Runner(loop_factory=VirtualTimeEventLoop) as runner:
+        assert runner.run(run()) == ["first", "second", "third"]
+
+def test_abort_stops_the_probe_and_counts_the_rest_of_the_schedule():
+    execution = execute("abort")
+    limit = execution.in_flight_limit
+    assert limit["aborted"]
+    # the third request finds both slots taken: it and the 5 after it are never sent
+    assert limit["unsent"] == 6
+    assert len(execution.results) == 2
+    assert execution.tester_stats["sent_requests"] == 2
+
+def test_the_limit_checks_its_arguments():
+    with pytest.raises(ValueError):
+        InFlightLimit(0)
+    with pytest.raises(ValueError):
+        InFlightLimit(1, policy="wait")
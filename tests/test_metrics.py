@@ -0,0 +1,22 @@
+from cluster_stats import ClusterStats
+from server_stats import ServerStats
+from metrics import MetricsRegistry
+
+GIB_IN_KIB = 2 ** 20
+
+def cluster_stats(used_kib: int, total_kib: int) -> ClusterStats:
+    # the memory figures of the monitored servers come from free, in KiB
+    return ClusterStats(servers=[ServerStats(
+        memory={"used": used_kib, "total": total_kib},
+        stats={"idle": "75.0"},
+        host="node-1",
+        ping={"avg": 0.4}
+    )])
+
+def test_host_memory_gauges_are_in_bytes():
+    registry = MetricsRegistry()
+    registry.set_cluster_stats(cluster_stats(16 * GIB_IN_KIB, 64 * GIB_IN_KIB))
+    assert registry.hosts["node-1"]["memory_used_bytes"] == 16 * 2 ** 30
+    assert registry.hosts["node-1"]["memory_total_bytes"] == 64 * 2 ** 30
+    exposition = registry.render()
+    assert f'host_memory_total_bytes{{host="node-1"}} {64 * 2 ** 30}' in exposition
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+import pytest
+from test_execution import TestExecution
+from test_result import TestResult
+from timespan import Timespan
+from simulation import SimulatedCluster
+from queueing_model import QueueingModel
+from test_execution_service import TestExecutionService
+
+TEST_CASE = SimulatedCluster(QueueingModel()).create_test_case("linear")
+START = datetime(2026, 3, 1, 12)
+
+def execution(request_per_second: int, response_time: float, failed: int = 0) -> TestExecution:
+    """
+    Builds an execution of 10 requests, the given number of which failed and the others took the response time.
+    """
+    span = Timespan(START, START + timedelta(seconds=response_time))
+    execution = TestExecution(
+        total_span=span,
+        span_making_requests=span,
+        test_case=TEST_CASE,
+        results=[TestResult(TEST_CASE.get_name(), 1, span, span) for _ in range(10 - failed)],
+        request_per_second=request_per_second,
+        load=1
+    )
+    for _ in range(failed):
+        execution.errors.record_kind("http_status")
+    return execution
+
+def test_biggest_execution_is_a_static_method_with_a_default_check():
+    executions = [execution(1, 0.5), execution(4, 1.5), execution(8, 2.5)]
+    biggest = TestExecutionService.biggest_execution_avg_lower_than_max_avg_response_time(executions, 2.0)
+    assert biggest.request_per_second == 4
+
+def test_biggest_execution_skips_the_executions_failing_the_given_check():
+    executions = [execution(1, 0.5), execution(4, 1.5, failed=5), execution(8, 2.5)]
+    service = TestExecutionService(cluster_service=None, max_error_rate=0.1)
+    biggest = service.biggest_execution_avg_lower_than_max_avg_response_time(
+        executions, 2.0, meets_sla=lambda execution: not service.exceeds_max_error_rate(execution) and execution.avg_response_time() <= 2.0
+    )
+    assert biggest.request_per_second == 1
+
+def test_biggest_execution_reports_when_every_request_failed():
+    with pytest.raises(ValueError, match="No test execution found"):
+        TestExecutionService.biggest_execution_avg_lower_than_max_avg_response_time([execution(1, 0.5, failed=10)], 2.0)
@@ -0,0 +1,98 @@
+import asyncio
+import math
+import pytest
+from queueing_model import QueueingModel
+from simulation import SimulatedCluster, SimulatedTestCase, SimulationService, VirtualTimeEventLoop, LOAD_SCALINGS
+from test_execution_service import TestExecutionService
+import runtime
+
+DURATION_PER_TEST = 5
+# every load the rate searches settle on is probed once more while monitored
+MONITORED_RERUNS = 3
+
+def simulate(distribution: str = "deterministic", seed: int = 7) -> dict:
+    cluster = SimulatedCluster(QueueingModel(distribution=distribution, seed=seed))
+    report, _ = SimulationService(cluster).run(list(LOAD_SCALINGS), duration_per_test=DURATION_PER_TEST, rest_time=1)
+    return report
+
+@pytest.fixture(scope="module")
+def report() -> dict:
+    return simulate()
+
+def test_load_search_finds_the_max_acceptable_load_of_the_model(report):
+    for test_case in report["test_cases"]:
+        assert test_case["max_acceptable_load"] == test_case["expected_max_acceptable_load"], test_case["test_case"]
+
+def test_load_search_stays_within_its_probe_budget(report):
+    for test_case in report["test_cases"]:
+        # galloping up to the max acceptable load, then bisecting back down the last gap
+        budget = 2 * math.ceil(math.log2(test_case["expected_max_acceptable_load"])) + 2
+        assert test_case["load_search"]["probes"] <= budget, test_case["test_case"]
+
+def test_rate_search_stays_within_its_probe_budget(report):
+    for test_case in report["test_cases"]:
+        rate_probes = test_case["probes"] - test_case["load_search"]["probes"] - MONITORED_RERUNS
+        # doubling up to the saturation rate of each load, then bisecting back down the last gap
+        budget = sum(2 * math.ceil(math.log2(load["saturation_request_per_second"] + 1)) + 2 for load in test_case["loads"])
+        assert 0 < rate_probes <= budget, test_case["test_case"]
+
+def test_seeded_simulation_is_reproducible():
+    first, second = simulate("exponential"), simulate("exponential")
+    for one, other in zip(first["test_cases"], second["test_cases"]):
+        assert one["probes"] == other["probes"]
+        assert one["max_acceptable_load"] == other["max_acceptable_load"]
+        assert one["loads"] == other["loads"]
+
+def search_load(expected_load: int = None, max_error_rate: float = 0.0, **model_options) -> tuple[int, list[int], dict]:
+    """
+    Searches the max acceptable load of 2 requests per second with at most 2 s on average, on virtual time,
+    against a model serving a load in 0.1 s per unit of load plus 0.05 s: the answer is 19.
+    :return: The load found, the loads probed in order, and the summary of the search.
+    """
+    async def run() -> tuple[int, list[int], dict]:
+        test_case = SimulatedTestCase("linear", QueueingModel(**model_options), service_time=lambda load: 0.1 * load + 0.05)
+        service = TestExecutionService(cluster_service=None, max_error_rate=max_error_rate)
+        probed = []
+        execute_test = service.execute_test
+
+        async def recorded_execute_test(request_per_second, duration_seconds, load, test_case):
+            probed.append(load)
+            return await execute_test(request_per_second, duration_seconds, load, test_case)
+
+        service.execute_test = recorded_execute_test
+        try:
+            execution = await service.find_max_acceptable_load(test_case, 2, DURATION_PER_TEST, 2.0, expected_load=expected_load)
+        finally:
+            await runtime.close_http_client()
+        return execution.get_load(), probed, service.last_load_search
+    with asyncio.Runner(loop_factory=VirtualTimeEventLoop) as runner:
+        return runner.run(run())
+
+def test_load_search_gallops_then_bisects():
+    load, probed, _ = search_load()
+    assert load == 19
+    assert probed == [1, 2, 4, 8, 16, 32, 24, 20, 18, 19]
+
+def test_load_search_starts_from_the_expected_load():
+    load, probed, summary = search_load(expected_load=19)
+    # the expected load and the next one settle the search
+    assert (load, probed) == (19, [19, 20])
+    assert summary["expected_load_held"]
+
+@pytest.mark.parametrize("expected_load", [10, 30])
+def test_load_search_recovers_from_a_wrong_expected_load(expected_load):
+    load, probed, summary = search_load(expected_load=expected_load)
+    assert load == 19
+    assert probed[0] == expected_load
+    assert not summary["expected_load_held"]
+    assert len(probed) <= 2 * math.ceil(math.log2(19)) + 2
+
+def test_load_search_skips_the_loads_above_the_max_error_rate():
+    # one server and no queue: from load 5 on, a request is still served when the next one arrives, which is rejected
+    model = dict(servers=1, max_queue=0)
+    load, probed, _ = search_load(**model)
+    assert load == 4
+    assert 5 in probed
+    # the served requests stay fast: only the error rate keeps the search below 19
+    load, _, _ = search_load(max_error_rate=1.0, **model)
+    assert load == 19
@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+import pytest
+
+from cli import build_parser
+from self_benchmark_service import NoOpHttpTarget, SelfBenchmarkService
+from test_execution_service import TestExecutionService
+
+def test_self_benchmark_rejects_the_options_it_does_not_use():
+    parser = build_parser()
+    args = parser.parse_args(['self-benchmark', '--max-in-flight', '5', '--in-flight-policy', 'queue'])
+    assert (args.max_in_flight, args.in_flight_policy) == (5, 'queue')
+    for option in (['--warm-up', '1'], ['--mix', 'fibonacci@1:1'], ['--dashboard'], ['--metrics-port', '9000']):
+        with pytest.raises(SystemExit):
+            parser.parse_args(['self-benchmark', *option])
+
+def test_the_target_serves_from_its_own_thread_and_counts_its_cpu_time():
+    async def serve():
+        target = NoOpHttpTarget()
+        await target.start()
+        reader, writer = await asyncio.open_connection('127.0.0.1', target.port)
+        writer.write(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = await reader.readuntil(b"}")
+        # busy the tester: the target must not count it
+        deadline = time.thread_time() + 0.2
+        while time.thread_time() < deadline:
+            pass
+        writer.close()
+        await target.stop()
+        return response, target
+
+    response, target = asyncio.run(serve())
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert b'"start"' in response
+    assert not target._thread.is_alive()
+    assert 0 < target.cpu_seconds < 0.2
+
+def test_the_cpu_time_per_request_leaves_the_target_out():
+    service = SelfBenchmarkService(TestExecutionService(cluster_service=None))
+    run = asyncio.run(service.run_single(rate=50, concurrency=1, duration_seconds=1))
+    assert run['completed_requests'] > 0
+    assert run['target_cpu_seconds_per_request'] > 0
+    assert run['cpu_seconds_per_request'] > 0
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+import warnings
+import time
+import pytest
+from timeline import Timeline, parse_timestamps
+
+@pytest.fixture
+def non_utc_timezone(monkeypatch):
+    # a time zone with daylight saving time, which changes its offset on 2026-03-29
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_parse_timestamps_reads_naive_timestamps_as_local_time(non_utc_timezone):
+    values = [
+        datetime(2026, 3, 1, 12, 0, 0, 250000).isoformat(),
+        # either side of the daylight saving time change
+        datetime(2026, 3, 29, 1, 59, 59).isoformat(),
+        datetime(2026, 3, 29, 3, 0, 1).isoformat(),
+    ]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        parsed = parse_timestamps(values)
+    assert list(parsed) == pytest.approx([datetime.fromisoformat(value).timestamp() for value in values])
+    assert parsed[2] - parsed[1] == pytest.approx(2.0)
+
+def test_parse_timestamps_applies_the_offset_of_each_timestamp(non_utc_timezone):
+    local = datetime(2026, 3, 1, 12, 0, 0, 250000)
+    values = [
+        local.isoformat(),
+        local.astimezone(timezone.utc).isoformat(),
+        local.astimezone(timezone(timedelta(hours=-3))).isoformat(),
+        # as the mock server writes them
+        local.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+    ]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        parsed = parse_timestamps(values)
+    assert list(parsed) == pytest.approx([local.timestamp()] * 4)
+
+def test_timeline_places_requests_of_a_non_utc_tester_in_their_windows(non_utc_timezone):
+    start = datetime(2026, 3, 1, 12, 0, 0)
+    results = []
+    for second in range(5):
+        sent = (start + timedelta(seconds=second, milliseconds=100)).astimezone(timezone.utc)
+        # request spans are in UTC and server spans carry the offset of the application, as the test cases save them
+        results.append({
+            "request_span": {"start": sent.isoformat(), "end": (sent + timedelta(milliseconds=200)).isoformat()},
+            "server_processing_span": {
+                "start": (sent + timedelta(milliseconds=50)).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+                "end": (sent + timedelta(milliseconds=150)).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+            }
+        })
+    # the spans of the execution are naive local times, written by runtime.now
+    execution = {
+        "span_making_requests": {"start": start.isoformat(), "end": (start + timedelta(seconds=5)).isoformat()},
+        "total_span": {"start": start.isoformat(), "end": (start + timedelta(seconds=5)).isoformat()},
+        "seconds_making_requests": 5,
+        "results": results,
+    }
+    timeline = Timeline.from_execution(execution)
+    assert len(timeline) == 5
+    assert list(timeline.columns["throughput_rps"]) == [1.0] * 5
+    assert list(timeline.columns["latency_p50"]) == pytest.approx([0.2] * 5)
+    assert list(timeline.columns["server_time_avg"]) == pytest.approx([0.1] * 5)